@@ -57,6 +57,7 @@ class PatternAnalysisRequest(Model):
     user_message: str
     session_history: List[str] = []
     user_id: Optional[str] = None
+    request_id: Optional[str] = None  # echoed back so the reply can be matched
 
 class PatternAnalysisResponse(Model):
     user_id: Optional[str] = None
@@ -65,6 +66,7 @@ class PatternAnalysisResponse(Model):
     risk_level: str = "low"
     enhanced_patterns: List[str] = []
     analysis_confidence: float = 0.0
+    request_id: Optional[str] = None
 
 # ==================== CRISIS ALERTS ====================
 
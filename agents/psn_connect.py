@@ -17,6 +17,7 @@ from uagents import Agent, Context, Protocol
 
 # Import COMMON models
 from common_models import PeerSupportRecommendation, PeerSupportActivation
+from utils.outbound_dispatcher import get_outbound_dispatcher
 
 print("✅ PSN Connect - Common models imported")
 
@@ -49,6 +50,9 @@ print("🤝 PSN CONNECT - FIXED WITH COMMON MODELS")
 print("=" * 60)
 print(f"📍 Agent Address: {psn_connect.address}")
 
+# Outbound sends are queued and retried off the handler path
+outbound = get_outbound_dispatcher()
+
 # Protocol
 peer_match_proto = Protocol(name="PeerSupportMatching", version="1.1.0")
 
@@ -97,8 +101,8 @@ async def handle_orchestrator_recommendation(ctx: Context, sender: str, msg: Pee
             activation_reason=f"Activated for: {', '.join(msg.patterns)}"
         )
         
-        await ctx.send(SORO_ORCHESTRATOR_ADDRESS, activation)
-        print(f"✅ PSN: ACTIVATION SENT to Orchestrator")
+        outbound.submit(ctx, SORO_ORCHESTRATOR_ADDRESS, activation)
+        print(f"✅ PSN: ACTIVATION QUEUED for Orchestrator")
         print(f"   👥 Matched {len(matched_peers)} peers")
         for peer in matched_peers:
             print(f"      • {peer['name']} - {peer['match_reason']}")
@@ -110,6 +114,11 @@ async def handle_orchestrator_recommendation(ctx: Context, sender: str, msg: Pee
     except Exception as e:
         print(f"❌ PSN: Processing failed - {e}")
 
+@psn_connect.on_event("shutdown")
+async def drain_outbound_on_shutdown(ctx: Context):
+    """Deliver queued activations before the agent exits"""
+    await outbound.drain(timeout=5.0)
+
 psn_connect.include(peer_match_proto, publish_manifest=True)
 
 if __name__ == "__main__":
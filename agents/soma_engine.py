@@ -16,6 +16,8 @@ from uagents import Agent, Context, Protocol
 
 # Import COMMON models
 from common_models import PatternAnalysisRequest, PatternAnalysisResponse, RiskLevel
+from knowledge.pattern_taxonomy import SOMA_SECTION, get_pattern_taxonomy
+from utils.outbound_dispatcher import get_outbound_dispatcher
 
 print("✅ SOMA Engine - Common models imported")
 
@@ -31,25 +33,13 @@ class MeTTaManager:
 
 class ASIClient:
     async def analyze_mental_patterns(self, message: str, history: List[str]):
-        patterns = []
-        emotions = []
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['exam', 'test', 'study', 'academic']):
-            patterns.extend(['academic_perfectionism', 'performance_anxiety'])
-            emotions.append('anxiety')
-        if any(word in message_lower for word in ['anxious', 'worry', 'nervous']):
-            patterns.extend(['catastrophizing', 'future_worry'])
-            emotions.append('anxiety')
-        if any(word in message_lower for word in ['stress', 'pressure']):
-            patterns.extend(['task_overload', 'boundary_issues'])
-            emotions.append('stress')
-        
-        enhanced_patterns = patterns.copy()
-        if 'academic' in message_lower:
-            enhanced_patterns.append('academic_stress')
-        if 'peer' in message_lower or 'group' in message_lower:
-            enhanced_patterns.append('social_support_seeking')
+        # SOMA's own taxonomy section: one token pass regardless of category count
+        taxonomy_match = pattern_taxonomy.match_text(message)
+        patterns = taxonomy_match.cognitive_patterns
+        emotions = taxonomy_match.emotions
+        enhanced_patterns = patterns + [
+            pattern for pattern in taxonomy_match.enhanced_patterns if pattern not in patterns
+        ]
         
         return type('obj', (object,), {
             'patterns': patterns if patterns else ['general_stress_pattern'],
@@ -61,7 +51,9 @@ class ASIClient:
 
 # Initialize
 metta_manager = MeTTaManager()
+pattern_taxonomy = get_pattern_taxonomy(SOMA_SECTION)
 asi_client = ASIClient()
+outbound = get_outbound_dispatcher()
 
 # Agent
 soma_engine = Agent(
@@ -97,10 +89,11 @@ async def handle_pattern_analysis(ctx: Context, sender: str, msg: PatternAnalysi
             emotions=analysis_result.emotions,
             risk_level=analysis_result.risk_level,
             enhanced_patterns=analysis_result.enhanced_patterns,
-            analysis_confidence=analysis_result.confidence
+            analysis_confidence=analysis_result.confidence,
+            request_id=msg.request_id
         )
         
-        await ctx.send(sender, response)
+        outbound.submit(ctx, sender, response)
         print(f"✅ SOMA ENGINE: Analysis COMPLETED")
         print(f"   📊 Patterns: {analysis_result.patterns}")
         print(f"   🎭 Emotions: {analysis_result.emotions}")
@@ -114,9 +107,15 @@ async def handle_pattern_analysis(ctx: Context, sender: str, msg: PatternAnalysi
             emotions=[],
             risk_level=RiskLevel.LOW,
             enhanced_patterns=[],
-            analysis_confidence=0.0
+            analysis_confidence=0.0,
+            request_id=msg.request_id
         )
-        await ctx.send(sender, error_response)
+        outbound.submit(ctx, sender, error_response)
+
+@soma_engine.on_event("shutdown")
+async def drain_outbound_on_shutdown(ctx: Context):
+    """Deliver queued analysis replies before the agent exits"""
+    await outbound.drain(timeout=5.0)
 
 soma_engine.include(analysis_proto, publish_manifest=True)
 
@@ -27,6 +27,7 @@ try:
 )
 
     from knowledge.metta_manager import MeTTaManager
+    from utils.outbound_dispatcher import get_outbound_dispatcher
     print("✅ All modules imported successfully")
 except ImportError as e:
     print(f"❌ Critical import error: {e}")
@@ -81,6 +82,9 @@ SOROMIND_CORE_ADDRESS = "agent1qdrdup2klslg5adangymn9ajm72c2sr95phpjfhuaz2ryskwd
 SOMA_ENGINE_ADDRESS = "agent1qtqs2gzljl90mlcjenxj6nxjd2gkhpptdy8nsaz7terv5s8h8gkf2z5ya4s"
 PSN_CONNECT_ADDRESS = "agent1qfnztyxpn3p87spf6ah6j8us3r9ms497ruez5r8fwvr4kpjpw662zsdmtvj"
 
+# Outbound sends are queued per destination and retried off the handler path
+outbound = get_outbound_dispatcher()
+
 # Intervention protocol
 intervention_proto = Protocol(name="InterventionOrchestration", version="1.1.0")
 
@@ -121,7 +125,7 @@ async def handle_intervention_request(ctx: Context, sender: str, msg: Interventi
             resources=response_resources
         )
         
-        await ctx.send(sender, response)
+        outbound.submit(ctx, sender, response)
         print(f"✅ ORCHESTRATOR: Sent intervention with {len(interventions['techniques'])} techniques")
         
         if coordination_result['peer_support_initiated']:
@@ -141,7 +145,7 @@ async def handle_intervention_request(ctx: Context, sender: str, msg: Interventi
             duration_minutes=5,
             resources=["Breathing exercise guide", "Grounding techniques"]
         )
-        await ctx.send(sender, fallback_response)
+        outbound.submit(ctx, sender, fallback_response)
 
 @intervention_proto.on_message(model=MentalStateAlert)
 async def handle_crisis_intervention(ctx: Context, sender: str, msg: MentalStateAlert):
@@ -224,14 +228,17 @@ async def coordinate_support(ctx: Context, request: InterventionRequest, interve
         )
         
         try:
-            await ctx.send(PSN_CONNECT_ADDRESS, peer_recommendation)
-            coordination_result['peer_support_initiated'] = True
-            coordination_result['additional_resources'].append("Peer support coordination initiated")
-            coordination_result['agent_coordination'].append("PSN Connect")
-            print(f"💫 ORCHESTRATOR: Sent peer support recommendation to PSN Connect")
-            print(f"   👤 User: {request.user_id[:8]}...")
-            print(f"   🎯 Support Type: {support_type}")
-            print(f"   🔍 Patterns: {request.patterns}")
+            # Only report peer support once PSN Connect actually has the recommendation
+            if await outbound.send(ctx, PSN_CONNECT_ADDRESS, peer_recommendation):
+                coordination_result['peer_support_initiated'] = True
+                coordination_result['additional_resources'].append("Peer support coordination initiated")
+                coordination_result['agent_coordination'].append("PSN Connect")
+                print(f"💫 ORCHESTRATOR: Sent peer support recommendation to PSN Connect")
+                print(f"   👤 User: {request.user_id[:8]}...")
+                print(f"   🎯 Support Type: {support_type}")
+                print(f"   🔍 Patterns: {request.patterns}")
+            else:
+                print(f"⚠️ ORCHESTRATOR: Peer support recommendation was not delivered to PSN Connect")
             
         except Exception as e:
             print(f"⚠️ ORCHESTRATOR: Failed to send to PSN Connect: {e}")
@@ -371,6 +378,11 @@ def get_crisis_interventions(risk_level: RiskLevel) -> List[str]:
     
     return crisis_protocols.get(risk_level, ["Monitoring and support"])
 
+@soro_orchestrator.on_event("shutdown")
+async def drain_outbound_on_shutdown(ctx: Context):
+    """Deliver queued interventions and recommendations before the agent exits"""
+    await outbound.drain(timeout=5.0)
+
 # Include protocol
 soro_orchestrator.include(intervention_proto, publish_manifest=True)
 
@@ -26,9 +26,13 @@ if missing_vars:
 print("✅ Environment variables loaded successfully")
 
 import uuid
+import time
 import asyncio
+from array import array
+from functools import partial
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
 from uuid import uuid4
 
 from uagents import Agent, Context, Protocol, Model
@@ -46,38 +50,201 @@ from models.data_models import (
     MentalSupportRequest, SupportResponse, 
     ResponseType, SupportType
 )
+from models.data_models import PatternAnalysisResponse as PatternAnalysisResult
+from models.data_models import RISK_ORDER
 from knowledge.metta_manager import MeTTaManager
 from utils.asi_client import ASIClient
 from utils.crisis_detector import CrisisDetector
+from utils.message_analysis import MessageAnalysis
+from utils.session_store import SessionStore, EVICTED_CAPACITY
+from utils.session_backend import SQLiteSessionBackend
+from utils.fanout import FanOut, run_detached
+from utils.pending_replies import PendingReplies
+from utils.coalescing_queue import CoalescingQueue
+from utils.outbound_dispatcher import get_outbound_dispatcher
+from utils.admission import AdmissionController, ADMIT_DEGRADED
+from utils.circuit_breaker import CIRCUIT_CLOSED
+from utils.history_summary import HistorySummary
+from utils.priority_work import (
+    PriorityWorkQueue, LatencyTracker,
+    PRIORITY_CRISIS, PRIORITY_HIGH, PRIORITY_MEDIUM, PRIORITY_LOW
+)
 
 # Initialize core components
 metta_manager = MeTTaManager()
 asi_client = ASIClient()
 crisis_detector = CrisisDetector()
+outbound = get_outbound_dispatcher()
 
 # ==================== AGENT ADDRESSES ====================
 SOMA_ENGINE_ADDRESS = "agent1qtqs2gzljl90mlcjenxj6nxjd2gkhpptdy8nsaz7terv5s8h8gkf2z5ya4s"
 SORO_ORCHESTRATOR_ADDRESS = "agent1q2a7v3rshca8knfzltm2q6uqxghx8fp02k7qg3cql9tdztgea539uuuch76"
 
+# Reply deadline for the orchestrator/SOMA/ASI fan-out (seconds)
+MESSAGE_DEADLINE = float(os.getenv("MESSAGE_DEADLINE", "8"))
+# How long to wait for SOMA's analysis before asking ASI directly (seconds)
+SOMA_REPLY_TIMEOUT = float(os.getenv("SOMA_REPLY_TIMEOUT", "3"))
+# Intervention requests for one session within this window are merged (seconds)
+INTERVENTION_COALESCE_WINDOW = float(os.getenv("INTERVENTION_COALESCE_WINDOW", "0.5"))
+
+# ==================== PRIORITY WORK QUEUE ====================
+CHAT_WORKERS = int(os.getenv("CHAT_WORKERS", "8"))
+
+PRIORITY_BY_RISK = {
+    RiskLevel.CRISIS.value: PRIORITY_CRISIS,
+    RiskLevel.HIGH.value: PRIORITY_HIGH,
+    RiskLevel.MEDIUM.value: PRIORITY_MEDIUM,
+    RiskLevel.LOW.value: PRIORITY_LOW
+}
+
+# Chat messages are acknowledged inline and answered by these workers;
+# HIGH and CRISIS replies start at once, even while every worker is busy
+chat_work_queue = PriorityWorkQueue(workers=CHAT_WORKERS, bypass_priority=PRIORITY_HIGH)
+# Message arrival to reply sent, per risk class
+response_latency = LatencyTracker()
+
+# ==================== ADMISSION CONTROL ====================
+# Per-sender and global token buckets (messages/second, burst size)
+SENDER_RATE = float(os.getenv("SENDER_RATE", "0.5"))
+SENDER_BURST = float(os.getenv("SENDER_BURST", "5"))
+GLOBAL_RATE = float(os.getenv("GLOBAL_RATE", "20"))
+GLOBAL_BURST = float(os.getenv("GLOBAL_BURST", "40"))
+MAX_CONCURRENT_ANALYSES = int(os.getenv("MAX_CONCURRENT_ANALYSES", "8"))
+# How long a message may queue for an analysis slot before it's answered without one
+ANALYSIS_QUEUE_TIMEOUT = float(os.getenv("ANALYSIS_QUEUE_TIMEOUT", "2"))
+
+admission_control = AdmissionController(
+    sender_rate=SENDER_RATE,
+    sender_burst=SENDER_BURST,
+    global_rate=GLOBAL_RATE,
+    global_burst=GLOBAL_BURST,
+    max_concurrent_analyses=MAX_CONCURRENT_ANALYSES
+)
+
+# Compact role codes for the history ring buffer
+ROLE_USER = 0
+ROLE_ASSISTANT = 1
+ROLE_CODES = {"user": ROLE_USER, "assistant": ROLE_ASSISTANT}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+
 class UserSession:
+    """Per-user state, sized for tens of thousands of live sessions.
+
+    History is a fixed-capacity ring buffer of (role code, epoch, content);
+    the user-only view is maintained as messages enter and leave the ring.
+    """
+    
+    __slots__ = (
+        'session_id', 'created_at', 'user_patterns', 'risk_level',
+        'intervention_history', 'last_orchestrator_contact',
+        '_contents', '_roles', '_timestamps', '_head', '_size',
+        '_user_view', '_user_view_cache', 'history_summary'
+    )
+    
+    HISTORY_CAPACITY = 20
+    INTERVENTION_HISTORY_LIMIT = 50
+    
     def __init__(self, session_id: str):
         self.session_id = session_id
-        self.created_at = datetime.now(timezone.utc)
-        self.message_history: List[Dict] = []
+        self.created_at = time.time()
         self.user_patterns: List[str] = []
         self.risk_level = RiskLevel.LOW
-        self.intervention_history: List[str] = []
-        self.last_orchestrator_contact = None
+        self.intervention_history: Deque[str] = deque(maxlen=self.INTERVENTION_HISTORY_LIMIT)
+        self.last_orchestrator_contact: Optional[float] = None
+        
+        self._contents: List[Optional[str]] = [None] * self.HISTORY_CAPACITY
+        self._roles = bytearray(self.HISTORY_CAPACITY)
+        self._timestamps = array('d', bytes(8 * self.HISTORY_CAPACITY))
+        self._head = 0  # next slot to write
+        self._size = 0
+        self._user_view: Deque[str] = deque()
+        self._user_view_cache: Optional[Tuple[str, ...]] = None
+        # Digest of every user message so far - stands in for long raw history in ASI prompts
+        self.history_summary = HistorySummary()
 
     def add_message(self, role: str, content: str):
-        self.message_history.append({
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now(timezone.utc)
-        })
+        self._append(ROLE_CODES[role], content, time.time())
+
+    def _append(self, role_code: int, content: str, timestamp: float):
+        slot = self._head
         
-        if len(self.message_history) > 20:
-            self.message_history = self.message_history[-20:]
+        if self._size == self.HISTORY_CAPACITY:
+            # Overwriting the oldest entry; if it was a user message it is
+            # also the oldest entry of the user-only view
+            if self._roles[slot] == ROLE_USER:
+                self._user_view.popleft()
+                self._user_view_cache = None
+        else:
+            self._size += 1
+        
+        self._contents[slot] = content
+        self._roles[slot] = role_code
+        self._timestamps[slot] = timestamp
+        self._head = (slot + 1) % self.HISTORY_CAPACITY
+        
+        if role_code == ROLE_USER:
+            self._user_view.append(content)
+            self._user_view_cache = None
+
+    @property
+    def message_count(self) -> int:
+        return self._size
+
+    def user_messages(self) -> Tuple[str, ...]:
+        """User-only history, oldest first; cached until a user message changes it"""
+        if self._user_view_cache is None:
+            self._user_view_cache = tuple(self._user_view)
+        return self._user_view_cache
+
+    def user_messages_before(self, message: str) -> Tuple[str, ...]:
+        """User history excluding ``message`` when it is the latest entry"""
+        history = self.user_messages()
+        return history[:-1] if history and history[-1] == message else history
+
+    @property
+    def message_history(self) -> List[Dict]:
+        """Expanded history dicts, oldest first (for debugging and export)"""
+        start = (self._head - self._size) % self.HISTORY_CAPACITY
+        history = []
+        for offset in range(self._size):
+            slot = (start + offset) % self.HISTORY_CAPACITY
+            history.append({
+                'role': ROLE_NAMES[self._roles[slot]],
+                'content': self._contents[slot],
+                'timestamp': datetime.fromtimestamp(self._timestamps[slot], timezone.utc)
+            })
+        return history
+
+    def to_record(self) -> Dict:
+        """JSON-safe snapshot for the persistent session backend"""
+        start = (self._head - self._size) % self.HISTORY_CAPACITY
+        history = []
+        for offset in range(self._size):
+            slot = (start + offset) % self.HISTORY_CAPACITY
+            history.append([self._roles[slot], self._timestamps[slot], self._contents[slot]])
+        return {
+            'created_at': self.created_at,
+            'risk_level': self.risk_level.value,
+            'user_patterns': list(self.user_patterns),
+            'intervention_history': list(self.intervention_history),
+            'last_orchestrator_contact': self.last_orchestrator_contact,
+            'history': history,
+            'history_summary': self.history_summary.to_record()
+        }
+
+    @classmethod
+    def from_record(cls, session_id: str, data: Dict) -> 'UserSession':
+        session = cls(session_id)
+        session.created_at = data['created_at']
+        session.risk_level = RiskLevel(data['risk_level'])
+        session.user_patterns = list(data['user_patterns'])
+        session.intervention_history.extend(data['intervention_history'])
+        session.last_orchestrator_contact = data['last_orchestrator_contact']
+        for role_code, timestamp, content in data['history']:
+            session._append(role_code, content, timestamp)
+        if 'history_summary' in data:
+            session.history_summary = HistorySummary.from_record(data['history_summary'])
+        return session
 
 # Initialize SoroMind Core Agent WITH PORT 8001
 soromind = Agent(
@@ -85,7 +252,9 @@ soromind = Agent(
     seed=os.getenv("SOROMIND_SEED", "soromind_core_secret_phrase_001"),
     port=8001,  # CRITICAL FIX: Match ngrok port
     endpoint=["https://couponless-dottie-uninstrumental.ngrok-free.dev/submit"],
-    mailbox=True
+    mailbox=True,
+    # SOMA replies must be handled while a chat handler awaits them
+    handle_messages_concurrently=True
 )
 
 print("=" * 60)
@@ -98,13 +267,97 @@ print(f"🤝 SOMA Engine: {SOMA_ENGINE_ADDRESS[:16]}...")
 print(f"💫 SORO Orchestrator: {SORO_ORCHESTRATOR_ADDRESS[:16]}...")
 print("=" * 60)
 
-# Active user sessions
-user_sessions: Dict[str, UserSession] = {}
+# ==================== SESSION STORE ====================
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))  # seconds without a message
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+SESSION_SWEEP_INTERVAL = 60.0
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "5"))
+# Sessions survive restarts in this SQLite file; set it empty to keep them in memory only
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", str(project_root / "soromind_sessions.db"))
+
+# Active user sessions - bounded by idle TTL and LRU capacity, written behind to SQLite
+user_sessions: SessionStore[UserSession] = SessionStore(
+    max_sessions=SESSION_MAX_COUNT,
+    idle_ttl=SESSION_IDLE_TTL,
+    backend=SQLiteSessionBackend(SESSION_DB_PATH) if SESSION_DB_PATH else None,
+    serializer=UserSession.to_record,
+    deserializer=UserSession.from_record
+)
+
+# Evicted sessions waiting for their closure alert (sent from the sweeper)
+sessions_pending_closure: List[UserSession] = []
+
+def queue_session_closure(session_id: str, session: UserSession, reason: str):
+    """Eviction callback - clients rarely send EndSessionContent"""
+    print(f"🧹 SoroMind: Session {session_id[:8]}... evicted ({reason})")
+    if reason == EVICTED_CAPACITY and user_sessions.backend is not None:
+        # Spilled to SQLite and restored on the sender's next message - not closed
+        return
+    sessions_pending_closure.append(session)
+
+user_sessions.add_eviction_callback(queue_session_closure)
 
 # ==================== ORCHESTRATOR COMMUNICATION FUNCTIONS ====================
 
-async def send_to_orchestrator(ctx: Context, session: UserSession, user_message: str, 
-                             patterns: List[str], risk_level: RiskLevel) -> bool:
+class PendingIntervention(NamedTuple):
+    ctx: Context
+    session: UserSession
+    user_message: str
+    patterns: List[str]
+    risk_level: RiskLevel
+
+def merge_interventions(queued: PendingIntervention, latest: PendingIntervention) -> PendingIntervention:
+    """Union of patterns and the highest risk; latest message and context win"""
+    return latest._replace(
+        patterns=list(dict.fromkeys(queued.patterns + latest.patterns)),
+        risk_level=max(queued.risk_level, latest.risk_level, key=lambda risk: RISK_ORDER.index(RiskLevel(risk)))
+    )
+
+async def deliver_coalesced_intervention(session_id: str, pending: PendingIntervention) -> bool:
+    return await deliver_intervention_request(
+        pending.ctx, pending.session, pending.user_message, pending.patterns, pending.risk_level
+    )
+
+# One InterventionRequest per session per window, however many stages asked for one
+intervention_queue: CoalescingQueue[str, PendingIntervention] = CoalescingQueue(
+    window=INTERVENTION_COALESCE_WINDOW,
+    merge=merge_interventions,
+    deliver=deliver_coalesced_intervention
+)
+
+def queue_for_orchestrator(ctx: Context, session: UserSession, user_message: str,
+                           patterns: List[str], risk_level: RiskLevel, hold: bool = False) -> asyncio.Future:
+    """Queue an intervention request for the Orchestrator; returns the shared delivery future.
+
+    HIGH and CRISIS requests are delivered immediately (with anything already
+    queued for the session); lower risks are coalesced and delivered when
+    the session's window closes - or, with ``hold``, when it is released.
+    """
+    urgent = risk_level in (RiskLevel.HIGH, RiskLevel.CRISIS)
+    return intervention_queue.submit(
+        session.session_id,
+        PendingIntervention(ctx, session, user_message, list(patterns), risk_level),
+        urgent=urgent,
+        hold=hold
+    )
+
+async def send_to_orchestrator(ctx: Context, session: UserSession, user_message: str,
+                               patterns: List[str], risk_level: RiskLevel) -> bool:
+    """Queue an intervention request and return True once it is delivered.
+
+    Cancelling the wait leaves delivery running.
+    """
+    return await asyncio.shield(queue_for_orchestrator(ctx, session, user_message, patterns, risk_level))
+
+async def await_orchestrator_delivery(delivery: asyncio.Future, timeout: float) -> bool:
+    """Whether a queued request was delivered within timeout; delivery carries on regardless"""
+    try:
+        return bool(await asyncio.wait_for(asyncio.shield(delivery), max(timeout, 0.0)))
+    except Exception:
+        return False
+
+async def deliver_intervention_request(ctx: Context, session: UserSession, user_message: str, 
+                                       patterns: List[str], risk_level: RiskLevel) -> bool:
     """Send intervention request to SORO Orchestrator - FIXED timestamp"""
     try:
         print(f"💫 SoroMind: Preparing Orchestrator request...")
@@ -130,39 +383,26 @@ async def send_to_orchestrator(ctx: Context, session: UserSession, user_message:
             timestamp=datetime.now(timezone.utc).isoformat(),  # FIX: Convert to ISO string
             preferences=preferences,
             session_context={
-                "message_count": len(session.message_history),
+                "message_count": session.message_count,
                 "previous_patterns": session.user_patterns
             }
         )
         
-        # Send with retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                await ctx.send(SORO_ORCHESTRATOR_ADDRESS, intervention_request)
-                session.last_orchestrator_contact = datetime.now(timezone.utc)
-                
-                ctx.logger.info(f"📨 Sent intervention request to Orchestrator (attempt {attempt + 1})")
-                print(f"✅ SoroMind: SUCCESS - Sent to Orchestrator!")
-                print(f"   📍 Target: {SORO_ORCHESTRATOR_ADDRESS[:16]}...")
-                print(f"   🔄 Attempt: {attempt + 1}/{max_retries}")
-                
-                # Log the interaction
-                session.intervention_history.append(
-                    f"Orchestrator contact: {risk_level} risk - {datetime.now().strftime('%H:%M:%S')}"
-                )
-                
-                return True
-                
-            except Exception as send_error:
-                ctx.logger.warning(f"⚠️ Orchestrator send attempt {attempt + 1} failed: {send_error}")
-                print(f"⚠️ SoroMind: Orchestrator attempt {attempt + 1} failed - {send_error}")
-                
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(1)  # Wait before retry
-                    continue
-                else:
-                    raise send_error
+        # Retries with jittered backoff happen in the outbound dispatcher
+        if not await outbound.send(ctx, SORO_ORCHESTRATOR_ADDRESS, intervention_request):
+            raise RuntimeError("delivery failed after retries")
+        
+        session.last_orchestrator_contact = time.time()
+        ctx.logger.info(f"📨 Sent intervention request to Orchestrator")
+        print(f"✅ SoroMind: SUCCESS - Sent to Orchestrator!")
+        print(f"   📍 Target: {SORO_ORCHESTRATOR_ADDRESS[:16]}...")
+        
+        # Log the interaction
+        session.intervention_history.append(
+            f"Orchestrator contact: {risk_level} risk - {datetime.now().strftime('%H:%M:%S')}"
+        )
+        
+        return True
                     
     except Exception as e:
         ctx.logger.error(f"❌ ALL Orchestrator attempts failed: {e}")
@@ -175,16 +415,23 @@ async def send_to_orchestrator(ctx: Context, session: UserSession, user_message:
         )
         return False
 
-async def send_to_soma_engine(ctx: Context, session: UserSession, user_message: str) -> bool:
+async def send_to_soma_engine(ctx: Context, session: UserSession, user_message: str,
+                              request_id: str,
+                              prior_messages: Optional[Tuple[str, ...]] = None) -> bool:
     """Send pattern analysis request to SOMA Engine"""
     try:
         analysis_request = PatternAnalysisRequest(
             user_message=user_message,
-            session_history=[msg['content'] for msg in session.message_history if msg['role'] == 'user'],
-            user_id=session.session_id
+            session_history=(
+                session.user_messages() if prior_messages is None else prior_messages + (user_message,)
+            ),
+            user_id=session.session_id,
+            request_id=request_id
         )
         
-        await ctx.send(SOMA_ENGINE_ADDRESS, analysis_request)
+        delivery = outbound.submit(ctx, SOMA_ENGINE_ADDRESS, analysis_request)
+        if delivery.done() and not delivery.result():
+            return False
         ctx.logger.info(f"🔍 Sent pattern analysis to SOMA Engine")
         print(f"🔍 SoroMind: Sent to SOMA Engine for pattern analysis")
         return True
@@ -194,54 +441,91 @@ async def send_to_soma_engine(ctx: Context, session: UserSession, user_message:
         print(f"⚠️ SoroMind: SOMA Engine communication failed - {e}")
         return False
 
-# ==================== ENHANCED MESSAGE PROCESSING ====================
-
-async def enhanced_crisis_detection(message: str, session: UserSession) -> Tuple[Dict, List[str]]:
-    """Enhanced crisis detection with pattern extraction"""
-    # 1. Use crisis detector
-    crisis_assessment = crisis_detector.detect_crisis_indicators(message)
-    
-    # 2. Extract patterns from message for Orchestrator
-    patterns = extract_patterns_from_message(message, crisis_assessment)
-    
-    return crisis_assessment, patterns
+# ==================== SOMA REQUEST/REPLY ====================
+
+# SOMA replies awaiting their request, keyed by request id
+soma_replies: PendingReplies[PatternAnalysisResponse] = PendingReplies(default_timeout=SOMA_REPLY_TIMEOUT)
+
+soma_proto = Protocol(name="PatternAnalysis", version="1.0.0")
+
+@soma_proto.on_message(PatternAnalysisResponse)
+async def handle_soma_analysis(ctx: Context, sender: str, msg: PatternAnalysisResponse):
+    """Route SOMA's analysis to the message handler waiting on it"""
+    if sender != SOMA_ENGINE_ADDRESS:
+        ctx.logger.warning(f"⚠️ Ignoring pattern analysis from unknown sender {sender[:16]}...")
+        return
+    if msg.request_id is None:
+        # Uncorrelated - nobody is waiting on it, so it is neither matched nor late
+        ctx.logger.debug("Ignoring SOMA reply without a request id")
+        return
+    if not soma_replies.resolve(msg.request_id, msg):
+        print(f"⌛ SoroMind: SOMA reply {str(msg.request_id)[:8]}... arrived after its deadline")
+
+async def request_soma_analysis(ctx: Context, session: UserSession, user_message: str,
+                                prior_messages: Optional[Tuple[str, ...]] = None) -> Optional[PatternAnalysisResponse]:
+    """Send to SOMA Engine and await its correlated reply within SOMA_REPLY_TIMEOUT"""
+    request_id = soma_replies.register()
+    if not await send_to_soma_engine(ctx, session, user_message, request_id, prior_messages):
+        soma_replies.discard(request_id)
+        return None
+    return await soma_replies.wait(request_id)
+
+def analysis_from_soma(soma_analysis: PatternAnalysisResponse) -> PatternAnalysisResult:
+    """Merge SOMA's cognitive and enhanced patterns into one analysis result"""
+    patterns = list(dict.fromkeys(soma_analysis.patterns + soma_analysis.enhanced_patterns))
+    return PatternAnalysisResult(
+        patterns=patterns,
+        confidence=soma_analysis.analysis_confidence,
+        risk_assessment=soma_analysis.risk_level,
+        suggested_interventions=[]
+    )
 
-def extract_patterns_from_message(message: str, crisis_assessment: Dict) -> List[str]:
-    """Extract patterns from user message for Orchestrator coordination"""
-    message_lower = message.lower()
-    patterns = []
-    
-    # Add crisis indicators as patterns
-    patterns.extend(crisis_assessment.get('crisis_indicators', []))
-    patterns.extend(crisis_assessment.get('high_risk_indicators', []))
-    
-    # Content-based pattern extraction
-    if any(word in message_lower for word in ['academic', 'study', 'exam', 'test', 'school', 'college']):
-        patterns.append('academic_stress')
-    
-    if any(word in message_lower for word in ['anxious', 'worry', 'nervous', 'panic', 'overwhelmed']):
-        patterns.append('anxiety')
-    
-    if any(word in message_lower for word in ['sad', 'depressed', 'hopeless', 'empty', 'numb']):
-        patterns.append('depression')
-    
-    if any(word in message_lower for word in ['sleep', 'tired', 'exhausted', 'insomnia']):
-        patterns.append('sleep_issues')
-    
-    if any(word in message_lower for word in ['alone', 'lonely', 'isolated', 'no friends']):
-        patterns.append('loneliness')
-    
-    if any(word in message_lower for word in ['stress', 'pressure', 'overwhelmed']):
-        patterns.append('stress')
-    
-    # Remove duplicates and ensure we have patterns
-    patterns = list(set(patterns))
-    
-    # If no patterns detected, add general emotional distress
-    if not patterns and len(message.split()) > 3:
-        patterns.append('emotional_distress')
-    
-    return patterns
+def streamed_risk_router(ctx: Context, session: UserSession, message: str):
+    """on_risk callback: escalate to the Orchestrator as soon as ASI reports HIGH/CRISIS"""
+    async def route(risk_level) -> bool:
+        risk_level = RiskLevel(risk_level)
+        if RISK_ORDER.index(risk_level) < RISK_ORDER.index(RiskLevel.HIGH):
+            return False
+        if RISK_ORDER.index(risk_level) > RISK_ORDER.index(RiskLevel(session.risk_level)):
+            print(f"⚡ SoroMind: ASI reports {risk_level.value} risk - escalating before the analysis completes")
+            session.risk_level = risk_level
+            run_detached(
+                send_to_orchestrator(ctx, session, message, ['asi_risk_escalation'], risk_level),
+                'orchestrator_escalation'
+            )
+        # A crisis reading is answered with crisis resources - the patterns aren't needed
+        return risk_level == RiskLevel.CRISIS
+    return route
+
+async def analyze_message(ctx: Context, session: UserSession, message: str,
+                          prior_messages: Optional[Tuple[str, ...]] = None,
+                          risk_level: Optional[RiskLevel] = None) -> Optional[PatternAnalysisResult]:
+    """SOMA's analysis when it answers in time; a direct ASI call otherwise.
+
+    ``prior_messages`` is the user history as of the message's arrival;
+    ``risk_level`` is the lexicon's reading, so ASI doesn't assess it again.
+    Returns None when every analysis slot stays busy past ANALYSIS_QUEUE_TIMEOUT.
+    """
+    if prior_messages is None:
+        prior_messages = session.user_messages_before(message)
+    if not await admission_control.acquire_analysis(ANALYSIS_QUEUE_TIMEOUT):
+        print(f"🚦 SoroMind: {admission_control.analyses_in_flight} analyses in flight - skipping analysis")
+        return None
+    try:
+        soma_analysis = await request_soma_analysis(ctx, session, message, prior_messages)
+        if soma_analysis is not None and 'analysis_error' not in soma_analysis.patterns:
+            print(f"🔍 SoroMind: Using SOMA Engine analysis")
+            return analysis_from_soma(soma_analysis)
+        
+        print(f"⌛ SoroMind: No SOMA analysis - asking ASI directly")
+        return await asi_client.stream_mental_patterns(
+            message, prior_messages,
+            on_risk=streamed_risk_router(ctx, session, message),
+            summary=session.history_summary,
+            risk_level=risk_level
+        )
+    finally:
+        admission_control.release_analysis()
 
 # ==================== CHAT PROTOCOL HANDLER ====================
 
@@ -250,6 +534,7 @@ chat_proto = Protocol(spec=chat_protocol_spec)
 @chat_proto.on_message(ChatMessage)
 async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
     """Handle incoming chat messages with GUARANTEED Orchestrator integration"""
+    received_at = time.perf_counter()
     ctx.logger.info(f"📨 Received chat message from {sender}")
     print(f"💬 CHAT PROTOCOL TRIGGERED - Message from: {sender}")
     
@@ -271,6 +556,8 @@ async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
             ctx.logger.info(f"🆕 New chat session started with {sender}")
             session_id = str(uuid4())
             user_sessions[session_id] = UserSession(session_id)
+            # Later messages from this sender continue the new session
+            user_sessions.bind_sender(sender, session_id)
             continue
             
         elif isinstance(item, TextContent):
@@ -278,34 +565,105 @@ async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
             ctx.logger.info(f"💬 Processing user message: {user_message}")
             print(f"💬 USER INPUT: '{user_message}'")
             
-            # Get or create session
-            if not session_id:
-                session_id = str(uuid4())
-                user_sessions[session_id] = UserSession(session_id)
+            # Get or create session - repeat senders reuse their active session
+            session = user_sessions.get(session_id) if session_id else None
+            if session is None:
+                # Reload a persisted session off the event loop before the sender lookup
+                await user_sessions.restore_for_sender(sender)
+                session_id, session = user_sessions.get_or_create_for_sender(sender, UserSession)
             
-            session = user_sessions[session_id]
+            # Jobs can run out of arrival order, so fix this message's history now
+            prior_messages = session.user_messages()
             session.add_message("user", user_message)
             
-            # Process the message with GUARANTEED Orchestrator integration
-            response = await process_user_message_with_orchestrator(ctx, user_message, session)
+            # Admission control - crisis messages are always admitted in full
+            message_analysis = MessageAnalysis(user_message)
+            admission = admission_control.admit(sender, message_analysis.immediate_action_required)
+            if admission == ADMIT_DEGRADED:
+                print(f"🚦 SoroMind: Rate limited {sender[:16]}... - answering without analysis")
             
-            # Send response back
-            response_msg = ChatMessage(
-                timestamp=datetime.now(timezone.utc),
-                msg_id=str(uuid4()),
-                content=[TextContent(type="text", text=response)]
+            # Schedule by the fast crisis pre-check - HIGH/CRISIS replies skip the worker pool
+            risk_class = RiskLevel(message_analysis.risk_level).value
+            chat_work_queue.submit(
+                PRIORITY_BY_RISK[risk_class],
+                partial(
+                    respond_to_message, ctx, sender, session_id, session, user_message,
+                    message_analysis, admission != ADMIT_DEGRADED, received_at, prior_messages
+                ),
+                label=risk_class
             )
             
-            await ctx.send(sender, response_msg)
-            session.add_message("assistant", response)
-            print(f"💬 AGENT RESPONSE SENT: '{response[:100]}...'")
-            
         elif isinstance(item, EndSessionContent):
             ctx.logger.info(f"🔚 Chat session ended with {sender}")
+            session_id = session_id or user_sessions.session_id_for_sender(sender)
             if session_id and session_id in user_sessions:
                 # Send final update to Orchestrator
-                await send_session_closure_to_orchestrator(ctx, user_sessions[session_id])
-                del user_sessions[session_id]
+                await send_session_closure_to_orchestrator(ctx, user_sessions.pop(session_id))
+
+async def respond_to_message(ctx: Context, sender: str, session_id: str, session: UserSession,
+                             user_message: str, message_analysis: MessageAnalysis,
+                             allow_analysis: bool, received_at: float,
+                             prior_messages: Tuple[str, ...]):
+    """Background job: process one chat message and send the reply"""
+    # Process the message with GUARANTEED Orchestrator integration
+    response = await process_user_message_with_orchestrator(
+        ctx, user_message, session, message_analysis,
+        allow_analysis=allow_analysis, prior_messages=prior_messages
+    )
+    
+    # Send response back
+    response_msg = ChatMessage(
+        timestamp=datetime.now(timezone.utc),
+        msg_id=str(uuid4()),
+        content=[TextContent(type="text", text=response)]
+    )
+    
+    await ctx.send(sender, response_msg)
+    response_latency.record(RiskLevel(message_analysis.risk_level).value, time.perf_counter() - received_at)
+    session.add_message("assistant", response)
+    # Folded after the reply, so the summary only ever covers earlier messages
+    session.history_summary.fold(message_analysis.patterns, message_analysis.risk_level)
+    user_sessions.mark_dirty(session_id)
+    print(f"💬 AGENT RESPONSE SENT: '{response[:100]}...'")
+
+@soromind.on_interval(period=SESSION_SWEEP_INTERVAL)
+async def sweep_idle_sessions(ctx: Context):
+    """Evict idle sessions and send their closure alerts to the Orchestrator"""
+    evicted = user_sessions.sweep()
+    if evicted:
+        ctx.logger.info(f"🧹 Evicted {evicted} idle sessions ({len(user_sessions)} active)")
+    if outbound.queue_depth():
+        ctx.logger.info(f"📮 Outbound queues: {outbound.metrics()}")
+    if asi_client.breaker.state != CIRCUIT_CLOSED:
+        ctx.logger.info(f"⚡ ASI circuit: {asi_client.breaker.report()}")
+    if asi_client.history_tokens.stats['summarized']:
+        ctx.logger.info(f"✂️ ASI history tokens: {asi_client.history_tokens.report()}")
+    if response_latency.report():
+        ctx.logger.info(f"⏱️ Time to first response: {response_latency.report()}")
+    
+    while sessions_pending_closure:
+        await send_session_closure_to_orchestrator(ctx, sessions_pending_closure.pop(0))
+
+@soromind.on_interval(period=SESSION_FLUSH_INTERVAL)
+async def flush_sessions(ctx: Context):
+    """Write-behind: persist sessions touched since the last flush in one batch"""
+    try:
+        written = await user_sessions.flush_async()
+        if written:
+            ctx.logger.debug(f"💾 Persisted {written} session changes")
+    except Exception as e:
+        print(f"⚠️ Session flush failed: {e}")
+
+@soromind.on_event("shutdown")
+async def flush_sessions_on_shutdown(ctx: Context):
+    """Deliver queued requests and persist pending session changes before the agent exits"""
+    await chat_work_queue.join(timeout=10.0)
+    await intervention_queue.flush()
+    await outbound.drain(timeout=5.0)
+    user_sessions.flush()
+    await asi_client.aclose()
+    if user_sessions.backend is not None:
+        user_sessions.backend.close()
 
 async def send_session_closure_to_orchestrator(ctx: Context, session: UserSession):
     """Notify Orchestrator when session ends"""
@@ -315,10 +673,10 @@ async def send_session_closure_to_orchestrator(ctx: Context, session: UserSessio
             risk_level=session.risk_level,
             detected_patterns=session.user_patterns,
             recommended_actions=["SESSION_CLOSED"],
-            timestamp=datetime.now(timezone.utc)
+            timestamp=datetime.now(timezone.utc).isoformat()
         )
-        await ctx.send(SORO_ORCHESTRATOR_ADDRESS, closure_alert)
-        print(f"📤 SoroMind: Sent session closure to Orchestrator")
+        outbound.submit(ctx, SORO_ORCHESTRATOR_ADDRESS, closure_alert)
+        print(f"📤 SoroMind: Queued session closure for Orchestrator")
     except Exception as e:
         print(f"⚠️ Could not send session closure: {e}")
 
@@ -329,26 +687,36 @@ async def handle_acknowledgement(ctx: Context, sender: str, msg: ChatAcknowledge
 
 # ==================== MAIN MESSAGE PROCESSING ====================
 
-async def process_user_message_with_orchestrator(ctx: Context, message: str, session: UserSession) -> str:
-    """Process user message with GUARANTEED Orchestrator integration"""
+async def process_user_message_with_orchestrator(ctx: Context, message: str, session: UserSession,
+                                                 message_analysis: Optional[MessageAnalysis] = None,
+                                                 allow_analysis: bool = True,
+                                                 prior_messages: Optional[Tuple[str, ...]] = None) -> str:
+    """Process user message with GUARANTEED Orchestrator integration.
+
+    With ``allow_analysis=False`` (admission control shedding load) the reply
+    comes from intent templates or the fallback, with no SOMA/ASI analysis.
+    ``prior_messages`` is the user history when the message arrived.
+    """
     
     print(f"🔍 SoroMind: Starting message processing with Orchestrator integration...")
     
-    # ==================== EMERGENCY BYPASS ====================
-    message_lower = message.lower().strip()
-    emergency_phrases = [
-        'kill myself', 'suicide', 'end my life', 'want to die', 'better off dead',
-        'harm myself', 'end it all', 'feel like killing myself', 'want to kill myself'
-    ]
+    # Normalize, tokenize and classify ONCE - every stage below reads from this
+    if message_analysis is None:
+        message_analysis = MessageAnalysis(message)
     
-    # DIRECT STRING MATCHING - bypasses crisis detector entirely
-    if any(phrase in message_lower for phrase in emergency_phrases):
+    # ==================== EMERGENCY BYPASS ====================
+    # SHARED CLASSIFICATION - bypasses the full crisis handling entirely
+    if message_analysis.is_crisis:
         ctx.logger.warning(f"🚨 EMERGENCY BYPASS TRIGGERED: {message}")
         print(f"🚨 SoroMind: EMERGENCY BYPASS - Direct crisis phrase detected!")
         
-        # SEND EMERGENCY ALERT TO ORCHESTRATOR
+        # SEND EMERGENCY ALERT TO ORCHESTRATOR - delivered immediately, without
+        # holding the crisis resources back while it retries
         emergency_patterns = ['suicidal_ideation', 'crisis_emergency', 'immediate_risk']
-        await send_to_orchestrator(ctx, session, message, emergency_patterns, RiskLevel.CRISIS)
+        run_detached(
+            send_to_orchestrator(ctx, session, message, emergency_patterns, RiskLevel.CRISIS),
+            'orchestrator_emergency'
+        )
         
         return """🚨 **I'm very concerned about what you're sharing.** Your safety is the most important thing right now.
 
@@ -364,63 +732,109 @@ You don't have to go through this alone. People care about you and want to help.
 
 **Stay on the line with me while you reach out for help.**"""
     
+    # Initial intervention request, held open for the analysis's updated patterns
+    orchestrator_delivery: Optional[asyncio.Future] = None
     try:
         # ==================== ENHANCED CRISIS DETECTION ====================
-        crisis_assessment, extracted_patterns = await enhanced_crisis_detection(message, session)
+        crisis_assessment = message_analysis.assessment
+        extracted_patterns = message_analysis.patterns
         session.risk_level = crisis_assessment['risk_level']
+        immediate_action = crisis_assessment['immediate_action_required']
         
         print(f"🔍 Crisis assessment: {crisis_assessment}")
         print(f"🔍 Extracted patterns: {extracted_patterns}")
         
-        # ==================== GUARANTEED ORCHESTRATOR COMMUNICATION ====================
+        # Intent templates are local, so we know up front whether ASI is needed
+        intent_response = None
+        if not immediate_action:
+            intent_response = await generate_intent_based_response(ctx, message, session, message_analysis)
+        
+        # ==================== CONCURRENT FAN-OUT ====================
+        # Orchestrator, SOMA and ASI are independent - run them together so the
+        # reply waits on the slowest stage, not the sum, and never past the deadline
         print(f"💫 SoroMind: SENDING TO ORCHESTRATOR...")
-        orchestrator_success = await send_to_orchestrator(
-            ctx, session, message, extracted_patterns, session.risk_level
-        )
+        stages = FanOut(deadline=MESSAGE_DEADLINE)
+        if immediate_action:
+            # Urgent - delivered at once; a late send keeps retrying in the background
+            stages.add('orchestrator', send_to_orchestrator(
+                ctx, session, message, extracted_patterns, session.risk_level
+            ), detach_late=True)
+        elif intent_response is not None:
+            # Template replies don't mention coordination - don't hold them for delivery
+            queue_for_orchestrator(ctx, session, message, extracted_patterns, session.risk_level)
+        else:
+            # Not awaited yet: the updated patterns join this request once the analysis returns
+            orchestrator_delivery = queue_for_orchestrator(
+                ctx, session, message, extracted_patterns, session.risk_level, hold=True
+            )
+        if immediate_action:
+            stages.add('crisis_alert', trigger_crisis_alert(ctx, session, crisis_assessment))
+        elif intent_response is None and allow_analysis:
+            # SOMA's reply is awaited and merged - no second ASI call unless it misses
+            stages.add('analysis', analyze_message(
+                ctx, session, message, prior_messages, message_analysis.risk_level
+            ))
+        
+        await stages.run()
+        ctx.logger.info(f"⏱️ Stage timings: {stages.report()}")
         
+        orchestrator_success = stages.get('orchestrator', False)
+        if orchestrator_delivery is not None:
+            # ==================== SEND UPDATED PATTERNS TO ORCHESTRATOR ====================
+            analysis = stages.get('analysis')
+            if analysis is not None and analysis.patterns and analysis.patterns != extracted_patterns:
+                print(f"💫 SoroMind: Adding UPDATED patterns to the Orchestrator request...")
+                queue_for_orchestrator(ctx, session, message, analysis.patterns, session.risk_level)
+            intervention_queue.release(session.session_id, orchestrator_delivery)
+            orchestrator_success = await await_orchestrator_delivery(
+                orchestrator_delivery, MESSAGE_DEADLINE - stages.elapsed
+            )
         if orchestrator_success:
-            print(f"✅ SoroMind: Orchestrator coordination INITIATED")
-        else:
+            print(f"✅ SoroMind: Orchestrator coordination CONFIRMED")
+        elif intent_response is None:
             print(f"⚠️ SoroMind: Continuing WITHOUT Orchestrator coordination")
         
-        # ==================== SEND TO SOMA ENGINE ====================
-        if not crisis_assessment['immediate_action_required']:
-            soma_success = await send_to_soma_engine(ctx, session, message)
-            if soma_success:
-                print(f"🔍 SoroMind: SOMA Engine analysis REQUESTED")
-        
         # ==================== HANDLE CRISIS SITUATIONS ====================
-        if crisis_assessment['immediate_action_required']:
+        if immediate_action:
             ctx.logger.warning(f"🚨 CRISIS DETECTED: {message}")
             crisis_response = crisis_detector.get_crisis_response(crisis_assessment)
             
-            # Send crisis alert to Orchestrator (even if initial send failed)
-            if not orchestrator_success:
-                await send_to_orchestrator(ctx, session, message, extracted_patterns, RiskLevel.CRISIS)
+            # Send crisis alert to Orchestrator if the initial send failed
+            # (a late send is still retrying and needs no second copy)
+            if stages.ok('orchestrator') and not orchestrator_success:
+                run_detached(
+                    send_to_orchestrator(ctx, session, message, extracted_patterns, RiskLevel.CRISIS),
+                    'orchestrator_crisis'
+                )
             
-            await trigger_crisis_alert(ctx, session, crisis_assessment)
             return format_crisis_response(crisis_response)
 
         # ==================== INTENT-BASED RESPONSE ====================
-        intent_response = await generate_intent_based_response(ctx, message, session)
         if intent_response:
             return intent_response
         
         # ==================== FULL ANALYSIS PATH ====================
-        analysis = await asi_client.analyze_mental_patterns(
-            message, 
-            [msg['content'] for msg in session.message_history if msg['role'] == 'user']
-        )
+        analysis = stages.get('analysis')
+        if analysis is None:
+            if allow_analysis and not stages.ok('analysis'):
+                print(f"⏱️ SoroMind: Pattern analysis missed the {MESSAGE_DEADLINE}s deadline - using fallback")
+            return await generate_fallback_response(ctx, message, session, message_analysis)
+        
+        if analysis.degraded:
+            print(f"🩹 SoroMind: ASI unavailable - replying from the local analysis")
+        
+        if analysis.risk_assessment == RiskLevel.CRISIS:
+            ctx.logger.warning(f"🚨 CRISIS RISK FROM ANALYSIS: {message}")
+            return format_crisis_response(crisis_detector.get_crisis_response({
+                'risk_level': analysis.risk_assessment,
+                'crisis_indicators': [],
+                'high_risk_indicators': analysis.patterns
+            }))
         
         # Update session patterns with ASI analysis
         session.user_patterns.extend(analysis.patterns)
         session.user_patterns = list(set(session.user_patterns))
         
-        # ==================== SEND UPDATED PATTERNS TO ORCHESTRATOR ====================
-        if analysis.patterns and analysis.patterns != extracted_patterns:
-            print(f"💫 SoroMind: Sending UPDATED patterns to Orchestrator...")
-            await send_to_orchestrator(ctx, session, message, analysis.patterns, session.risk_level)
-        
         # ==================== GENERATE RESPONSE ====================
         interventions = []
         for pattern in analysis.patterns[:3]:
@@ -436,14 +850,18 @@ You don't have to go through this alone. People care about you and want to help.
         
     except Exception as e:
         ctx.logger.error(f"Error processing user message: {e}")
-        # Fallback with Orchestrator attempt
-        try:
-            fallback_patterns = ['processing_error', 'system_fallback']
-            await send_to_orchestrator(ctx, session, message, fallback_patterns, RiskLevel.LOW)
-        except:
-            pass
+        # Fallback with Orchestrator attempt, without holding up the reply
+        fallback_patterns = ['processing_error', 'system_fallback']
+        run_detached(
+            send_to_orchestrator(ctx, session, message, fallback_patterns, RiskLevel.LOW),
+            'orchestrator_fallback'
+        )
             
-        return await generate_fallback_response(ctx, message, session)
+        return await generate_fallback_response(ctx, message, session, message_analysis)
+    finally:
+        if orchestrator_delivery is not None:
+            # Never leave a held request undelivered (no-op once released)
+            intervention_queue.release(session.session_id, orchestrator_delivery)
 
 def generate_empathetic_response(
     user_message: str, 
@@ -484,18 +902,13 @@ def generate_empathetic_response(
 
 # ==================== EXISTING HELPER FUNCTIONS (KEEP THESE) ====================
 
-async def generate_intent_based_response(ctx: Context, message: str, session: UserSession) -> Optional[str]:
+async def generate_intent_based_response(ctx: Context, message: str, session: UserSession,
+                                         message_analysis: MessageAnalysis) -> Optional[str]:
     """Generate immediate response based on detected intent"""
     # ... (keep all your existing intent response functions exactly as they were)
-    message_lower = message.lower().strip()
     
     # Crisis phrases
-    crisis_phrases = [
-        'kill myself', 'suicide', 'end my life', 'want to die', 'better off dead',
-        'harm myself', 'self harm', 'end it all', 'can\'t take it anymore'
-    ]
-    
-    if any(phrase in message_lower for phrase in crisis_phrases):
+    if message_analysis.is_crisis:
         ctx.logger.warning(f"🚨 IMMEDIATE CRISIS DETECTED: {message}")
         return """🚨 **I'm very concerned about what you're sharing.** Your safety is the most important thing right now.
 
@@ -510,8 +923,8 @@ async def generate_intent_based_response(ctx: Context, message: str, session: Us
 You don't have to go through this alone. People care about you and want to help."""
 
     # Academic stress
-    if any(word in message_lower for word in ['exam', 'test', 'study', 'academic', 'school', 'college']):
-        if 'can\'t sleep' in message_lower or 'insomnia' in message_lower:
+    if 'academic_stress' in message_analysis.patterns:
+        if message_analysis.mentions('can\'t sleep', 'insomnia'):
             return """I understand you're dealing with academic stress that's affecting your sleep. This is really common during intense periods.
 
 **For Immediate Relief:**
@@ -546,7 +959,7 @@ You don't have to go through this alone. People care about you and want to help.
 What aspect feels most overwhelming right now?"""
 
     # Sleep issues
-    if any(word in message_lower for word in ['can\'t sleep', 'insomnia', 'tired', 'exhausted']):
+    if message_analysis.mentions('can\'t sleep', 'insomnia', 'tired', 'exhausted'):
         return """Sleep issues often signal that your system needs care. Here are evidence-based approaches:
 
 **Sleep Hygiene:**
@@ -570,12 +983,13 @@ Would you like to try a specific relaxation technique now?"""
 
     return None
 
-async def generate_fallback_response(ctx: Context, message: str, session: UserSession) -> str:
+async def generate_fallback_response(ctx: Context, message: str, session: UserSession,
+                                     message_analysis: Optional[MessageAnalysis] = None) -> str:
     """Improved fallback response"""
-    message_lower = message.lower()
+    if message_analysis is None:
+        message_analysis = MessageAnalysis(message)
     
-    crisis_phrases = ['kill myself', 'suicide', 'end my life', 'want to die']
-    if any(phrase in message_lower for phrase in crisis_phrases):
+    if message_analysis.is_crisis:
         return """🚨 **I'm very concerned about your safety.** Please reach out for immediate help:
 
 • National Suicide Prevention Lifeline: 988
@@ -626,6 +1040,7 @@ def format_crisis_response(crisis_response: Dict) -> str:
 
 # Include the chat protocol
 soromind.include(chat_proto, publish_manifest=True)
+soromind.include(soma_proto)
 
 if __name__ == "__main__":
     print("🚀 Starting SoroMind Core Agent...")
@@ -635,7 +1050,7 @@ if __name__ == "__main__":
     print("💬 Debug: Message tracking ENABLED")
     print("🤝 SOMA Engine Integration: ENABLED")
     print("💫 SORO Orchestrator Integration: GUARANTEED")
-    print("🔄 Retry Logic: 3 attempts with fallback")
+    print("🔄 Retry Logic: per-destination outbound queues with jittered backoff")
     print("⏹️  Press CTRL+C to stop")
     print("-" * 50)
     
@@ -2,6 +2,7 @@ import os
 from typing import List, Dict, Any, Optional
 from hyperon import MeTTa, ValueAtom, S, E, V
 from models.data_models import RiskLevel
+from utils.crisis_lexicon import get_crisis_lexicon
 
 class MeTTaManager:
     def __init__(self):
@@ -91,14 +92,8 @@ class MeTTaManager:
         try:
             risk_level = RiskLevel.LOW
             
-            # Check for crisis indicators in message
-            crisis_indicators = ['suicide', 'kill myself', 'end it all', 'harm myself', 
-                               'cant go on', 'want to die', 'better off dead']
-            
-            message_lower = user_message.lower()
-            crisis_words_found = [word for word in crisis_indicators if word in message_lower]
-            
-            if crisis_words_found:
+            # Check for crisis indicators in message using the shared lexicon
+            if get_crisis_lexicon().has_crisis(user_message):
                 risk_level = RiskLevel.CRISIS
             elif any(pattern in ['catastrophizing', 'black_white_thinking'] for pattern in patterns):
                 risk_level = RiskLevel.MEDIUM
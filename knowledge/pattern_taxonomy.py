@@ -0,0 +1,150 @@
+import os
+import re
+import json
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Inflections folded onto taxonomy keywords ("stressed" -> "stress", "exams" -> "exam")
+SUFFIXES = ('ing', 'ful', 'ed', 'es', 's', 'd')
+
+OUTPUT_FIELDS = ('patterns', 'cognitive_patterns', 'emotions', 'enhanced_patterns')
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'pattern_taxonomy.json')
+
+# Keyword sets per agent; each agent keeps its own so a shared index doesn't change its outputs
+SOROMIND_SECTION = 'categories'
+SOMA_SECTION = 'soma_categories'
+
+# "sad*" matches any token starting with "sad" (sadness, saddened)
+PREFIX_MARKER = '*'
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping apostrophes (can't, i'm)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _stems(token: str) -> Iterable[str]:
+    yield token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            yield token[:-len(suffix)]
+
+
+class TaxonomyMatch:
+    """Categories hit by one message, with their outputs merged in taxonomy order"""
+
+    def __init__(self, categories: List[Dict[str, Any]]):
+        self.categories = categories
+
+    @property
+    def category_ids(self) -> List[str]:
+        return [category['id'] for category in self.categories]
+
+    def collect(self, field: str) -> List[str]:
+        values: List[str] = []
+        for category in self.categories:
+            for value in category.get(field, []):
+                if value not in values:
+                    values.append(value)
+        return values
+
+    @property
+    def patterns(self) -> List[str]:
+        return self.collect('patterns')
+
+    @property
+    def cognitive_patterns(self) -> List[str]:
+        return self.collect('cognitive_patterns')
+
+    @property
+    def emotions(self) -> List[str]:
+        return self.collect('emotions')
+
+    @property
+    def enhanced_patterns(self) -> List[str]:
+        return self.collect('enhanced_patterns')
+
+
+class PatternTaxonomy:
+    """Category -> keywords/phrases -> pattern ids, compiled into a token index.
+
+    Keywords match whole tokens (with light suffix folding); a keyword ending
+    in ``*`` matches any token it starts.
+    """
+
+    def __init__(self, path: str = DEFAULT_TAXONOMY_PATH, section: str = SOROMIND_SECTION):
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        self.categories: List[Dict[str, Any]] = data[section]
+        self._token_index: Dict[str, Tuple[int, ...]] = {}
+        self._prefix_index: Dict[str, Tuple[int, ...]] = {}
+        self._phrase_index: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {}
+
+        for category_id, category in enumerate(self.categories):
+            for field in OUTPUT_FIELDS:
+                category.setdefault(field, [])
+            for keyword in category.get('keywords', []):
+                keyword = keyword.lower()
+                if keyword.endswith(PREFIX_MARKER):
+                    self._index_token(keyword[:-1], category_id, self._prefix_index)
+                else:
+                    self._index_token(keyword, category_id)
+            for phrase in category.get('phrases', []):
+                phrase_tokens = tuple(tokenize(phrase))
+                if len(phrase_tokens) == 1:
+                    self._index_token(phrase_tokens[0], category_id)
+                elif phrase_tokens:
+                    self._phrase_index.setdefault(phrase_tokens[0], []).append((phrase_tokens, category_id))
+
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefix_index})
+
+        print(f"✅ Pattern taxonomy compiled ({section}): {len(self.categories)} categories, "
+              f"{len(self._token_index) + len(self._prefix_index)} keywords")
+
+    def _index_token(self, token: str, category_id: int,
+                     index: Optional[Dict[str, Tuple[int, ...]]] = None):
+        index = self._token_index if index is None else index
+        existing = index.get(token, ())
+        if category_id not in existing:
+            index[token] = existing + (category_id,)
+
+    def match(self, tokens: Sequence[str]) -> TaxonomyMatch:
+        """Find every category hit by a token sequence in one pass"""
+        hits = set()
+        token_index = self._token_index
+        prefix_index = self._prefix_index
+        phrase_index = self._phrase_index
+
+        for position, token in enumerate(tokens):
+            for stem in _stems(token):
+                category_ids = token_index.get(stem)
+                if category_ids:
+                    hits.update(category_ids)
+            for length in self._prefix_lengths:
+                if length > len(token):
+                    break
+                category_ids = prefix_index.get(token[:length])
+                if category_ids:
+                    hits.update(category_ids)
+            for phrase_tokens, category_id in phrase_index.get(token, ()):
+                if tuple(tokens[position:position + len(phrase_tokens)]) == phrase_tokens:
+                    hits.add(category_id)
+
+        return TaxonomyMatch([self.categories[category_id] for category_id in sorted(hits)])
+
+    def match_text(self, text: str) -> TaxonomyMatch:
+        return self.match(tokenize(text))
+
+
+_shared_taxonomies: Dict[str, PatternTaxonomy] = {}
+
+
+def get_pattern_taxonomy(section: str = SOROMIND_SECTION) -> PatternTaxonomy:
+    """Return the process-wide taxonomy for an agent's section, compiling it on first use"""
+    taxonomy = _shared_taxonomies.get(section)
+    if taxonomy is None:
+        taxonomy = _shared_taxonomies[section] = PatternTaxonomy(section=section)
+    return taxonomy
@@ -15,6 +15,9 @@ class RiskLevel(str, Enum):
     HIGH = "high"
     CRISIS = "crisis"
 
+# Least to most urgent; compare levels by their index here
+RISK_ORDER = [RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRISIS]
+
 # Response Types
 class ResponseType(str, Enum):
     REFLECTION = "reflection"
@@ -64,6 +67,7 @@ class PatternAnalysisResponse(Model):
     confidence: float
     risk_assessment: RiskLevel
     suggested_interventions: List[str]
+    degraded: bool = False  # local fallback analysis, not the model's
 
 # Intervention Models
 class UserPreferences(Model):
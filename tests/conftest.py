@@ -0,0 +1,25 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Agent modules check their environment at import and import common_models from agents/
+os.environ.setdefault("ASI_API_KEY", "test")
+os.environ.setdefault("AGENTVERSE_API_KEY", "test")
+os.environ.setdefault("SOROMIND_SEED", "test_soromind_seed")
+# Keep sessions in memory rather than in the project's SQLite file
+os.environ.setdefault("SESSION_DB_PATH", "")
+sys.path.insert(0, str(Path(__file__).parent.parent / "agents"))
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from utils.admission import AdmissionController, TokenBucket, ADMIT_FULL, ADMIT_DEGRADED, ADMIT_CRISIS
+
+class TestAdmissionController:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+        self.admission = AdmissionController(
+            sender_rate=1.0, sender_burst=2, global_rate=10.0, global_burst=3,
+            max_concurrent_analyses=1, clock=self.clock
+        )
+
+    def test_token_bucket_refills(self):
+        bucket = TokenBucket(rate=2.0, capacity=2, now=0.0)
+        assert bucket.try_take(0.0) and bucket.try_take(0.0)
+        assert not bucket.try_take(0.0)
+        assert bucket.try_take(0.5)
+
+    def test_per_sender_burst_degrades(self):
+        """A double-submitting sender is answered from templates once its burst is spent"""
+        decisions = [self.admission.admit("agent1alice") for _ in range(3)]
+        assert decisions == [ADMIT_FULL, ADMIT_FULL, ADMIT_DEGRADED]
+        self.clock.now = 1.0
+        assert self.admission.admit("agent1alice") == ADMIT_FULL
+
+    def test_global_limit(self):
+        """The global bucket caps total analysis work across senders"""
+        decisions = [self.admission.admit(f"agent1user{i}") for i in range(4)]
+        assert decisions == [ADMIT_FULL] * 3 + [ADMIT_DEGRADED]
+
+    def test_crisis_always_admitted(self):
+        """Crisis messages bypass every limit and consume no tokens"""
+        for _ in range(5):
+            self.admission.admit("agent1alice")
+        assert self.admission.admit("agent1alice", is_crisis=True) == ADMIT_CRISIS
+        assert self.admission.stats[ADMIT_CRISIS] == 1
+
+    def test_analysis_slots(self):
+        """Excess analyses wait briefly, then give up their slot claim"""
+        async def run():
+            assert await self.admission.acquire_analysis(0.01)
+            overflow = await self.admission.acquire_analysis(0.01)
+            self.admission.release_analysis()
+            return overflow, await self.admission.acquire_analysis(0.01)
+
+        assert asyncio.run(run()) == (False, True)
+        assert self.admission.stats['analysis_overflow'] == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,515 @@
+import json
+import time
+import asyncio
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from models.data_models import RiskLevel
+from utils import crisis_detector
+from utils.asi_client import (
+    ASIClient, BATCH_SYSTEM_PROMPT, STRUCTURED_SYSTEM_PROMPT, analysis_cache_key, parse_batch_reply
+)
+from utils.ttl_cache import TTLCache
+from utils.history_summary import HistorySummary
+from utils.single_flight import SingleFlight
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions endpoint"""
+
+    prose_reply = "Signs of perfectionism and catastrophizing; moderate stress. Try breathing exercises."
+    reply = prose_reply
+    delay = 0.0
+    # Optional request body -> reply text, for tests that need per-request replies
+    responder = None
+
+    # Streamed replies go out in pieces of this many characters, chunk_delay apart
+    chunk_size = 4
+    chunk_delay = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(body)
+        time.sleep(self.delay)
+        if body.get('stream'):
+            return self.stream_reply(body)
+        payload = json.dumps({
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant",
+                                     "content": self.responder(body) if self.responder else self.reply}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_reply(self, body):
+        content = self.responder(body) if self.responder else self.reply
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for start in range(0, len(content), self.chunk_size):
+                chunk = {
+                    "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": None,
+                                 "delta": {"content": content[start:start + self.chunk_size]}}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(self.chunk_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early
+            self.server.abandoned_streams += 1
+
+    def log_message(self, *args):
+        pass
+
+class TestASIClient:
+    def setup_method(self):
+        StandInHandler.reply = StandInHandler.prose_reply
+        StandInHandler.delay = 0.0
+        StandInHandler.responder = None
+        StandInHandler.chunk_size = 4
+        StandInHandler.chunk_delay = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.requests = []
+        self.server.abandoned_streams = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_analysis_against_local_stand_in(self):
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            try:
+                return await client.analyze_mental_patterns("exams are crushing me", ["hi"])
+            finally:
+                await client.aclose()
+
+        analysis = asyncio.run(run())
+        assert analysis.patterns == ['perfectionism', 'catastrophizing']
+        assert analysis.risk_assessment == RiskLevel.MEDIUM
+        assert analysis.suggested_interventions == ['breathing exercises']
+        assert self.server.requests[0]['messages'][-1]['content'] == "exams are crushing me"
+
+    def test_structured_reply_is_parsed_directly(self):
+        StandInHandler.reply = '{"p": [1, 7, 99], "r": "HIGH", "i": [8]}'
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            try:
+                return await client.analyze_mental_patterns("exams are crushing me", []), client
+            finally:
+                await client.aclose()
+
+        analysis, client = asyncio.run(run())
+        assert analysis.patterns == ['catastrophizing', 'should statements']
+        assert analysis.risk_assessment == RiskLevel.HIGH
+        assert analysis.suggested_interventions == ['professional help']
+        assert client.structured_fallbacks == 0
+        request = self.server.requests[0]
+        assert request['messages'][0]['content'] == STRUCTURED_SYSTEM_PROMPT
+        assert request['max_tokens'] < 500
+
+    def test_prose_reply_falls_back_to_keyword_parsing(self, monkeypatch):
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            structured = await client.analyze_mental_patterns("first", [])
+            monkeypatch.setenv('ASI_STRUCTURED_OUTPUT', '0')
+            prose_client = ASIClient(api_key="test", base_url=self.base_url)
+            prose = await prose_client.analyze_mental_patterns("second", [])
+            await client.aclose()
+            await prose_client.aclose()
+            return structured, prose, client.structured_fallbacks
+
+        structured, prose, fallbacks = asyncio.run(run())
+        assert fallbacks == 1
+        assert structured.patterns == prose.patterns == ['perfectionism', 'catastrophizing']
+        assert self.server.requests[1]['max_tokens'] == 500
+
+    def test_streamed_risk_is_reported_before_the_reply_finishes(self):
+        StandInHandler.reply = '{"r": "medium", "p": [0, 1], "i": [2]}'
+        StandInHandler.chunk_delay = 0.02
+        reported = []
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            started = time.perf_counter()
+
+            async def on_risk(risk_level):
+                reported.append((risk_level, time.perf_counter() - started))
+                return False
+
+            analysis = await client.stream_mental_patterns("exams again", [], on_risk=on_risk)
+            elapsed = time.perf_counter() - started
+            await client.aclose()
+            return analysis, elapsed, client
+
+        analysis, elapsed, client = asyncio.run(run())
+        (risk_level, reported_after), = reported
+        assert risk_level == RiskLevel.MEDIUM
+        assert reported_after < elapsed - 0.1
+        assert analysis.patterns == ['perfectionism', 'catastrophizing']
+        assert analysis.suggested_interventions == ['breathing exercises']
+        assert self.server.requests[0]['stream'] is True
+        assert len(client.cache) == 1
+
+    def test_streaming_stops_early_when_asked(self):
+        StandInHandler.reply = '{"r": "crisis", "p": [0, 1, 2, 3, 4, 5, 6, 7, 8], "i": [0, 1, 2, 3, 4, 5, 6, 7, 8]}'
+        StandInHandler.chunk_size = 2
+        StandInHandler.chunk_delay = 0.05
+
+        async def stop_on_crisis(risk_level):
+            return risk_level == RiskLevel.CRISIS
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            started = time.perf_counter()
+            analysis = await client.stream_mental_patterns("it's all too much", [], on_risk=stop_on_crisis)
+            elapsed = time.perf_counter() - started
+            await client.aclose()
+            return analysis, elapsed, client
+
+        analysis, elapsed, client = asyncio.run(run())
+        assert analysis.risk_assessment == RiskLevel.CRISIS
+        assert analysis.patterns == []
+        assert elapsed < 1.0
+        assert client.stream_stats['early_exits'] == 1
+        # A partial analysis is never cached
+        assert len(client.cache) == 0
+
+    def test_risk_level_is_assessed_once(self, monkeypatch):
+        """The lexicon runs once per uncached call, and not at all when the caller has a risk level"""
+        monkeypatch.setenv('ASI_STREAMING', '0')
+        calls = []
+        assess = crisis_detector.assess_message
+        monkeypatch.setattr(
+            crisis_detector, 'assess_message', lambda *args, **kwargs: calls.append(args) or assess(*args, **kwargs)
+        )
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            await client.stream_mental_patterns("exams again", [])
+            await client.stream_mental_patterns("exams again", [])
+            await client.analyze_mental_patterns("exams again", ["hi"], risk_level=RiskLevel.LOW)
+            await client.stream_mental_patterns("exams again", ["hi"], risk_level=RiskLevel.LOW)
+            await client.aclose()
+
+        asyncio.run(run())
+        assert len(calls) == 2
+        assert len(self.server.requests) == 2
+
+    def test_breaker_fails_over_to_local_analysis(self, monkeypatch):
+        """Once ASI keeps missing the latency SLO, calls are answered locally and at once"""
+        monkeypatch.setenv('ASI_LATENCY_SLO', '0.05')
+        StandInHandler.delay = 0.1
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            slow = [await client.analyze_mental_patterns(f"exam worry {i}", []) for i in range(5)]
+            started = time.perf_counter()
+            fallback = await client.stream_mental_patterns("I'm so anxious about my exam", [])
+            elapsed = time.perf_counter() - started
+            await client.aclose()
+            return slow, fallback, elapsed, client.breaker
+
+        slow, fallback, elapsed, breaker = asyncio.run(run())
+        assert not any(analysis.degraded for analysis in slow)
+        assert fallback.degraded
+        assert 'catastrophizing' in fallback.patterns
+        assert elapsed < 0.05
+        assert len(self.server.requests) == 5
+        assert breaker.report()['rejected'] == 1
+
+    def test_unreachable_endpoint_returns_local_analysis(self, monkeypatch):
+        monkeypatch.setenv('ASI_MAX_RETRIES', '0')
+        self.server.shutdown()
+        self.server.server_close()
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            analysis = await client.analyze_mental_patterns("I feel so lonely", [])
+            await client.aclose()
+            return analysis
+
+        analysis = asyncio.run(run())
+        assert analysis.degraded
+        assert analysis.patterns == ['loneliness']
+
+    def test_history_goes_in_one_context_turn(self):
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            await client.analyze_mental_patterns("and now this", ["first", "second"])
+            await client.aclose()
+
+        asyncio.run(run())
+        messages = self.server.requests[0]['messages']
+        assert [message['role'] for message in messages] == ['system', 'user', 'user']
+        assert messages[1]['content'] == "Context - my earlier messages:\n- first\n- second"
+
+    def test_long_history_is_summarized(self):
+        summary = HistorySummary()
+        summary.fold(['academic_stress'], RiskLevel.MEDIUM)
+        history = ["exams " * 60, "more about exams " * 20, "short"]
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            await client.analyze_mental_patterns("still stressed", history, summary=summary)
+            await client.aclose()
+            return client.history_tokens, client.history_token_budget
+
+        ledger, client_budget = asyncio.run(run())
+        messages = self.server.requests[0]['messages']
+        # The summary is ours, not the user's - it gets its own system turn
+        assert messages[1] == {'role': 'system', 'content': summary.text()}
+        context = messages[2]['content']
+        assert summary.text() not in context
+        assert history[-1] in context and history[0] not in context
+        assert ledger.stats['summarized'] == 1
+        assert ledger.stats['sent_tokens'] <= client_budget < ledger.stats['raw_tokens']
+
+    def test_completions_do_not_block_the_event_loop(self):
+        """Slow completions overlap, and other tasks keep running meanwhile"""
+        StandInHandler.delay = 0.2
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url, max_concurrency=4)
+            tick_task = asyncio.ensure_future(ticker())
+            started = time.perf_counter()
+            await asyncio.gather(*[client.analyze_mental_patterns(f"message {i}", []) for i in range(4)])
+            elapsed = time.perf_counter() - started
+            tick_task.cancel()
+            await client.aclose()
+            return elapsed
+
+        elapsed = asyncio.run(run())
+        assert elapsed < 0.6
+        assert len(ticks) >= 5
+
+    def test_concurrency_limit(self):
+        """Calls past max_concurrency wait for a free slot"""
+        StandInHandler.delay = 0.1
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url, max_concurrency=1)
+            started = time.perf_counter()
+            await asyncio.gather(*[client.analyze_mental_patterns(f"message {i}", []) for i in range(3)])
+            await client.aclose()
+            return time.perf_counter() - started
+
+        assert asyncio.run(run()) >= 0.3
+
+    def test_repeat_analyses_are_cached(self):
+        """Near-identical messages with the same history cost one completion"""
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            first = await client.analyze_mental_patterns("I'm stressed about exams", ["hi"])
+            second = await client.analyze_mental_patterns("i’m  STRESSED about exams", ["hi"])
+            other_history = await client.analyze_mental_patterns("I'm stressed about exams", ["hello"])
+            await client.aclose()
+            return first, second, other_history, client.cache.stats
+
+        first, second, _, stats = asyncio.run(run())
+        assert second is first
+        assert len(self.server.requests) == 2
+        assert (stats['hits'], stats['misses']) == (1, 2)
+
+    def test_crisis_content_bypasses_cache(self):
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            for _ in range(2):
+                await client.analyze_mental_patterns("I want to kill myself", [])
+            await client.aclose()
+            return len(client.cache)
+
+        assert asyncio.run(run()) == 0
+        assert len(self.server.requests) == 2
+
+    def test_near_duplicates_reuse_an_analysis(self):
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            first = await client.analyze_mental_patterns("My exams are stressing me out", [])
+            paraphrase = await client.analyze_mental_patterns("exams are stressing me out!", [])
+            await client.aclose()
+            return first, paraphrase
+
+        first, paraphrase = asyncio.run(run())
+        assert paraphrase is first
+        assert len(self.server.requests) == 1
+
+    def test_lexicon_hits_never_reuse_near_duplicates(self):
+        """'hopeless' is a high-risk lexicon phrase - each wording gets its own analysis"""
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            await client.analyze_mental_patterns("I feel hopeless about my exams", [])
+            await client.analyze_mental_patterns("I feel so hopeless about my exams", [])
+            await client.aclose()
+            return client.semantic_cache
+
+        semantic_cache = asyncio.run(run())
+        assert len(self.server.requests) == 2
+        assert len(semantic_cache) == 0
+
+    def test_concurrent_duplicates_share_one_completion(self):
+        """A burst of identical requests (including crisis ones) costs one upstream call"""
+        StandInHandler.delay = 0.1
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            results = await asyncio.gather(
+                *[client.analyze_mental_patterns("I want to kill myself", []) for _ in range(4)]
+            )
+            await client.aclose()
+            return results
+
+        results = asyncio.run(run())
+        assert len(self.server.requests) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_micro_batching_fans_results_back_out(self, monkeypatch):
+        """Concurrent users share one structured completion; crisis content skips the batch"""
+        monkeypatch.setenv('ASI_BATCH_SIZE', '4')
+        monkeypatch.setenv('ASI_BATCH_MAX_WAIT_MS', '50')
+
+        def respond(body):
+            if body['messages'][0]['content'] != BATCH_SYSTEM_PROMPT:
+                return StandInHandler.reply
+            items = json.loads(body['messages'][-1]['content'])
+            # Drop the last item to exercise the individual retry
+            return json.dumps([
+                {"id": item['id'], "p": [0, 42] if item['id'] % 2 else [],
+                 "r": "high" if item['id'] == 0 else "low", "i": [3]}
+                for item in items[:-1]
+            ])
+        StandInHandler.responder = staticmethod(respond)
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+            results = await asyncio.gather(
+                *[client.analyze_mental_patterns(f"message {i}", []) for i in range(3)],
+                client.analyze_mental_patterns("I want to kill myself", [])
+            )
+            await client.aclose()
+            return results, client._batcher
+
+        results, batcher = asyncio.run(run())
+        assert batcher.stats == {'batches': 1, 'items': 3}
+        assert results[0].risk_assessment == RiskLevel.HIGH
+        assert results[1].patterns == ['perfectionism']
+        assert results[1].suggested_interventions == ['journaling']
+        # Missing from the batch reply -> answered by its own prose completion
+        assert results[2].risk_assessment == RiskLevel.MEDIUM
+        # 1 batch + 1 retry + 1 unbatched crisis analysis
+        assert len(self.server.requests) == 3
+
+    def test_unparseable_batch_reply(self):
+        assert parse_batch_reply("Sorry, I can't help with that.") == {}
+        assert parse_batch_reply('Here: [{"id": 1, "risk": "low"}, "junk"]') == {1: {"id": 1, "risk": "low"}}
+
+    def test_concurrent_duplicate_streams_share_one_completion(self):
+        """Identical streamed analyses share one stream, and every caller gets the risk"""
+        StandInHandler.reply = '{"r": "high", "p": [0], "i": [8]}'
+        StandInHandler.chunk_delay = 0.04
+        reported = []
+
+        async def run():
+            client = ASIClient(api_key="test", base_url=self.base_url)
+
+            def on_risk(caller):
+                async def report(risk_level):
+                    reported.append((caller, risk_level))
+                    return False
+                return report
+
+            async def late_caller():
+                # After the risk has streamed in, before the reply is complete
+                await asyncio.sleep(0.2)
+                return await client.stream_mental_patterns("exams again", [], on_risk=on_risk('late'))
+
+            results = await asyncio.gather(
+                *[client.stream_mental_patterns("exams again", [], on_risk=on_risk(i)) for i in range(3)],
+                late_caller()
+            )
+            await client.aclose()
+            return results
+
+        results = asyncio.run(run())
+        assert len(self.server.requests) == 1
+        assert all(result is results[0] for result in results)
+        assert results[0].patterns == ['perfectionism']
+        assert sorted(reported, key=str) == sorted([(caller, RiskLevel.HIGH) for caller in [0, 1, 2, 'late']], key=str)
+
+class TestSingleFlight:
+    def test_abandoning_caller_does_not_cancel_others(self):
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'analysis'
+
+        async def run():
+            flight = SingleFlight()
+            impatient = asyncio.ensure_future(flight.do('key', work))
+            patient = asyncio.ensure_future(flight.do('key', work))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            result = await patient
+            return result, flight.stats, flight.in_flight()
+
+        assert asyncio.run(run()) == ('analysis', {'calls': 1, 'shared': 1}, 0)
+        assert calls == [1]
+
+    def test_errors_reach_every_caller(self):
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(flight.do('key', work), flight.do('key', work), return_exceptions=True)
+
+        assert [type(error) for error in asyncio.run(run())] == [RuntimeError, RuntimeError]
+
+class TestTTLCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+        self.cache = TTLCache(max_entries=2, ttl=10.0, clock=self.clock)
+
+    def test_lru_eviction(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        assert self.cache.get('b') is None
+        assert self.cache.get('a') == 1
+        assert self.cache.stats['evicted'] == 1
+
+    def test_entries_expire(self):
+        self.cache.put('a', 1)
+        self.clock.now = 10.0
+        assert self.cache.get('a') is None
+        assert self.cache.stats['expired'] == 1
+        assert len(self.cache) == 0
+
+    def test_cache_key_uses_history_window(self):
+        history = [f"message {i}" for i in range(8)]
+        assert analysis_cache_key("hi", history[-5:]) == analysis_cache_key("HI ", history[3:])
+        assert analysis_cache_key("hi", history[-5:]) != analysis_cache_key("hi", history[-4:])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
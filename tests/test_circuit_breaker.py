@@ -0,0 +1,90 @@
+import pytest
+from utils.circuit_breaker import CircuitBreaker, CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN
+
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+        self.breaker = CircuitBreaker(window=10, min_calls=4, failure_threshold=0.5,
+                                      latency_slo=1.0, slow_threshold=0.75, open_for=30.0, clock=self.clock)
+
+    def record(self, latency: float, ok: bool):
+        """Outcome of a call started just now"""
+        self.breaker.record(latency, ok, self.breaker.generation)
+
+    def trip(self):
+        for _ in range(4):
+            self.record(0.1, ok=False)
+        assert self.breaker.state == CIRCUIT_OPEN
+
+    def test_opens_on_error_rate(self):
+        for ok in (True, False, True):
+            self.record(0.1, ok)
+        assert self.breaker.state == CIRCUIT_CLOSED
+        self.record(0.1, ok=False)
+        assert self.breaker.state == CIRCUIT_OPEN
+        assert not self.breaker.allow()
+        assert self.breaker.stats['rejected'] == 1
+
+    def test_opens_on_latency_slo(self):
+        for _ in range(3):
+            self.record(2.0, ok=True)
+        self.record(0.1, ok=True)
+        assert self.breaker.state == CIRCUIT_OPEN
+
+    def test_half_open_allows_one_probe(self):
+        self.trip()
+        self.clock.now = 30.0
+        assert self.breaker.allow()
+        assert self.breaker.state == CIRCUIT_HALF_OPEN
+        assert not self.breaker.allow()
+
+        # A failed probe re-opens for another full period
+        self.record(0.1, ok=False)
+        assert self.breaker.state == CIRCUIT_OPEN
+        self.clock.now = 59.0
+        assert not self.breaker.allow()
+
+        self.clock.now = 60.0
+        assert self.breaker.allow()
+        self.record(0.1, ok=True)
+        assert self.breaker.state == CIRCUIT_CLOSED
+        assert self.breaker.report()['opened'] == 2
+
+    def test_slow_probe_keeps_circuit_open(self):
+        self.trip()
+        self.clock.now = 30.0
+        assert self.breaker.allow()
+        self.record(5.0, ok=True)
+        assert self.breaker.state == CIRCUIT_OPEN
+
+    def test_stragglers_do_not_close_the_circuit(self):
+        straggler = self.breaker.generation
+        self.trip()
+        # A fast success from a call admitted before the circuit opened
+        self.breaker.record(0.1, True, straggler)
+        assert self.breaker.state == CIRCUIT_OPEN
+        assert not self.breaker.allow()
+
+        self.clock.now = 30.0
+        assert self.breaker.allow()
+        # Neither clears the probe nor decides the half-open state
+        self.breaker.record(0.1, True, straggler)
+        assert self.breaker.state == CIRCUIT_HALF_OPEN
+        assert not self.breaker.allow()
+
+        self.record(0.1, ok=True)
+        assert self.breaker.state == CIRCUIT_CLOSED
+
+    def test_lost_probe_is_replaced_after_open_period(self):
+        self.trip()
+        self.clock.now = 30.0
+        assert self.breaker.allow()
+        self.clock.now = 59.0
+        assert not self.breaker.allow()
+        self.clock.now = 60.0
+        assert self.breaker.allow()
+        assert self.breaker.stats['probes'] == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from utils.coalescing_queue import CoalescingQueue
+
+def merge(queued, latest):
+    return {'patterns': queued['patterns'] + [p for p in latest['patterns'] if p not in queued['patterns']],
+            'risk': max(queued['risk'], latest['risk'])}
+
+class TestCoalescingQueue:
+    def setup_method(self):
+        self.delivered = []
+
+        async def deliver(key, item):
+            self.delivered.append((key, item))
+            return True
+
+        self.queue = CoalescingQueue(window=0.05, merge=merge, deliver=deliver)
+
+    def test_same_key_merges_within_window(self):
+        """Submissions for one session within the window go out once, merged"""
+        async def run():
+            first = self.queue.submit('s1', {'patterns': ['stress'], 'risk': 0})
+            second = self.queue.submit('s1', {'patterns': ['stress', 'anxiety'], 'risk': 1})
+            self.queue.submit('s2', {'patterns': ['sleep'], 'risk': 0})
+            assert first is second
+            return await first
+
+        assert asyncio.run(run()) is True
+        assert self.delivered == [
+            ('s1', {'patterns': ['stress', 'anxiety'], 'risk': 1}),
+            ('s2', {'patterns': ['sleep'], 'risk': 0})
+        ]
+        assert self.queue.stats == {'submitted': 3, 'delivered': 2, 'coalesced': 1}
+
+    def test_urgent_flushes_immediately(self):
+        """An urgent submission carries the queued batch out without waiting"""
+        async def run():
+            self.queue.window = 10.0
+            self.queue.submit('s1', {'patterns': ['stress'], 'risk': 0})
+            await self.queue.submit('s1', {'patterns': ['hopeless'], 'risk': 3}, urgent=True)
+            return self.queue.depth()
+
+        assert asyncio.run(run()) == 0
+        assert self.delivered == [('s1', {'patterns': ['stress', 'hopeless'], 'risk': 3})]
+
+    def test_held_batch_waits_for_release(self):
+        """A held batch outlives the window and goes out, merged, on release"""
+        async def run():
+            held = self.queue.submit('s1', {'patterns': ['stress'], 'risk': 0}, hold=True)
+            await asyncio.sleep(0.1)
+            assert self.delivered == []
+            assert self.queue.submit('s1', {'patterns': ['anxiety'], 'risk': 1}) is held
+            self.queue.release('s1', held)
+            return await held
+
+        assert asyncio.run(run()) is True
+        assert self.delivered == [('s1', {'patterns': ['stress', 'anxiety'], 'risk': 1})]
+
+    def test_release_ignores_a_newer_batch(self):
+        """Releasing an already delivered batch leaves the next one to its window"""
+        async def run():
+            first = self.queue.submit('s1', {'patterns': ['stress'], 'risk': 0}, hold=True)
+            await self.queue.submit('s1', {'patterns': ['hopeless'], 'risk': 3}, urgent=True)
+            self.queue.window = 10.0
+            self.queue.submit('s1', {'patterns': ['sleep'], 'risk': 0})
+            self.queue.release('s1', first)
+            return self.queue.depth()
+
+        assert asyncio.run(run()) == 1
+        assert len(self.delivered) == 1
+
+    def test_flush_delivers_open_batches(self):
+        """Shutdown flush sends everything still inside its window"""
+        async def run():
+            self.queue.window = 10.0
+            self.queue.submit('s1', {'patterns': ['stress'], 'risk': 0})
+            await self.queue.flush()
+
+        asyncio.run(run())
+        assert len(self.delivered) == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,188 @@
+import pytest
+from models.data_models import RiskLevel
+from utils.crisis_detector import CrisisDetector, assess_message
+from utils.crisis_lexicon import CrisisLexicon, get_crisis_lexicon
+from utils.crisis_fuzzy import FuzzyCrisisIndex, get_fuzzy_crisis_index
+from utils.crisis_stream import StreamingCrisisDetector
+
+class TestCrisisLexicon:
+    def setup_method(self):
+        self.lexicon = get_crisis_lexicon()
+
+    def test_shared_instance(self):
+        """The automaton is compiled once and shared"""
+        assert get_crisis_lexicon() is self.lexicon
+        assert CrisisDetector().lexicon is self.lexicon
+
+    def test_labels_severity_class(self):
+        """Each hit carries the severity class of its phrase"""
+        matches = self.lexicon.scan("I feel hopeless and want to die")
+        levels = {match.phrase: match.risk_level for match in matches}
+        assert levels['hopeless'] == RiskLevel.HIGH
+        assert levels['want to die'] == RiskLevel.CRISIS
+
+    def test_overlapping_phrases(self):
+        """Nested phrases are all reported from the same pass"""
+        phrases = [match.phrase for match in self.lexicon.scan("I want to kill myself")]
+        assert 'want to kill myself' in phrases
+        assert 'kill myself' in phrases
+
+    def test_whitespace_and_case_variants(self):
+        """Whitespace runs, case and typographic apostrophes are normalized"""
+        assert self.lexicon.has_crisis("I might KILL    myself")
+        assert self.lexicon.has_crisis("I can’t go on")
+        assert not self.lexicon.has_crisis("I'm feeling a bit sad today")
+
+    def test_regex_variants_need_word_boundaries(self):
+        """'kill self', 'end life', ... only match as whole words"""
+        for message in ["haircut selfie", "weekend life", "skill self-assessment",
+                        "charm self-portrait", "feel like killing time"]:
+            assert self.lexicon.scan(message) == [], message
+            assert assess_message(message)['risk_level'] == RiskLevel.LOW, message
+        for message, phrase in [("I want to kill self", 'kill self'), ("end life.", 'end life'),
+                                ("(cut self)", 'cut self'), ("I feel like kill", 'feel like kill')]:
+            assert phrase in [match.phrase for match in self.lexicon.scan(message)], message
+        assert self.lexicon.scan("I want to kill self")[0].end == len("I want to kill self")
+
+    def test_classify(self):
+        """classify mirrors the CrisisDetector assessment fields"""
+        assessment = self.lexicon.classify("I'm a burden and I'm worthless")
+        assert assessment['risk_level'] == RiskLevel.HIGH
+        assert assessment['high_risk_indicators'] == ['burden', 'worthless']
+        assert assessment['crisis_indicators'] == []
+
+    def test_custom_lexicon(self):
+        """A lexicon can be built from arbitrary severity-labelled phrases"""
+        lexicon = CrisisLexicon({RiskLevel.MEDIUM: ['he', 'she', 'hers', 'his']})
+        phrases = sorted(match.phrase for match in lexicon.scan("ushers"))
+        assert phrases == ['he', 'hers', 'she']
+
+class TestFuzzyCrisisIndex:
+    def setup_method(self):
+        self.index = get_fuzzy_crisis_index()
+        self.detector = CrisisDetector()
+
+    def test_typos_and_spacing(self):
+        """Misspellings and merged words map back to their lexicon phrase"""
+        cases = {
+            "I want to kil myself": 'kill myself',
+            "I think about suicde": 'suicide',
+            "I just want to endmy life": 'end my life',
+            "I'd be better of dead": 'better off dead',
+        }
+        for message, phrase in cases.items():
+            assert phrase in [match.phrase for match in self.index.search(message)]
+
+    def test_exact_phrases_not_reported(self):
+        """Exact hits are left to the automaton"""
+        assert self.index.search("I want to kill myself") == []
+
+    def test_rejects_real_words(self):
+        """Near neighbours that change meaning do not match"""
+        assert self.index.search("I can go on") == []
+        assert self.index.search("I want to fill myself with joy") == []
+        for message in ("tired of lining up", "want to kiss myself", "I want to dine out"):
+            assert self.index.search(message) == [], message
+            assert assess_message(message)['risk_level'] == RiskLevel.LOW, message
+
+    def test_short_word_slips_still_escalate(self):
+        """A slip between function words keeps the phrase's meaning"""
+        assert assess_message("better of dead")['risk_level'] == RiskLevel.CRISIS
+
+    def test_word_list_is_data(self):
+        """Real words come from the shipped list, so new phrases need no stop-list"""
+        index = FuzzyCrisisIndex(words=frozenset())
+        assert 'want to kill myself' in [match.phrase for match in index.search("want to kiss myself")]
+
+    def test_detector_escalates_fuzzy_hits(self):
+        """CrisisDetector classifies misspelled crisis phrases as CRISIS"""
+        assessment = self.detector.detect_crisis_indicators("i want to kil myself")
+        assert assessment['risk_level'] == RiskLevel.CRISIS
+        assert 'kil myself' in assessment['fuzzy_indicators']
+
+class TestStreamingCrisisDetector:
+    def setup_method(self):
+        self.alerts = []
+        self.detector = StreamingCrisisDetector(
+            on_crisis=lambda session_id, match: self.alerts.append((session_id, match.phrase))
+        )
+
+    def test_phrase_across_chunks(self):
+        """A phrase split over chunk boundaries fires when it completes"""
+        assert self.detector.feed("s1", "I just want to ki") == []
+        assert self.alerts == []
+        matches = self.detector.feed("s1", "ll  my")
+        assert matches == []
+        matches = self.detector.feed("s1", "self")
+        assert ('s1', 'kill myself') in self.alerts
+        assert matches[-1].end == len("I just want to kill  myself")
+
+    def test_sessions_are_independent(self):
+        """Partial state in one session never leaks into another"""
+        self.detector.feed("a", "end my ")
+        self.detector.feed("b", "life is good")
+        assert self.alerts == []
+        assert self.detector.risk_level("a") == RiskLevel.LOW
+
+    def test_finish_matches_full_scan(self):
+        """Chunked assessment equals a one-shot classification"""
+        message = "I feel hopeless, like a burden. I want to die."
+        for index in range(0, len(message), 3):
+            self.detector.feed("s2", message[index:index + 3])
+        assert self.detector.finish("s2") == get_crisis_lexicon().classify(message)
+        assert "s2" not in self.detector.streams
+
+    def test_whole_word_phrase_at_end_of_message(self):
+        """A whole-word phrase closing the message is reported by finish()"""
+        self.detector.feed("s3", "I want to end ")
+        assert self.detector.feed("s3", "life") == []
+        assert self.detector.finish("s3")['crisis_indicators'] == ['end life']
+        assert ('s3', 'end life') in self.alerts
+
+    def test_abandoned_streams_are_dropped(self, fake_clock):
+        """Streams never finished expire when idle and are capped in number"""
+        detector = StreamingCrisisDetector(max_streams=2, idle_ttl=60.0, clock=fake_clock)
+        detector.feed("idle", "I want to ")
+        fake_clock.now = 61.0
+        assert detector.sweep() == 1
+        assert "idle" not in detector.streams
+
+        for session_id in ("a", "b", "c"):
+            detector.feed(session_id, "hello ")
+        assert len(detector.streams) == 2
+        assert "a" not in detector.streams
+
+class TestCrisisBatch:
+    def setup_method(self):
+        self.detector = CrisisDetector()
+        self.backlog = [
+            "I'm stressed about exams",
+            "I feel hopeless",
+            "I want to end my life",
+            "Just checking in",
+            "Everything feels pointless and I want to die"
+        ]
+
+    def test_batch_matches_single_detection(self):
+        """Batch risk codes agree with detect_crisis_indicators"""
+        triage = self.detector.detect_crisis_batch(iter(self.backlog), chunk_size=2)
+        assert len(triage) == len(self.backlog)
+        for index, message in enumerate(self.backlog):
+            assessment = self.detector.detect_crisis_indicators(message)
+            assert triage.risk_level(index) == assessment['risk_level']
+
+    def test_crisis_first_ordering(self):
+        """priority_order puts CRISIS items first, stable within a level"""
+        triage = self.detector.detect_crisis_batch(self.backlog)
+        assert triage.priority_order() == [2, 4, 1, 0, 3]
+        assert triage.indicators[2] == ('end my life',)
+
+    def test_process_pool(self):
+        """Splitting across processes gives identical results"""
+        serial = self.detector.detect_crisis_batch(self.backlog * 20)
+        pooled = self.detector.detect_crisis_batch(self.backlog * 20, processes=2, chunk_size=16)
+        assert pooled.risk_codes == serial.risk_codes
+        assert pooled.indicators == serial.indicators
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
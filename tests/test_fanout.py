@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from utils.fanout import FanOut, run_detached, STAGE_OK, STAGE_ERROR, STAGE_LATE
+
+async def stage(value, delay=0.0, fail=False):
+    await asyncio.sleep(delay)
+    if fail:
+        raise RuntimeError("stage failed")
+    return value
+
+class TestFanOut:
+    def test_stages_run_concurrently(self):
+        """Total latency follows the slowest stage, not the sum"""
+        async def run():
+            stages = FanOut(deadline=1.0)
+            for name in ['orchestrator', 'soma', 'asi']:
+                stages.add(name, stage(name, delay=0.1))
+            await stages.run()
+            return stages
+
+        stages = asyncio.run(run())
+        assert stages.results == {'orchestrator': 'orchestrator', 'soma': 'soma', 'asi': 'asi'}
+        assert stages.elapsed < 0.25
+        assert [timing.status for timing in stages.timings] == [STAGE_OK] * 3
+
+    def test_late_stage_is_cancelled(self):
+        """A stage past the deadline is dropped and cancelled"""
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            stages = FanOut(deadline=0.05)
+            stages.add('fast', stage('done'))
+            stages.add('slow', slow())
+            stages.add('broken', stage(None, fail=True))
+            await stages.run()
+            return stages
+
+        stages = asyncio.run(run())
+        assert stages.results == {'fast': 'done'}
+        assert cancelled == [True]
+        assert {timing.name: timing.status for timing in stages.timings} == {
+            'fast': STAGE_OK, 'slow': STAGE_LATE, 'broken': STAGE_ERROR
+        }
+        assert isinstance(stages.errors['broken'], RuntimeError)
+        assert 'slow=' in stages.report() and '(late)' in stages.report()
+
+    def test_detached_stage_keeps_running(self):
+        """detach_late stages miss the reply but still complete"""
+        finished = []
+
+        async def send():
+            await asyncio.sleep(0.1)
+            finished.append('sent')
+
+        async def run():
+            stages = FanOut(deadline=0.01)
+            stages.add('orchestrator', send(), detach_late=True)
+            await stages.run()
+            assert not stages.ok('orchestrator')
+            await asyncio.sleep(0.2)
+
+        asyncio.run(run())
+        assert finished == ['sent']
+
+    def test_run_detached(self):
+        """Follow-up sends complete without being awaited by the caller"""
+        async def run():
+            task = run_detached(stage('update', delay=0.01), 'update')
+            await asyncio.sleep(0.05)
+            return task.result()
+
+        assert asyncio.run(run()) == 'update'
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
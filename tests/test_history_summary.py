@@ -0,0 +1,44 @@
+import pytest
+from models.data_models import RiskLevel
+from utils.history_summary import HistorySummary, SummaryText, TokenLedger, compact_history, estimate_tokens
+
+class TestHistorySummary:
+    def setup_method(self):
+        self.summary = HistorySummary()
+        self.summary.fold(['academic_stress', 'anxiety'], RiskLevel.LOW)
+        self.summary.fold(['anxiety'], RiskLevel.MEDIUM)
+        self.summary.fold(['sleep_issues'], RiskLevel.LOW)
+
+    def test_text_ranks_recurring_themes(self):
+        assert self.summary.text() == (
+            "Session summary: 3 earlier messages; recurring themes anxiety, academic_stress, sleep_issues; "
+            "highest risk so far medium."
+        )
+        assert HistorySummary().text() is None
+
+    def test_record_round_trip(self):
+        restored = HistorySummary.from_record(self.summary.to_record())
+        assert restored.text() == self.summary.text()
+
+    def test_short_history_is_sent_raw(self):
+        history = ["hi", "exams soon"]
+        assert compact_history(history, self.summary, window=5, token_budget=120) == (history, 4, 4)
+
+    def test_long_history_is_replaced_by_summary(self):
+        history = [f"long message {i} " + "about exams and sleep " * 10 for i in range(6)]
+        context, raw_tokens, sent_tokens = compact_history(history, self.summary, window=5, token_budget=120)
+        assert context[0] == self.summary.text()
+        assert isinstance(context[0], SummaryText)
+        # The newest messages that still fit are kept verbatim
+        assert context[1:] == history[-len(context) + 1:]
+        assert raw_tokens == sum(estimate_tokens(message) for message in history[-5:])
+        assert sent_tokens <= 120 < raw_tokens
+
+    def test_ledger_reports_saving(self):
+        ledger = TokenLedger()
+        ledger.record(200, 50)
+        ledger.record(20, 20)
+        assert ledger.report() == {'calls': 2, 'summarized': 1, 'raw_tokens': 220, 'sent_tokens': 70, 'saved': '68%'}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,35 @@
+import pytest
+from models.data_models import RiskLevel
+from utils.message_analysis import MessageAnalysis
+
+class TestMessageAnalysis:
+    def test_normalized_fields(self):
+        """Text is lowered, whitespace-collapsed and tokenized once"""
+        analysis = MessageAnalysis("  I'm  STRESSED about my Exams  ")
+        assert analysis.lowered == "i'm stressed about my exams"
+        assert {'stressed', 'exams'} <= analysis.tokens
+        assert analysis.word_count == 5
+
+    def test_patterns_and_risk(self):
+        """Patterns and crisis class come from the same scan"""
+        analysis = MessageAnalysis("I feel hopeless and can't sleep before my exam")
+        assert analysis.risk_level == RiskLevel.HIGH
+        assert analysis.immediate_action_required
+        assert not analysis.is_crisis
+        assert analysis.patterns[0] == 'hopeless'
+        assert 'academic_stress' in analysis.patterns
+        assert 'sleep_issues' in analysis.patterns
+
+    def test_crisis_includes_typos(self):
+        """The crisis class agrees with the fuzzy-aware detector"""
+        analysis = MessageAnalysis("i want to kil myself")
+        assert analysis.is_crisis
+        assert 'kill myself' in analysis.patterns
+
+    def test_emotional_distress_default(self):
+        """Longer messages without patterns fall back to emotional_distress"""
+        assert MessageAnalysis("things have been weird this week").patterns == ['emotional_distress']
+        assert MessageAnalysis("hello there").patterns == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from utils.micro_batcher import MicroBatcher
+
+class TestMicroBatcher:
+    def setup_method(self):
+        self.batches = []
+
+    async def double(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(0)
+        return [item * 2 for item in items]
+
+    def test_full_batch_goes_out_immediately(self):
+        async def run():
+            batcher = MicroBatcher(self.double, max_batch_size=3, max_wait=10.0)
+            return await asyncio.wait_for(asyncio.gather(*[batcher.submit(i) for i in range(3)]), 1.0)
+
+        assert asyncio.run(run()) == [0, 2, 4]
+        assert self.batches == [[0, 1, 2]]
+
+    def test_partial_batch_waits_at_most_max_wait(self):
+        async def run():
+            batcher = MicroBatcher(self.double, max_batch_size=8, max_wait=0.02)
+            first = await asyncio.gather(batcher.submit(1), batcher.submit(2))
+            second = await batcher.submit(3)
+            return first, second, batcher.mean_batch_size()
+
+        assert asyncio.run(run()) == ([2, 4], 6, 1.5)
+        assert self.batches == [[1, 2], [3]]
+
+    def test_errors_reach_every_caller_in_the_batch(self):
+        async def fail(items):
+            raise RuntimeError("upstream down")
+
+        async def short(items):
+            return items[:1]
+
+        async def run(process):
+            batcher = MicroBatcher(process, max_batch_size=2, max_wait=0.01)
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+        assert [type(error) for error in asyncio.run(run(fail))] == [RuntimeError, RuntimeError]
+        assert [type(error) for error in asyncio.run(run(short))] == [ValueError, ValueError]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
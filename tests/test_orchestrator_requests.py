@@ -0,0 +1,72 @@
+import time
+import asyncio
+import pytest
+from unittest.mock import Mock
+import agents.soromind_core as soromind
+from agents.soromind_core import UserSession, process_user_message_with_orchestrator
+from models.data_models import PatternAnalysisResponse as PatternAnalysisResult, RiskLevel
+
+MESSAGE = "My thoughts keep going round in circles lately"
+
+class TestOrchestratorRequests:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.sent = []
+        self.analysis_delay = 0.0
+
+        async def send(ctx, destination, message):
+            self.sent.append(message)
+            return True
+
+        async def analyze_message(ctx, session, message, prior_messages=None, risk_level=None):
+            self.prior_messages = prior_messages
+            await asyncio.sleep(self.analysis_delay)
+            return PatternAnalysisResult(patterns=['rumination'], confidence=0.8,
+                                         risk_assessment=RiskLevel.MEDIUM, suggested_interventions=[])
+
+        monkeypatch.setattr(soromind.outbound, 'send', send)
+        monkeypatch.setattr(soromind, 'analyze_message', analyze_message)
+        self.session = UserSession("test_session_003")
+
+    def process(self) -> str:
+        return asyncio.run(process_user_message_with_orchestrator(Mock(), MESSAGE, self.session))
+
+    def test_updated_patterns_join_the_initial_request(self, monkeypatch):
+        """An analysis slower than the window still yields one merged InterventionRequest"""
+        monkeypatch.setattr(soromind.intervention_queue, 'window', 0.05)
+        self.analysis_delay = 0.2
+        response = self.process()
+
+        assert len(self.sent) == 1
+        assert self.sent[0].patterns == ['emotional_distress', 'rumination']
+        assert "connected with our support team" in response
+
+    def test_fast_analysis_skips_the_window(self, monkeypatch):
+        """A cached analysis replies without waiting out the coalescing window"""
+        monkeypatch.setattr(soromind.intervention_queue, 'window', 5.0)
+        started = time.perf_counter()
+        response = self.process()
+
+        assert time.perf_counter() - started < 1.0
+        assert len(self.sent) == 1
+        assert "connected with our support team" in response
+
+    def test_failed_delivery_is_not_claimed(self, monkeypatch):
+        """The reply only mentions the support team once delivery succeeded"""
+        async def send(ctx, destination, message):
+            return False
+
+        monkeypatch.setattr(soromind.outbound, 'send', send)
+        assert "connected with our support team" not in self.process()
+
+    def test_history_is_fixed_at_arrival(self):
+        """A later message already in the session is not analysed as history"""
+        for text in ("first", MESSAGE, "a later message"):
+            self.session.add_message("user", text)
+        asyncio.run(process_user_message_with_orchestrator(
+            Mock(), MESSAGE, self.session, prior_messages=("first",)
+        ))
+        assert self.prior_messages == ("first",)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
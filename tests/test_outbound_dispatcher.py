@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from uagents_core.types import DeliveryStatus
+from utils.outbound_dispatcher import OutboundDispatcher
+
+class FakeContext:
+    """Records sends; destinations listed in ``failures`` fail that many times first"""
+
+    def __init__(self, failures=None, delay=0.0):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.sent = []
+        self.active = 0
+        self.peak = 0
+
+    async def send(self, destination, message):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.failures.get(destination, 0) > 0:
+            self.failures[destination] -= 1
+            return SimpleNamespace(status=DeliveryStatus.FAILED, detail="unreachable")
+        self.sent.append((destination, message))
+        return SimpleNamespace(status=DeliveryStatus.DELIVERED, detail="")
+
+async def no_sleep(delay):
+    await asyncio.sleep(0)
+
+class TestOutboundDispatcher:
+    def test_retries_failed_delivery(self):
+        """A FAILED delivery status is retried until it goes through"""
+        ctx = FakeContext(failures={'agent1orchestrator': 2})
+        dispatcher = OutboundDispatcher(max_attempts=4, sleep=no_sleep)
+
+        async def run():
+            return await dispatcher.send(ctx, 'agent1orchestrator', 'request')
+
+        assert asyncio.run(run()) is True
+        assert ctx.sent == [('agent1orchestrator', 'request')]
+        assert dispatcher.metrics()['agent1orchestrator']['retries'] == 2
+
+    def test_gives_up_after_max_attempts(self):
+        ctx = FakeContext(failures={'agent1psn': 10})
+        dispatcher = OutboundDispatcher(max_attempts=3, sleep=no_sleep)
+
+        async def run():
+            return await dispatcher.send(ctx, 'agent1psn', 'recommendation')
+
+        assert asyncio.run(run()) is False
+        metrics = dispatcher.metrics()['agent1psn']
+        assert (metrics['failed'], metrics['retries']) == (1, 2)
+
+    def test_slow_peer_does_not_block_others(self):
+        """A retrying destination leaves other destinations' queues moving"""
+        ctx = FakeContext(failures={'agent1slow': 10})
+
+        async def slow_sleep(delay):
+            await asyncio.sleep(0.05)
+
+        dispatcher = OutboundDispatcher(max_attempts=3, sleep=slow_sleep)
+
+        async def run():
+            slow = dispatcher.submit(ctx, 'agent1slow', 'a')
+            fast = await dispatcher.send(ctx, 'agent1fast', 'b')
+            return fast, slow.done(), dispatcher.metrics()['agent1slow']['queue_depth']
+
+        fast, slow_done, _ = asyncio.run(run())
+        assert fast is True and not slow_done
+
+    def test_in_flight_cap(self):
+        """No more than max_in_flight sends are outstanding at once"""
+        ctx = FakeContext(delay=0.01)
+        dispatcher = OutboundDispatcher(max_in_flight=2, workers_per_destination=4)
+
+        async def run():
+            deliveries = [dispatcher.submit(ctx, f'agent1peer{i % 3}', i) for i in range(12)]
+            return await asyncio.gather(*deliveries)
+
+        assert all(asyncio.run(run()))
+        assert ctx.peak == 2
+
+    def test_backoff_is_jittered_and_capped(self):
+        dispatcher = OutboundDispatcher(base_delay=0.5, max_delay=4.0, jitter=lambda: 1.0)
+        assert [dispatcher.backoff(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+        dispatcher.jitter = lambda: 0.5
+        assert dispatcher.backoff(3) == 1.0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
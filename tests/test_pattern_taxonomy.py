@@ -0,0 +1,66 @@
+import os
+import json
+import pytest
+from knowledge.pattern_taxonomy import PatternTaxonomy, SOMA_SECTION, get_pattern_taxonomy, tokenize
+
+class TestPatternTaxonomy:
+    def setup_method(self):
+        self.taxonomy = get_pattern_taxonomy()
+
+    def test_keyword_inflections(self):
+        """Common inflections fold onto taxonomy keywords"""
+        match = self.taxonomy.match_text("I'm stressed and studying for my exams")
+        assert match.category_ids == ['academic', 'stress']
+        assert match.patterns == ['academic_stress', 'stress']
+
+    def test_whole_tokens_only(self):
+        """Keywords no longer fire inside unrelated words"""
+        assert self.taxonomy.match_text("the latest update").categories == []
+
+    def test_phrases(self):
+        """Multi-word phrases match on consecutive tokens"""
+        assert self.taxonomy.match_text("I have no friends here").patterns == ['loneliness']
+        assert self.taxonomy.match_text("no, my friends are fine").patterns == []
+
+    def test_prefix_keywords_keep_inflections(self):
+        """Starred keywords catch the derived forms substring checks used to"""
+        cases = {
+            "so much sadness": ['depression'],
+            "sleepless nights": ['sleep_issues'],
+            "I panicked in class": ['anxiety'],
+            "this numbness": ['depression'],
+            "in such distress": ['stress'],
+        }
+        for message, patterns in cases.items():
+            assert self.taxonomy.match_text(message).patterns == patterns, message
+        assert self.taxonomy.match_text("pick a number").patterns == []
+
+    def test_agent_specific_outputs(self):
+        """SOMA's section keeps its own keywords and outputs"""
+        soma = get_pattern_taxonomy(SOMA_SECTION)
+        match = soma.match_text("exam stress, looking for a peer group")
+        assert match.cognitive_patterns == [
+            'academic_perfectionism', 'performance_anxiety', 'task_overload', 'boundary_issues'
+        ]
+        assert match.emotions == ['anxiety', 'stress']
+        assert match.enhanced_patterns == ['social_support_seeking']
+
+        # Only SoroMind treats "overwhelmed" as anxiety/stress
+        assert soma.match_text("I feel overwhelmed").cognitive_patterns == []
+        assert self.taxonomy.match_text("I feel overwhelmed").patterns == ['anxiety', 'stress']
+        assert 'academic_stress' in soma.match_text("academic pressure").enhanced_patterns
+
+    def test_custom_taxonomy_file(self, tmp_path):
+        """New categories come from data, not code"""
+        path = os.path.join(str(tmp_path), 'taxonomy.json')
+        with open(path, 'w') as f:
+            json.dump({'categories': [
+                {'id': 'grief', 'keywords': ['grief', 'mourning'], 'phrases': ['passed away'],
+                 'patterns': ['grief']}
+            ]}, f)
+        taxonomy = PatternTaxonomy(path)
+        assert taxonomy.match(tokenize("my gran passed away")).patterns == ['grief']
+        assert taxonomy.match(tokenize("so much grief")).emotions == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
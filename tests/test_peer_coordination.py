@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+import agents.soro_orchestrator as orchestrator
+from common_models import InterventionRequest, RiskLevel
+
+class TestPeerCoordination:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.sent = []
+        self.delivered = True
+
+        async def send(ctx, destination, message):
+            self.sent.append(message)
+            return self.delivered
+
+        monkeypatch.setattr(orchestrator.outbound, 'send', send)
+
+    def coordinate(self) -> dict:
+        request = InterventionRequest(
+            user_id="student-001",
+            user_state="Exams are piling up and I'd like a study group",
+            patterns=['academic_stress'],
+            risk_level=RiskLevel.MEDIUM,
+            timestamp="2026-10-17T00:00:00+00:00"
+        )
+        return asyncio.run(orchestrator.coordinate_support(Mock(), request, {'confidence': 0.8}))
+
+    def test_peer_support_reported_once_delivered(self):
+        result = self.coordinate()
+        assert result['peer_support_initiated']
+        assert 'PSN Connect' in result['agent_coordination']
+        assert len(self.sent) == 1
+
+    def test_undelivered_recommendation_is_not_reported(self):
+        """A recommendation PSN Connect never got must not be announced to the user"""
+        self.delivered = False
+        result = self.coordinate()
+        assert not result['peer_support_initiated']
+        assert 'PSN Connect' not in result['agent_coordination']
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
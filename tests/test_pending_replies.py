@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from utils.pending_replies import PendingReplies
+
+class TestPendingReplies:
+    def setup_method(self):
+        self.replies = PendingReplies(default_timeout=0.05)
+
+    def test_reply_reaches_its_waiter(self):
+        """A reply is delivered to the request carrying the same id"""
+        async def run():
+            first = self.replies.register()
+            second = self.replies.register()
+            asyncio.get_running_loop().call_soon(self.replies.resolve, second, 'second')
+            asyncio.get_running_loop().call_soon(self.replies.resolve, first, 'first')
+            return await self.replies.wait(first), await self.replies.wait(second)
+
+        assert asyncio.run(run()) == ('first', 'second')
+        assert len(self.replies) == 0
+
+    def test_timeout_then_late_reply(self):
+        """A missing reply times out; the late arrival is reported as unmatched"""
+        async def run():
+            request_id = self.replies.register()
+            result = await self.replies.wait(request_id)
+            return result, self.replies.resolve(request_id, 'late')
+
+        assert asyncio.run(run()) == (None, False)
+        assert self.replies.stats == {'resolved': 0, 'timeouts': 1, 'unmatched': 1}
+        assert len(self.replies) == 0
+
+    def test_unknown_ids_are_ignored(self):
+        """Replies without a known request id never raise"""
+        assert not self.replies.resolve(None, 'reply')
+        assert not self.replies.resolve('missing', 'reply')
+
+    def test_uncorrelated_replies_are_not_counted(self):
+        """A reply without a request id was never awaited, so it is not late"""
+        self.replies.resolve(None, 'reply')
+        assert self.replies.stats['unmatched'] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
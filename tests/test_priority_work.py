@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from utils.priority_work import (
+    PriorityWorkQueue, LatencyTracker, PRIORITY_CRISIS, PRIORITY_HIGH, PRIORITY_LOW
+)
+
+class TestPriorityWorkQueue:
+    def test_crisis_jumps_the_queue(self):
+        """With workers busy, a later crisis job runs before queued routine jobs"""
+        order = []
+
+        def job(name, delay=0.0):
+            async def run():
+                await asyncio.sleep(delay)
+                order.append(name)
+            return run
+
+        async def run():
+            queue = PriorityWorkQueue(workers=1, bypass_priority=None)
+            queue.submit(PRIORITY_LOW, job('busy', 0.02), label='low')
+            await asyncio.sleep(0)
+            queue.submit(PRIORITY_LOW, job('routine1'), label='low')
+            queue.submit(PRIORITY_LOW, job('routine2'), label='low')
+            queue.submit(PRIORITY_CRISIS, job('crisis'), label='crisis')
+            await queue.join(timeout=1.0)
+
+        asyncio.run(run())
+        assert order == ['busy', 'crisis', 'routine1', 'routine2']
+
+    def test_crisis_bypasses_busy_workers(self):
+        """With every worker busy, a crisis job starts at once instead of waiting"""
+        order = []
+
+        def job(name, delay=0.0):
+            async def run():
+                await asyncio.sleep(delay)
+                order.append(name)
+            return run
+
+        async def run():
+            queue = PriorityWorkQueue(workers=2)
+            for name in ('busy1', 'busy2', 'routine'):
+                queue.submit(PRIORITY_LOW, job(name, 0.2), label='low')
+            await asyncio.sleep(0)
+            queue.submit(PRIORITY_CRISIS, job('crisis'), label='crisis')
+            queue.submit(PRIORITY_HIGH, job('high', 0.01), label='high')
+            await asyncio.sleep(0.05)
+            early = list(order)
+            await queue.join(timeout=1.0)
+            return early
+
+        assert asyncio.run(run()) == ['crisis', 'high']
+        assert order[2:] == ['busy1', 'busy2', 'routine']
+
+    def test_failing_job_keeps_worker_alive(self):
+        done = []
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        async def ok():
+            done.append(True)
+
+        async def run():
+            queue = PriorityWorkQueue(workers=1)
+            queue.submit(PRIORITY_LOW, broken)
+            queue.submit(PRIORITY_LOW, ok)
+            await queue.join(timeout=1.0)
+
+        asyncio.run(run())
+        assert done == [True]
+
+class TestLatencyTracker:
+    def test_percentiles_per_class(self):
+        tracker = LatencyTracker(window=100)
+        for i in range(100):
+            tracker.record('low', i / 1000)
+        tracker.record('crisis', 0.005)
+        assert tracker.percentile('low', 0.99) == 0.099
+        assert tracker.percentile('low', 0.5) == 0.05
+        assert tracker.percentile('crisis', 0.99) == 0.005
+        assert tracker.percentile('medium', 0.99) is None
+        assert 'crisis: p99=5ms (n=1)' in tracker.report()
+
+    def test_window_keeps_recent_samples(self):
+        tracker = LatencyTracker(window=3)
+        for value in [1.0, 1.0, 1.0, 0.1, 0.1, 0.1]:
+            tracker.record('low', value)
+        assert tracker.count('low') == 3
+        assert tracker.percentile('low', 0.99) == 0.1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
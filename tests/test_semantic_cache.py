@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from utils.semantic_cache import SemanticCache, ngram_vectors
+
+class TestSemanticCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+        self.cache = SemanticCache(max_entries=2, threshold=0.9, ttl=10.0, clock=self.clock)
+
+    def test_vectors_are_unit_length(self):
+        vectors = ngram_vectors(["exams are stressing me out", ""])
+        assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+        assert not vectors[1].any()
+
+    def test_near_duplicates_share_a_value(self):
+        self.cache.put("my exams are stressing me out", (), 'analysis')
+        assert self.cache.get("exams are stressing me out", ()) == 'analysis'
+        assert self.cache.get("I had a nice lunch today", ()) is None
+        # Same wording in a different conversation doesn't match
+        assert self.cache.get("my exams are stressing me out", ("earlier",)) is None
+        assert (self.cache.stats['hits'], self.cache.stats['misses']) == (1, 2)
+
+    def test_batch_lookup(self):
+        self.cache.put("my exams are stressing me out", (), 'exams')
+        self.cache.put("I can't sleep at night", (), 'sleep')
+        results = self.cache.lookup_many(
+            ["I can't sleep at night!", "exams are stressing me out", "lunch was nice"], [(), (), ()]
+        )
+        assert results == ['sleep', 'exams', None]
+
+    def test_bounded_with_lru_eviction(self):
+        self.cache.put("my exams are stressing me out", (), 'exams')
+        self.cache.put("I can't sleep at night", (), 'sleep')
+        self.clock.now = 1.0
+        self.cache.get("exams are stressing me out", ())
+        self.cache.put("I feel lonely at college", (), 'lonely')
+        assert len(self.cache) == 2
+        assert self.cache.stats['evicted'] == 1
+        assert self.cache.get("I can't sleep at night", ()) is None
+        assert self.cache.get("my exams are stressing me out", ()) == 'exams'
+
+    def test_entries_expire(self):
+        self.cache.put("my exams are stressing me out", (), 'exams')
+        self.clock.now = 10.0
+        assert self.cache.get("my exams are stressing me out", ()) is None
+        assert len(self.cache) == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
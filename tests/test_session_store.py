@@ -0,0 +1,189 @@
+import os
+import time
+import asyncio
+import pytest
+from utils.session_store import SessionStore, EVICTED_CAPACITY, EVICTED_EXPIRED
+from utils.session_backend import SQLiteSessionBackend, SessionRecord
+
+class TestSessionStore:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+        self.evicted = []
+        self.store = SessionStore(max_sessions=3, idle_ttl=60.0, clock=self.clock)
+        self.store.add_eviction_callback(
+            lambda session_id, session, reason: self.evicted.append((session_id, reason))
+        )
+
+    def test_lru_capacity(self):
+        """Inserting past capacity evicts the least recently used session"""
+        for session_id in ['a', 'b', 'c']:
+            self.store[session_id] = session_id.upper()
+        self.store.get('a')
+        self.store['d'] = 'D'
+        assert len(self.store) == 3
+        assert 'b' not in self.store
+        assert self.evicted == [('b', EVICTED_CAPACITY)]
+
+    def test_idle_ttl_sweep(self):
+        """Idle sessions are swept; active ones survive"""
+        self.store['a'] = 'A'
+        self.store['b'] = 'B'
+        self.clock.now = 45.0
+        self.store.get('b')
+        self.clock.now = 90.0
+        assert self.store.sweep() == 1
+        assert self.evicted == [('a', EVICTED_EXPIRED)]
+        assert self.store['b'] == 'B'
+
+    def test_expired_on_access(self):
+        """A session past its TTL is gone even before the sweeper runs"""
+        self.store['a'] = 'A'
+        self.clock.now = 61.0
+        assert self.store.get('a') is None
+        assert self.evicted == [('a', EVICTED_EXPIRED)]
+
+    def test_explicit_end_skips_callbacks(self):
+        """Ending a session explicitly does not trigger eviction callbacks"""
+        self.store['a'] = 'A'
+        assert self.store.pop('a') == 'A'
+        assert self.evicted == []
+        assert self.store.evictions == {EVICTED_EXPIRED: 0, EVICTED_CAPACITY: 0}
+
+class TestSenderAffinity:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+        self.store = SessionStore(max_sessions=2, idle_ttl=60.0, clock=self.clock)
+
+    def test_repeat_sender_reuses_session(self):
+        """Messages from the same sender land in the same session"""
+        first_id, first = self.store.get_or_create_for_sender("agent1alice", lambda session_id: [session_id])
+        second_id, second = self.store.get_or_create_for_sender("agent1alice", lambda session_id: [session_id])
+        other_id, _ = self.store.get_or_create_for_sender("agent1bob", lambda session_id: [session_id])
+        assert first_id == second_id and first is second
+        assert other_id != first_id
+
+    def test_conversation_ids_are_separate(self):
+        """A conversation id scopes affinity within one sender"""
+        a_id, _ = self.store.get_or_create_for_sender("agent1alice", list, conversation_id="c1")
+        b_id, _ = self.store.get_or_create_for_sender("agent1alice", list, conversation_id="c2")
+        assert a_id != b_id
+        assert self.store.session_id_for_sender("agent1alice", "c1") == a_id
+
+    def test_index_follows_expiry_and_eviction(self):
+        """Expired, evicted or ended sessions drop out of the sender index"""
+        alice_id, _ = self.store.get_or_create_for_sender("agent1alice", list)
+        self.clock.now = 61.0
+        assert self.store.session_id_for_sender("agent1alice") is None
+
+        bob_id, _ = self.store.get_or_create_for_sender("agent1bob", list)
+        self.store.get_or_create_for_sender("agent1carol", list)
+        self.store.get_or_create_for_sender("agent1dave", list)
+        assert self.store.session_id_for_sender("agent1bob") is None
+
+        carol_id = self.store.session_id_for_sender("agent1carol")
+        self.store.pop(carol_id)
+        assert self.store.session_id_for_sender("agent1carol") is None
+
+    def test_rebinding_replaces_previous_session(self):
+        """A new StartSession moves the sender to the new session"""
+        old_id, _ = self.store.get_or_create_for_sender("agent1alice", list)
+        self.store['fresh'] = []
+        self.store.bind_sender("agent1alice", 'fresh')
+        assert self.store.session_id_for_sender("agent1alice") == 'fresh'
+        self.store.pop(old_id)
+        assert self.store.session_id_for_sender("agent1alice") == 'fresh'
+
+class TestWriteBehindPersistence:
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_clock):
+        self.clock = fake_clock
+
+    def make_store(self, backend, max_sessions=10):
+        return SessionStore(
+            max_sessions=max_sessions, idle_ttl=60.0, clock=self.clock, backend=backend,
+            serializer=lambda session: {'items': session},
+            deserializer=lambda session_id, data: data['items']
+        )
+
+    def test_writes_are_batched_until_flush(self, tmp_path):
+        """Nothing reaches SQLite until the write-behind flush"""
+        backend = SQLiteSessionBackend(os.path.join(str(tmp_path), 'sessions.db'))
+        store = self.make_store(backend)
+        store['a'] = ['hello']
+        store['b'] = []
+        assert backend.load('a') is None
+        assert store.flush() == 2
+        assert backend.load('a').data == {'items': ['hello']}
+        assert store.flush() == 0
+
+    def test_lazy_restore_after_restart(self, tmp_path):
+        """A fresh store reloads sessions and sender affinity on first access"""
+        path = os.path.join(str(tmp_path), 'sessions.db')
+        store = self.make_store(SQLiteSessionBackend(path))
+        session_id, session = store.get_or_create_for_sender("agent1alice", lambda session_id: [])
+        session.append('risk:high')
+        store.mark_dirty(session_id)
+        store.flush()
+        store.backend.close()
+
+        restarted = self.make_store(SQLiteSessionBackend(path))
+        assert len(restarted) == 0
+        # The synchronous lookup never queries SQLite on the event loop
+        assert restarted.session_id_for_sender("agent1alice") is None
+        assert asyncio.run(restarted.restore_for_sender("agent1alice")) == session_id
+        assert restarted.session_id_for_sender("agent1alice") == session_id
+        assert restarted[session_id] == ['risk:high']
+
+    def test_restore_keeps_a_live_session(self, tmp_path):
+        """A sender bound while the backend query ran keeps its in-memory session"""
+        backend = SQLiteSessionBackend(os.path.join(str(tmp_path), 'sessions.db'))
+        backend.write_batch([SessionRecord('stored', {'items': ['old']}, "agent1alice", None, time.time())], [])
+        store = self.make_store(backend)
+        live_id, live = store.get_or_create_for_sender("agent1alice", lambda session_id: ['live'])
+        assert asyncio.run(store.restore_for_sender("agent1alice")) is None
+        assert store.session_id_for_sender("agent1alice") == live_id
+        assert 'stored' not in store._entries
+
+    def test_flush_prunes_stale_rows_by_index(self, tmp_path):
+        """The idle-TTL prune runs with the batch write and uses the updated_at index"""
+        backend = SQLiteSessionBackend(os.path.join(str(tmp_path), 'sessions.db'))
+        backend.write_batch([SessionRecord('old', {'items': []}, None, None, time.time() - 120)], [])
+        store = self.make_store(backend)
+        store['a'] = ['x']
+        assert asyncio.run(store.flush_async()) == 1
+        assert backend.load('old') is None
+        assert backend.load('a') is not None
+
+        plan = backend._conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM sessions WHERE updated_at < ?", (0,)
+        ).fetchall()
+        assert any('idx_sessions_updated_at' in row[-1] for row in plan)
+
+    def test_ended_and_stale_sessions_are_not_restored(self, tmp_path):
+        """Explicitly ended sessions are deleted; stale rows are ignored"""
+        backend = SQLiteSessionBackend(os.path.join(str(tmp_path), 'sessions.db'))
+        store = self.make_store(backend)
+        store['a'] = ['x']
+        store.flush()
+        store.pop('a')
+        store.flush()
+        assert backend.load('a') is None
+
+        backend.write_batch([SessionRecord('old', {'items': []}, None, None, time.time() - 120)], [])
+        assert self.make_store(backend).get('old') is None
+
+    def test_capacity_eviction_spills_dirty_sessions(self, tmp_path):
+        """An unflushed session pushed out by LRU pressure can still be restored"""
+        backend = SQLiteSessionBackend(os.path.join(str(tmp_path), 'sessions.db'))
+        store = self.make_store(backend, max_sessions=1)
+        store['a'] = ['first']
+        store['b'] = ['second']
+        assert 'a' not in store._entries
+        assert store.get('a') == ['first']
+        store.flush()
+        assert backend.load('b').data == {'items': ['second']}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,36 @@
+import pytest
+from agents.soromind_core import UserSession
+
+class TestUserSession:
+    def setup_method(self):
+        self.session = UserSession("test_session_002")
+    
+    def test_ring_buffer_capacity(self):
+        """History keeps only the most recent HISTORY_CAPACITY messages"""
+        for i in range(UserSession.HISTORY_CAPACITY + 5):
+            self.session.add_message("user", f"message {i}")
+        
+        history = self.session.message_history
+        assert self.session.message_count == UserSession.HISTORY_CAPACITY
+        assert history[0]['content'] == "message 5"
+        assert history[-1]['content'] == f"message {UserSession.HISTORY_CAPACITY + 4}"
+    
+    def test_user_view_tracks_ring(self):
+        """The user-only view drops user messages as they leave the ring"""
+        for i in range(30):
+            self.session.add_message("user" if i % 2 == 0 else "assistant", f"m{i}")
+        
+        expected = tuple(msg['content'] for msg in self.session.message_history if msg['role'] == 'user')
+        assert self.session.user_messages() == expected
+    
+    def test_user_view_cached(self):
+        """Assistant replies do not rebuild the user-only view"""
+        self.session.add_message("user", "hello")
+        view = self.session.user_messages()
+        self.session.add_message("assistant", "hi there")
+        assert self.session.user_messages() is view
+        self.session.add_message("user", "again")
+        assert self.session.user_messages() == ("hello", "again")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
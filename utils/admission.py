@@ -0,0 +1,96 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# Admission decisions
+ADMIT_FULL = "full"          # full pipeline, including pattern analysis
+ADMIT_DEGRADED = "degraded"  # intent templates / fallback only - no ASI work
+ADMIT_CRISIS = "crisis"      # always admitted, never rate limited
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second up to ``capacity``"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def try_take(self, now: float, tokens: float = 1.0) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+
+class AdmissionController:
+    """Per-sender and global rate limits plus a cap on concurrent analyses.
+
+    Messages over either rate limit are still answered, but from the cheap
+    intent-template path. Crisis-classified messages skip every limit.
+    """
+
+    def __init__(self, sender_rate: float = 0.5, sender_burst: float = 5,
+                 global_rate: float = 20.0, global_burst: float = 40,
+                 max_concurrent_analyses: int = 8, max_tracked_senders: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sender_rate = sender_rate
+        self.sender_burst = sender_burst
+        self.max_tracked_senders = max_tracked_senders
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_burst, clock())
+        self._sender_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.max_concurrent_analyses = max_concurrent_analyses
+        self._analysis_slots: Optional[asyncio.Semaphore] = None
+        self.analyses_in_flight = 0
+        self.stats: Dict[str, int] = {
+            ADMIT_FULL: 0, ADMIT_DEGRADED: 0, ADMIT_CRISIS: 0, 'analysis_overflow': 0
+        }
+
+    def _sender_bucket(self, sender: str, now: float) -> TokenBucket:
+        bucket = self._sender_buckets.get(sender)
+        if bucket is None:
+            bucket = self._sender_buckets[sender] = TokenBucket(self.sender_rate, self.sender_burst, now)
+            # Forgetting the least recent sender only hands it a full bucket
+            if len(self._sender_buckets) > self.max_tracked_senders:
+                self._sender_buckets.popitem(last=False)
+        else:
+            self._sender_buckets.move_to_end(sender)
+        return bucket
+
+    def admit(self, sender: str, is_crisis: bool = False) -> str:
+        """Decide how much work an inbound message gets"""
+        if is_crisis:
+            self.stats[ADMIT_CRISIS] += 1
+            return ADMIT_CRISIS
+
+        now = self.clock()
+        # Check the sender first so a flooding client can't drain the global bucket
+        if self._sender_bucket(sender, now).try_take(now) and self.global_bucket.try_take(now):
+            decision = ADMIT_FULL
+        else:
+            decision = ADMIT_DEGRADED
+        self.stats[decision] += 1
+        return decision
+
+    async def acquire_analysis(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` for an analysis slot; False means answer without one"""
+        if self._analysis_slots is None:
+            self._analysis_slots = asyncio.Semaphore(self.max_concurrent_analyses)
+        try:
+            await asyncio.wait_for(self._analysis_slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stats['analysis_overflow'] += 1
+            return False
+        self.analyses_in_flight += 1
+        return True
+
+    def release_analysis(self):
+        self.analyses_in_flight -= 1
+        self._analysis_slots.release()
@@ -1,84 +1,555 @@
 import os
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import re
+import json
+import time
+import asyncio
+import hashlib
+import httpx
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Callable, Awaitable
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
 from models.data_models import RiskLevel, PatternAnalysisResponse
+from utils.crisis_lexicon import CrisisLexicon
+from utils.crisis_detector import lexicon_risk
+from utils.ttl_cache import TTLCache
+from utils.semantic_cache import SemanticCache
+from utils.single_flight import SingleFlight
+from utils.micro_batcher import MicroBatcher
+from utils.circuit_breaker import CircuitBreaker
+from utils.local_analyzer import analyze_locally
+from utils.history_summary import HistorySummary, SummaryText, TokenLedger, compact_history
 
-class ASIClient:
+ASI_BASE_URL = "https://api.asi1.ai/v1"
+
+# Prior messages sent to the model (and therefore part of the cache key)
+HISTORY_WINDOW = 5
+
+# Vocabularies the keyword parser scans for and structured replies must use
+COGNITIVE_PATTERNS = [
+    'perfectionism', 'catastrophizing', 'black-white thinking', 
+    'overgeneralization', 'personalization', 'mind reading',
+    'emotional reasoning', 'should statements', 'labeling'
+]
+INTERVENTIONS = [
+    'CBT', 'mindfulness', 'breathing exercises', 'journaling',
+    'behavioral activation', 'exposure therapy', 'DBT skills',
+    'social connection', 'professional help'
+]
+
+PROSE_SYSTEM_PROMPT = """You are a computational psychiatry expert. Analyze the user's message for:
+1. Cognitive patterns (perfectionism, catastrophizing, black-and-white thinking, etc.)
+2. Emotional states (anxiety, depression, stress, etc.)
+3. Risk level (low, medium, high, crisis)
+4. Suggested evidence-based interventions
+
+Respond with specific patterns found and confidence levels."""
+
+def _numbered(vocabulary: List[str]) -> str:
+    return ", ".join(f"{index}={name}" for index, name in enumerate(vocabulary))
+
+# Compact reply schema: vocabulary ids instead of names, one-letter keys
+# Risk comes first so a streamed reply can be routed before the rest arrives
+ANALYSIS_SCHEMA = '{"r": "low|medium|high|crisis", "p": [pattern ids], "i": [intervention ids]}'
+VOCABULARY_PROMPT = f"""Pattern ids: {_numbered(COGNITIVE_PATTERNS)}
+Intervention ids: {_numbered(INTERVENTIONS)}"""
+
+STRUCTURED_SYSTEM_PROMPT = f"""You are a computational psychiatry expert. Analyze the user's message
+(earlier turns are context) for cognitive patterns, risk level and evidence-based interventions.
+
+Reply with ONLY this JSON, no prose: {ANALYSIS_SCHEMA}
+{VOCABULARY_PROMPT}"""
+
+BATCH_SYSTEM_PROMPT = f"""You are a computational psychiatry expert. The user sends a JSON list of
+{{"id", "history", "message"}} items from different people. Analyze each message
+on its own (history is that person's earlier messages; an optional "summary" is
+a generated digest of their older messages).
+
+Reply with ONLY a JSON list, one object per item, each {{"id": <id>}} plus {ANALYSIS_SCHEMA}
+{VOCABULARY_PROMPT}"""
+
+# Completion budgets; the compact schema needs a few dozen tokens per message
+STRUCTURED_MAX_TOKENS = 60
+BATCH_TOKENS_PER_ITEM = 60
+
+def _known(values: Any, vocabulary: List[str]) -> List[str]:
+    """Map model output (ids, or names case-insensitively) onto a fixed vocabulary"""
+    canonical = {name.lower(): name for name in vocabulary}
+    if not isinstance(values, list):
+        return []
+    names = []
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            if 0 <= value < len(vocabulary):
+                names.append(vocabulary[value])
+        elif str(value).lower() in canonical:
+            names.append(canonical[str(value).lower()])
+    return list(dict.fromkeys(names))
+
+def parse_structured_reply(text: str) -> Optional[Dict[str, Any]]:
+    """The JSON object in a structured reply, or None if there isn't a usable one"""
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    try:
+        fields = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return fields if isinstance(fields, dict) and 'r' in fields else None
+
+STREAMED_RISK = re.compile(r'"r"\s*:\s*"(\w+)"')
+
+def streamed_risk(text: str) -> Optional[RiskLevel]:
+    """Risk level from a partial structured reply, once the model has written it"""
+    match = STREAMED_RISK.search(text)
+    if match is None:
+        return None
+    try:
+        return RiskLevel(match.group(1).lower())
+    except ValueError:
+        return None
+
+def parse_batch_reply(text: str) -> Dict[int, Dict[str, Any]]:
+    """Per-item result objects from a batch reply, keyed by id; {} if unparseable"""
+    start, end = text.find('['), text.rfind(']')
+    if start < 0 or end <= start:
+        return {}
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return {
+        item['id']: item for item in items
+        if isinstance(item, dict) and isinstance(item.get('id'), int)
+    }
+
+def split_summary(history: List[str]) -> Tuple[Optional[str], List[str]]:
+    """(generated session summary or None, the user's own earlier messages)"""
+    if history and isinstance(history[0], SummaryText):
+        return str(history[0]), history[1:]
+    return None, history
+
+def conversation(system_prompt: str, user_message: str, history: List[str]) -> List[Dict[str, str]]:
+    """Chat messages for one analysis.
+
+    A session summary goes in its own system turn; the user's prior
+    messages go in one context turn.
+    """
+    summary, history = split_summary(history)
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary is not None:
+        messages.append({"role": "system", "content": summary})
+    if history:
+        messages.append({
+            "role": "user",
+            "content": "Context - my earlier messages:\n" + "\n".join(f"- {text}" for text in history)
+        })
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+def analysis_cache_key(user_message: str, history: List[str]) -> str:
+    """Hash of the normalized message plus the history context sent with it"""
+    digest = hashlib.blake2b(digest_size=16)
+    for text in history + [user_message]:
+        if isinstance(text, SummaryText):
+            digest.update(b'\x1e')
+        digest.update(CrisisLexicon.normalize(text).encode())
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+class RiskBroadcast:
+    """Fans one stream's risk reading out to every caller sharing the stream"""
+    
     def __init__(self):
-        api_key = os.getenv('ASI_API_KEY')
+        self.risk_level: Optional[RiskLevel] = None
+        self.listeners: List[Callable[[RiskLevel], Awaitable[bool]]] = []
+    
+    async def join(self, on_risk: Optional[Callable[[RiskLevel], Awaitable[bool]]]):
+        if on_risk is None:
+            return
+        if self.risk_level is None:
+            self.listeners.append(on_risk)
+        else:
+            # Joined after the reading arrived - too late to stop the stream
+            await on_risk(self.risk_level)
+    
+    async def publish(self, risk_level: RiskLevel) -> bool:
+        """Notify every listener; True (stop the stream) only if all of them ask to"""
+        self.risk_level = risk_level
+        stops = [await on_risk(risk_level) for on_risk in self.listeners]
+        return bool(stops) and all(stops)
+
+class ASIClient:
+    """Non-blocking ASI:One client over a bounded keep-alive connection pool.
+
+    ASI_BASE_URL points it at any OpenAI-compatible server (e.g. a local
+    stand-in for tests); ASI_MAX_CONCURRENCY and ASI_TIMEOUT bound load
+    and latency. While ASI is failing or missing ASI_LATENCY_SLO, a circuit
+    breaker routes analyses to the local analyzer (marked ``degraded``).
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        api_key = api_key or os.getenv('ASI_API_KEY')
         if not api_key:
             raise ValueError("ASI_API_KEY environment variable is required")
         
-        self.client = OpenAI(
+        self.model = os.getenv('ASI_MODEL', 'asi1-extended')
+        self.max_concurrency = max_concurrency or int(os.getenv('ASI_MAX_CONCURRENCY', '8'))
+        timeout = timeout or float(os.getenv('ASI_TIMEOUT', '20'))
+        
+        # Pool sized to the concurrency limit so every slot can reuse a warm connection
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60.0
+            ),
+            timeout=Timeout(timeout, connect=5.0)
+        )
+        self.client = AsyncOpenAI(
             api_key=api_key,
-            base_url="https://api.asi1.ai/v1"
+            base_url=base_url or os.getenv('ASI_BASE_URL', ASI_BASE_URL),
+            http_client=self.http_client,
+            max_retries=int(os.getenv('ASI_MAX_RETRIES', '1'))
         )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        
+        # Identical analyses are common; ASI_CACHE_SIZE=0 disables the cache
+        cache_size = int(os.getenv('ASI_CACHE_SIZE', '2048'))
+        self.cache: Optional[TTLCache[str, PatternAnalysisResponse]] = TTLCache(
+            max_entries=cache_size,
+            ttl=float(os.getenv('ASI_CACHE_TTL', '600'))
+        ) if cache_size > 0 else None
+        # Near-duplicate messages (same history) reuse an analysis; ASI_SEMANTIC_CACHE_SIZE=0 disables
+        semantic_size = int(os.getenv('ASI_SEMANTIC_CACHE_SIZE', '512'))
+        self.semantic_cache: Optional[SemanticCache[PatternAnalysisResponse]] = SemanticCache(
+            max_entries=semantic_size,
+            threshold=float(os.getenv('ASI_SEMANTIC_THRESHOLD', '0.9')),
+            ttl=float(os.getenv('ASI_CACHE_TTL', '600'))
+        ) if semantic_size > 0 else None
+        self._single_flight: SingleFlight[str, PatternAnalysisResponse] = SingleFlight()
+        # Streamed analyses are shared the same way; callers joining late still get the risk
+        self._stream_flight: SingleFlight[str, PatternAnalysisResponse] = SingleFlight()
+        self._risk_broadcasts: Dict[str, RiskBroadcast] = {}
+        
+        # Compact JSON replies; the keyword scan stays as fallback (ASI_STRUCTURED_OUTPUT=0 for prose)
+        self.structured_output = os.getenv('ASI_STRUCTURED_OUTPUT', '1') != '0'
+        self.structured_fallbacks = 0
+        # Streamed analyses let callers act on the risk level early (ASI_STREAMING=0 disables)
+        self.streaming = os.getenv('ASI_STREAMING', '1') != '0'
+        self.stream_stats: Dict[str, int] = {'early_exits': 0}
+        
+        # Fail over to the local analyzer while ASI errors or misses the latency SLO
+        self.breaker = CircuitBreaker(
+            failure_threshold=float(os.getenv('ASI_BREAKER_FAILURE_RATE', '0.5')),
+            latency_slo=float(os.getenv('ASI_LATENCY_SLO', '5')),
+            open_for=float(os.getenv('ASI_BREAKER_OPEN_SECONDS', '30'))
+        )
+        
+        # Long histories are replaced by the session summary past this many tokens
+        self.history_token_budget = int(os.getenv('ASI_HISTORY_TOKEN_BUDGET', '120'))
+        self.history_tokens = TokenLedger()
+        
+        # Micro-batching: ASI_BATCH_SIZE > 1 folds concurrent users into one completion
+        batch_size = int(os.getenv('ASI_BATCH_SIZE', '1'))
+        self._batcher: Optional[MicroBatcher[Tuple[str, List[str]], PatternAnalysisResponse]] = MicroBatcher(
+            self._complete_batch,
+            max_batch_size=batch_size,
+            max_wait=float(os.getenv('ASI_BATCH_MAX_WAIT_MS', '15')) / 1000
+        ) if batch_size > 1 else None
     
-    async def analyze_mental_patterns(self, user_message: str, session_history: List[str]) -> PatternAnalysisResponse:
-        """Use ASI:One to analyze mental patterns and provide insights"""
-        try:
-            # Build conversation context
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a computational psychiatry expert. Analyze the user's message for:
-1. Cognitive patterns (perfectionism, catastrophizing, black-and-white thinking, etc.)
-2. Emotional states (anxiety, depression, stress, etc.)
-3. Risk level (low, medium, high, crisis)
-4. Suggested evidence-based interventions
+    async def aclose(self):
+        await self.client.close()
+    
+    @asynccontextmanager
+    async def _upstream_call(self):
+        """Hold a concurrency slot and feed the call's outcome to the circuit breaker"""
+        # Read before queueing for a slot: a call admitted under an earlier breaker state is a straggler
+        generation = self.breaker.generation
+        async with self._slots:
+            # Timed from slot acquisition, so local queueing doesn't count as upstream slowness
+            started = time.perf_counter()
+            try:
+                yield
+            except BaseException:
+                # Includes cancellation by a caller's deadline
+                self.breaker.record(time.perf_counter() - started, False, generation)
+                raise
+            self.breaker.record(time.perf_counter() - started, True, generation)
+    
+    def _history_context(self, session_history: Sequence[str], summary: Optional[HistorySummary]) -> List[str]:
+        """Raw history window, or the session summary plus what fits once it's over budget"""
+        history, raw_tokens, sent_tokens = compact_history(
+            session_history, summary, HISTORY_WINDOW, self.history_token_budget
+        )
+        self.history_tokens.record(raw_tokens, sent_tokens)
+        return history
+    
+    async def analyze_mental_patterns(self, user_message: str, session_history: Sequence[str],
+                                      summary: Optional[HistorySummary] = None,
+                                      risk_level: Optional[RiskLevel] = None) -> PatternAnalysisResponse:
+        """Use ASI:One to analyze mental patterns and provide insights.
 
-Respond with specific patterns found and confidence levels."""
-                }
-            ]
-            
-            # Add session history for context
-            for msg in session_history[-5:]:  # Last 5 messages for context
-                messages.append({"role": "user" if len(messages) % 2 == 1 else "assistant", "content": msg})
-            
-            messages.append({"role": "user", "content": user_message})
-            
-            response = self.client.chat.completions.create(
-                model="asi1-extended",
+        ``session_history`` is the user's earlier messages (not including
+        this one); with a ``summary`` long histories are sent compacted.
+        ``risk_level`` is the caller's lexicon reading of the message, if it
+        already has one. Results are cached by message and history context,
+        except for CRISIS-risk content, which always gets a fresh analysis.
+        """
+        return await self._analyze_cached(
+            user_message, self._history_context(session_history, summary), lexicon_risk(user_message, risk_level)
+        )
+    
+    def _lookup(self, user_message: str, history: List[str], request_key: str,
+                risk_level: RiskLevel) -> Optional[PatternAnalysisResponse]:
+        """Exact cache, then near-duplicates; crisis content always gets a fresh analysis"""
+        if risk_level == RiskLevel.CRISIS:
+            return None
+        cached = self.cache.get(request_key) if self.cache is not None else None
+        # A near-duplicate is only reused when the message has no crisis-lexicon hit at all
+        if cached is None and self.semantic_cache is not None and risk_level == RiskLevel.LOW:
+            cached = self.semantic_cache.get(user_message, tuple(history))
+        return cached
+    
+    def _remember(self, user_message: str, history: List[str], request_key: str,
+                  risk_level: RiskLevel, analysis: PatternAnalysisResponse):
+        if RiskLevel.CRISIS in (risk_level, analysis.risk_assessment):
+            return
+        if self.cache is not None:
+            self.cache.put(request_key, analysis)
+        if self.semantic_cache is not None and risk_level == RiskLevel.LOW:
+            self.semantic_cache.put(user_message, tuple(history), analysis)
+    
+    async def _analyze_cached(self, user_message: str, history: List[str],
+                              risk_level: RiskLevel) -> PatternAnalysisResponse:
+        request_key = analysis_cache_key(user_message, history)
+        cached = self._lookup(user_message, history, request_key, risk_level)
+        if cached is not None:
+            return cached
+        
+        # ASI is failing or too slow - answer locally instead of waiting out the timeout
+        if not self.breaker.allow():
+            return analyze_locally(user_message, risk_level)
+        
+        # Concurrent identical requests share one completion
+        return await self._single_flight.do(
+            request_key,
+            lambda: self._analyze(user_message, history, request_key, risk_level)
+        )
+    
+    async def stream_mental_patterns(self, user_message: str, session_history: Sequence[str],
+                                     on_risk: Optional[Callable[[RiskLevel], Awaitable[bool]]] = None,
+                                     summary: Optional[HistorySummary] = None,
+                                     risk_level: Optional[RiskLevel] = None) -> PatternAnalysisResponse:
+        """Like analyze_mental_patterns, but reports the risk level as soon as it streams in.
+
+        ``on_risk`` is awaited once with the model's risk level; returning True
+        stops the stream there, and the (uncached) result carries only the risk.
+        Concurrent identical requests share one stream, which stops early only
+        if every caller's ``on_risk`` asks it to. Cache hits, prose mode and
+        micro-batching report risk after the fact. Degraded local analyses
+        aren't reported - their risk is the lexicon's.
+        """
+        history = self._history_context(session_history, summary)
+        request_key = analysis_cache_key(user_message, history)
+        risk_level = lexicon_risk(user_message, risk_level)
+        is_crisis = risk_level == RiskLevel.CRISIS
+        cached = self._lookup(user_message, history, request_key, risk_level)
+        
+        if cached is None and self.streaming and self.structured_output and (self._batcher is None or is_crisis):
+            broadcast = self._risk_broadcasts.get(request_key)
+            if broadcast is None:
+                if not self.breaker.allow():
+                    return analyze_locally(user_message, risk_level)
+                broadcast = self._risk_broadcasts[request_key] = RiskBroadcast()
+            await broadcast.join(on_risk)
+            try:
+                return await self._stream_flight.do(
+                    request_key,
+                    lambda: self._stream_and_remember(user_message, history, request_key, risk_level, broadcast)
+                )
+            except Exception as e:
+                print(f"Error in ASI:One streaming analysis: {e}")
+                return analyze_locally(user_message, risk_level)
+        
+        analysis = cached or await self._analyze_cached(user_message, history, risk_level)
+        if on_risk is not None and not analysis.degraded:
+            await on_risk(analysis.risk_assessment)
+        return analysis
+    
+    async def _stream_and_remember(self, user_message: str, history: List[str], request_key: str,
+                                   risk_level: RiskLevel, broadcast: 'RiskBroadcast') -> PatternAnalysisResponse:
+        try:
+            analysis, complete = await self._stream_single(user_message, history, broadcast.publish)
+        finally:
+            if self._risk_broadcasts.get(request_key) is broadcast:
+                del self._risk_broadcasts[request_key]
+        if complete:
+            self._remember(user_message, history, request_key, risk_level, analysis)
+        return analysis
+    
+    async def _stream_single(self, user_message: str, history: List[str],
+                             on_risk: Optional[Callable[[RiskLevel], Awaitable[bool]]]
+                             ) -> Tuple[PatternAnalysisResponse, bool]:
+        """Streamed structured completion -> (analysis, whether the reply was read in full)"""
+        messages = conversation(STRUCTURED_SYSTEM_PROMPT, user_message, history)
+        
+        text = ''
+        risk_level = None
+        async with self._upstream_call():
+            stream = await self.client.chat.completions.create(
+                model=self.model,
                 messages=messages,
                 temperature=0.3,
-                max_tokens=500
+                max_tokens=STRUCTURED_MAX_TOKENS,
+                stream=True
             )
-            
-            analysis_text = response.choices[0].message.content
-            
-            # Parse the response to extract patterns and risk assessment
-            patterns = self._extract_patterns(analysis_text)
-            risk_level = self._assess_risk_from_analysis(analysis_text)
-            interventions = self._extract_interventions(analysis_text)
-            
-            return PatternAnalysisResponse(
-                patterns=patterns,
-                confidence=0.85,  # Based on model confidence
-                risk_assessment=risk_level,
-                suggested_interventions=interventions
+            try:
+                async for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    text += chunk.choices[0].delta.content
+                    
+                    if risk_level is None:
+                        risk_level = streamed_risk(text)
+                        if risk_level is not None and on_risk is not None and await on_risk(risk_level):
+                            self.stream_stats['early_exits'] += 1
+                            return PatternAnalysisResponse(
+                                patterns=[],
+                                confidence=0.85,
+                                risk_assessment=risk_level,
+                                suggested_interventions=[]
+                            ), False
+                    
+                    # Every field is in once the object closes - no need to wait for the stream end
+                    if risk_level is not None and text.rstrip().endswith('}') and parse_structured_reply(text):
+                        break
+            finally:
+                await stream.close()
+        
+        fields = parse_structured_reply(text)
+        if fields is not None:
+            analysis = self._analysis_from_fields(fields)
+        else:
+            self.structured_fallbacks += 1
+            analysis = PatternAnalysisResponse(
+                patterns=self._extract_patterns(text),
+                confidence=0.85,
+                risk_assessment=self._assess_risk_from_analysis(text),
+                suggested_interventions=self._extract_interventions(text)
             )
-            
+        if risk_level is None and on_risk is not None:
+            await on_risk(analysis.risk_assessment)
+        return analysis, True
+    
+    async def _analyze(self, user_message: str, history: List[str], request_key: str,
+                       risk_level: RiskLevel) -> PatternAnalysisResponse:
+        try:
+            # Crisis content never waits for a batch to fill
+            if self._batcher is not None and risk_level != RiskLevel.CRISIS:
+                analysis = await self._batcher.submit((user_message, history))
+            else:
+                analysis = await self._complete_single(user_message, history)
         except Exception as e:
             print(f"Error in ASI:One analysis: {e}")
-            # Return default response on error
-            return PatternAnalysisResponse(
-                patterns=[],
-                confidence=0.0,
-                risk_assessment=RiskLevel.LOW,
-                suggested_interventions=[]
+            # Local analysis instead of an empty one
+            return analyze_locally(user_message, risk_level)
+        
+        self._remember(user_message, history, request_key, risk_level, analysis)
+        return analysis
+    
+    async def _complete_single(self, user_message: str, history: List[str]) -> PatternAnalysisResponse:
+        # Build conversation context
+        messages = conversation(
+            STRUCTURED_SYSTEM_PROMPT if self.structured_output else PROSE_SYSTEM_PROMPT, user_message, history
+        )
+        
+        async with self._upstream_call():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=STRUCTURED_MAX_TOKENS if self.structured_output else 500
+            )
+        
+        analysis_text = response.choices[0].message.content
+        
+        if self.structured_output:
+            fields = parse_structured_reply(analysis_text)
+            if fields is not None:
+                return self._analysis_from_fields(fields)
+            self.structured_fallbacks += 1
+        
+        # Parse the response to extract patterns and risk assessment
+        patterns = self._extract_patterns(analysis_text)
+        risk_level = self._assess_risk_from_analysis(analysis_text)
+        interventions = self._extract_interventions(analysis_text)
+        
+        return PatternAnalysisResponse(
+            patterns=patterns,
+            confidence=0.85,  # Based on model confidence
+            risk_assessment=risk_level,
+            suggested_interventions=interventions
+        )
+    
+    # ==================== MICRO-BATCHING ====================
+    
+    async def _complete_batch(self, items: List[Tuple[str, List[str]]]) -> List[PatternAnalysisResponse]:
+        """One structured completion for several users' messages"""
+        if len(items) == 1:
+            return [await self._complete_single(*items[0])]
+        
+        payload = []
+        for index, (message, history) in enumerate(items):
+            summary, history = split_summary(history)
+            item = {"id": index, "history": history, "message": message}
+            if summary is not None:
+                item["summary"] = summary
+            payload.append(item)
+        async with self._upstream_call():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": json.dumps(payload)}
+                ],
+                temperature=0.2,
+                max_tokens=min(4000, BATCH_TOKENS_PER_ITEM * len(items))
             )
+        
+        results_by_id = parse_batch_reply(response.choices[0].message.content)
+        analyses: List[Optional[PatternAnalysisResponse]] = [
+            self._analysis_from_fields(results_by_id[index]) if index in results_by_id else None
+            for index in range(len(items))
+        ]
+        
+        # Anything the model dropped or mangled gets its own completion
+        missing = [index for index, analysis in enumerate(analyses) if analysis is None]
+        if missing:
+            print(f"⚠️ ASI batch reply missing {len(missing)}/{len(items)} results - retrying individually")
+            retried = await asyncio.gather(*[self._complete_single(*items[index]) for index in missing])
+            for index, analysis in zip(missing, retried):
+                analyses[index] = analysis
+        return analyses
+    
+    def _analysis_from_fields(self, fields: Dict[str, Any]) -> PatternAnalysisResponse:
+        """Compact schema fields -> response, keeping only known patterns/interventions"""
+        try:
+            risk_level = RiskLevel(str(fields.get('r', 'low')).lower())
+        except ValueError:
+            risk_level = self._assess_risk_from_analysis(str(fields.get('r')))
+        return PatternAnalysisResponse(
+            patterns=_known(fields.get('p'), COGNITIVE_PATTERNS),
+            confidence=0.85,
+            risk_assessment=risk_level,
+            suggested_interventions=_known(fields.get('i'), INTERVENTIONS)
+        )
     
     def _extract_patterns(self, analysis_text: str) -> List[str]:
         """Extract cognitive patterns from analysis text"""
         patterns = []
-        common_patterns = [
-            'perfectionism', 'catastrophizing', 'black-white thinking', 
-            'overgeneralization', 'personalization', 'mind reading',
-            'emotional reasoning', 'should statements', 'labeling'
-        ]
-        
         text_lower = analysis_text.lower()
-        for pattern in common_patterns:
+        for pattern in COGNITIVE_PATTERNS:
             if pattern in text_lower:
                 patterns.append(pattern)
         
@@ -100,14 +571,8 @@ Respond with specific patterns found and confidence levels."""
     def _extract_interventions(self, analysis_text: str) -> List[str]:
         """Extract suggested interventions from analysis text"""
         interventions = []
-        common_interventions = [
-            'CBT', 'mindfulness', 'breathing exercises', 'journaling',
-            'behavioral activation', 'exposure therapy', 'DBT skills',
-            'social connection', 'professional help'
-        ]
-        
         text_lower = analysis_text.lower()
-        for intervention in common_interventions:
+        for intervention in INTERVENTIONS:
             if intervention.lower() in text_lower:
                 interventions.append(intervention)
         
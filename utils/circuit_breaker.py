@@ -0,0 +1,96 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Trip on a rolling window of upstream failures and SLO-busting latencies.
+
+    Closed: every call goes through and is recorded. Once ``min_calls`` of the
+    last ``window`` calls are in and either the failure rate or the share
+    slower than ``latency_slo`` reaches its threshold, the circuit opens and
+    ``allow()`` refuses calls for ``open_for`` seconds. After that one probe
+    call at a time is let through (half-open): a good probe closes the
+    circuit, a failed or slow one re-opens it.
+
+    Callers read ``generation`` when a call starts and pass it to
+    ``record``; it changes on every state change, so results of calls
+    started under an earlier state (stragglers) are ignored.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_threshold: float = 0.5,
+                 latency_slo: float = 5.0, slow_threshold: float = 0.5, open_for: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.latency_slo = latency_slo
+        self.slow_threshold = slow_threshold
+        self.open_for = open_for
+        self.clock = clock
+        self.state = CIRCUIT_CLOSED
+        # (failed, slow) per recent call
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.generation = 0
+        self.stats: Dict[str, int] = {'opened': 0, 'rejected': 0, 'probes': 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; False means use the fallback"""
+        now = self.clock()
+        if self.state == CIRCUIT_OPEN and now - self._opened_at >= self.open_for:
+            self._set_state(CIRCUIT_HALF_OPEN)
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        # One probe at a time; a probe that never reports back is replaced after open_for
+        if self.state == CIRCUIT_HALF_OPEN and (
+                self._probe_started is None or now - self._probe_started >= self.open_for):
+            self._probe_started = now
+            self.stats['probes'] += 1
+            return True
+        self.stats['rejected'] += 1
+        return False
+
+    def record(self, latency: float, ok: bool, generation: int):
+        """Outcome of a call that started when ``self.generation`` was ``generation``"""
+        if generation != self.generation or self.state == CIRCUIT_OPEN:
+            return
+        slow = latency > self.latency_slo
+        if self.state == CIRCUIT_HALF_OPEN:
+            # Only the probe starts a call while half-open
+            if ok and not slow:
+                self._close()
+            else:
+                self._open()
+            return
+
+        self._calls.append((not ok, slow))
+        if len(self._calls) < self.min_calls:
+            return
+        failures = sum(failed for failed, _ in self._calls) / len(self._calls)
+        slow_calls = sum(slow for _, slow in self._calls) / len(self._calls)
+        if failures >= self.failure_threshold or slow_calls >= self.slow_threshold:
+            self._open()
+
+    def _set_state(self, state: str):
+        self.state = state
+        self.generation += 1
+        self._probe_started = None
+
+    def _open(self):
+        self._set_state(CIRCUIT_OPEN)
+        self._opened_at = self.clock()
+        self.stats['opened'] += 1
+        print(f"⚡ Circuit opened - failing over for {self.open_for:.0f}s")
+
+    def _close(self):
+        self._set_state(CIRCUIT_CLOSED)
+        self._calls.clear()
+        print(f"✅ Circuit closed - upstream recovered")
+
+    def report(self) -> Dict[str, object]:
+        return {'state': self.state, **self.stats}
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Set, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+T = TypeVar('T')
+
+
+class _Batch:
+    __slots__ = ('item', 'future', 'timer', 'merged')
+
+    def __init__(self, item, future: asyncio.Future):
+        self.item = item
+        self.future = future
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.merged = 1
+
+
+class CoalescingQueue(Generic[K, T]):
+    """Per-key outbound buffer that merges submissions within a short window.
+
+    The first submission for a key opens a window; later submissions for
+    the same key are folded in with ``merge`` and the combined item is
+    delivered once when the window closes. ``urgent`` submissions close
+    the window immediately. Every submitter of a batch gets the same
+    delivery future.
+
+    A ``hold`` submission that opens a batch keeps it open without a timer
+    until ``release()`` (or an urgent submission), for a caller that knows
+    a follow-up is coming and when it has arrived.
+    """
+
+    def __init__(self, window: float, merge: Callable[[T, T], T],
+                 deliver: Callable[[K, T], Awaitable[Any]]):
+        self.window = window
+        self.merge = merge
+        self.deliver = deliver
+        self._pending: Dict[K, _Batch] = {}
+        self._delivering: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {'submitted': 0, 'delivered': 0, 'coalesced': 0}
+
+    def submit(self, key: K, item: T, urgent: bool = False, hold: bool = False) -> asyncio.Future:
+        self.stats['submitted'] += 1
+        batch = self._pending.get(key)
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = self._pending[key] = _Batch(item, loop.create_future())
+            if not urgent and not hold:
+                batch.timer = loop.call_later(self.window, self._fire, key)
+        else:
+            batch.item = self.merge(batch.item, item)
+            batch.merged += 1
+            self.stats['coalesced'] += 1
+
+        future = batch.future
+        if urgent:
+            self._fire(key)
+        return future
+
+    def release(self, key: K, future: asyncio.Future):
+        """Deliver the batch behind ``future`` now, if it is still open"""
+        batch = self._pending.get(key)
+        if batch is not None and batch.future is future:
+            self._fire(key)
+
+    def _fire(self, key: K):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._deliver(key, batch))
+        self._delivering.add(task)
+        task.add_done_callback(self._delivering.discard)
+
+    async def _deliver(self, key: K, batch: _Batch):
+        try:
+            result = await self.deliver(key, batch.item)
+        except Exception as e:
+            if not batch.future.done():
+                batch.future.set_exception(e)
+                # Nobody may be awaiting a non-urgent batch
+                batch.future.exception()
+            return
+        self.stats['delivered'] += 1
+        if not batch.future.done():
+            batch.future.set_result(result)
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    async def flush(self):
+        """Deliver every open batch now and wait for all deliveries"""
+        for key in list(self._pending):
+            self._fire(key)
+        if self._delivering:
+            await asyncio.gather(*self._delivering, return_exceptions=True)
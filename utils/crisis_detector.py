@@ -1,48 +1,96 @@
-import re
-from typing import List, Dict, Any
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from models.data_models import RiskLevel
+from utils.crisis_lexicon import (
+    CRISIS_PHRASES, HIGH_RISK_PHRASES, CrisisLexicon, LexiconMatch, get_crisis_lexicon
+)
+from utils.crisis_fuzzy import get_fuzzy_crisis_index
+
+# Compact risk codes used by batch triage (higher = more urgent)
+RISK_CODES = {
+    RiskLevel.LOW: 0,
+    RiskLevel.MEDIUM: 1,
+    RiskLevel.HIGH: 2,
+    RiskLevel.CRISIS: 3
+}
+RISK_BY_CODE = {code: level for level, code in RISK_CODES.items()}
+
+class BatchTriage:
+    """Risk codes and indicators for a backlog, aligned with input order"""
+
+    def __init__(self, risk_codes: array, indicators: List[Tuple[str, ...]]):
+        self.risk_codes = risk_codes
+        self.indicators = indicators
+
+    def __len__(self) -> int:
+        return len(self.risk_codes)
+
+    def risk_level(self, index: int) -> RiskLevel:
+        return RISK_BY_CODE[self.risk_codes[index]]
+
+    def priority_order(self) -> List[int]:
+        """Message indices with CRISIS first, keeping arrival order within a level"""
+        buckets: List[List[int]] = [[] for _ in RISK_CODES]
+        for index, code in enumerate(self.risk_codes):
+            buckets[code].append(index)
+        return [index for bucket in reversed(buckets) for index in bucket]
+
+    def counts(self) -> Dict[RiskLevel, int]:
+        return {level: self.risk_codes.count(code) for level, code in RISK_CODES.items()}
+
+def assess_message(message: str, matches: Optional[List[LexiconMatch]] = None,
+                   normalized: bool = False) -> Dict[str, Any]:
+    """Exact automaton pass plus fuzzy lookup for misspelled phrases.
+
+    Callers that already scanned the message can pass their ``matches``.
+    """
+    if matches is None:
+        matches = get_crisis_lexicon().scan(message)
+    exact_phrases = {match.phrase for match in matches}
+    fuzzy_matches = [
+        match for match in get_fuzzy_crisis_index().search(message, normalized)
+        if match.phrase not in exact_phrases
+    ]
+    
+    assessment = CrisisLexicon.summarize(matches + fuzzy_matches)
+    assessment['fuzzy_indicators'] = [match.text for match in fuzzy_matches]
+    return assessment
+
+def lexicon_risk(message: str, risk_level: Optional[RiskLevel] = None) -> RiskLevel:
+    """The caller's risk level when it has one; otherwise assess the message"""
+    if risk_level is not None:
+        return RiskLevel(risk_level)
+    return assess_message(CrisisLexicon.normalize(message), normalized=True)['risk_level']
+
+def _triage_chunk(messages: List[str]) -> Tuple[bytes, List[Tuple[str, ...]]]:
+    """Classify a chunk silently; runs in worker processes too"""
+    codes = array('B')
+    indicators = []
+    for message in messages:
+        assessment = assess_message(message)
+        codes.append(RISK_CODES[assessment['risk_level']])
+        indicators.append(tuple(assessment['crisis_indicators'] + assessment['high_risk_indicators']))
+    return codes.tobytes(), indicators
+
+def _chunked(messages: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    iterator = iter(messages)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 class CrisisDetector:
     def __init__(self):
-        # EXPANDED crisis keywords - include variations
-        self.crisis_keywords = [
-            'suicide', 'kill myself', 'end my life', 'want to die',
-            'better off dead', 'harm myself', 'self harm', 'cut myself',
-            'cant take it', 'cant go on', 'end it all', 'no way out',
-            'feel like killing myself', 'want to kill myself', 'thinking of suicide',
-            'planning suicide', 'suicidal', 'end everything', 'give up on life',
-            'not want to live', 'tired of living', 'life is pointless'
-        ]
-        
-        self.high_risk_keywords = [
-            'hopeless', 'helpless', 'worthless', 'burden',
-            'alone forever', 'never get better', 'always sad',
-            'empty inside', 'nothing matters', 'can\'t cope',
-            'overwhelming pain', 'unbearable', 'no future'
-        ]
+        # Phrase lists live in utils/crisis_lexicon.py so every caller shares them
+        self.crisis_keywords = CRISIS_PHRASES
+        self.high_risk_keywords = HIGH_RISK_PHRASES
         
-        # IMPROVED regex pattern - more comprehensive
-        crisis_patterns = [
-            r'\b(suicide|suicidal)\b',
-            r'\b(kill\s+(my)?self)\b',
-            r'\b(end\s+(my\s+)?life)\b',
-            r'\b(want\s+to\s+die)\b',
-            r'\b(better\s+off\s+dead)\b',
-            r'\b(harm\s+(my)?self)\b',
-            r'\b(self\s+harm)\b',
-            r'\b(cut\s+(my)?self)\b',
-            r'\b(end\s+it\s+all)\b',
-            r'\b(no\s+way\s+out)\b',
-            r'\b(feel\s+like\s+kill)\b',
-            r'\b(not\s+want\s+to\s+live)\b',
-            r'\b(tired\s+of\s+living)\b',
-            r'\b(life\s+is\s+pointless)\b'
-        ]
-        
-        self.crisis_regex = re.compile(
-            '|'.join(crisis_patterns),
-            re.IGNORECASE
-        )
+        # Single Aho-Corasick automaton plus typo index, compiled once per process
+        self.lexicon = get_crisis_lexicon()
+        self.fuzzy_index = get_fuzzy_crisis_index()
         
         print("✅ Crisis Detector initialized with expanded patterns")
     
@@ -52,39 +100,59 @@ class CrisisDetector:
         
         print(f"🔍 Analyzing message: '{message_lower}'")  # DEBUG
         
-        # Check for immediate crisis keywords using regex
-        crisis_matches = list(self.crisis_regex.finditer(message_lower))
-        crisis_words_found = [match.group() for match in crisis_matches]
-        
-        # Also check using simple string matching as backup
-        simple_crisis_matches = [word for word in self.crisis_keywords if word in message_lower]
-        crisis_words_found.extend(simple_crisis_matches)
-        crisis_words_found = list(set(crisis_words_found))  # Remove duplicates
-        
-        # Check for high-risk keywords
-        high_risk_found = [word for word in self.high_risk_keywords if word in message_lower]
+        # One automaton pass finds both crisis and high-risk phrases,
+        # the fuzzy index catches typos like "kil myself"
+        assessment = assess_message(message)
+        crisis_words_found = assessment['crisis_indicators']
+        high_risk_found = assessment['high_risk_indicators']
+        fuzzy_found = assessment['fuzzy_indicators']
+        risk_level = assessment['risk_level']
         
         print(f"🔍 Crisis matches: {crisis_words_found}")  # DEBUG
         print(f"🔍 High risk matches: {high_risk_found}")  # DEBUG
+        if fuzzy_found:
+            print(f"🔍 Fuzzy matches: {fuzzy_found}")  # DEBUG
         
-        # Assess risk level
-        if crisis_words_found:
-            risk_level = RiskLevel.CRISIS
+        if risk_level == RiskLevel.CRISIS:
             print(f"🚨 CRISIS DETECTED: {crisis_words_found}")  # DEBUG
-        elif high_risk_found:
-            risk_level = RiskLevel.HIGH
+        elif risk_level == RiskLevel.HIGH:
             print(f"⚠️ HIGH RISK DETECTED: {high_risk_found}")  # DEBUG
         else:
-            risk_level = RiskLevel.LOW
             print("✅ No crisis detected")  # DEBUG
         
         return {
             'risk_level': risk_level,
             'crisis_indicators': crisis_words_found,
             'high_risk_indicators': high_risk_found,
+            'fuzzy_indicators': fuzzy_found,
             'immediate_action_required': risk_level in [RiskLevel.CRISIS, RiskLevel.HIGH]
         }
     
+    def detect_crisis_batch(self, messages: Iterable[str], processes: Optional[int] = None,
+                            chunk_size: int = 256) -> BatchTriage:
+        """Triage a backlog of messages without per-message logging.
+
+        With ``processes`` > 1 the backlog is split into chunks and classified
+        across a process pool; results keep the input order either way.
+        """
+        risk_codes = array('B')
+        indicators: List[Tuple[str, ...]] = []
+        chunks = _chunked(messages, chunk_size)
+        
+        if processes and processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(pool.map(_triage_chunk, chunks))
+        else:
+            results = map(_triage_chunk, chunks)
+        
+        for codes, chunk_indicators in results:
+            risk_codes.frombytes(codes)
+            indicators.extend(chunk_indicators)
+        
+        triage = BatchTriage(risk_codes, indicators)
+        print(f"🔍 Batch triage: {len(triage)} messages, {triage.counts()[RiskLevel.CRISIS]} crisis")
+        return triage
+    
     def get_crisis_response(self, risk_assessment: Dict[str, Any]) -> Dict[str, Any]:
         """Generate appropriate crisis response based on risk assessment"""
         risk_level = risk_assessment['risk_level']
@@ -0,0 +1,186 @@
+import os
+from typing import FrozenSet, List, Dict, Set, NamedTuple, Optional, Tuple
+from models.data_models import RiskLevel
+from utils.crisis_lexicon import CrisisLexicon, get_crisis_lexicon
+
+# A single edit turns "cant go on" into "can go on", so phrases carrying a
+# negation are only ever matched exactly.
+NEGATION_TOKENS = {'no', 'not', 'cant', 'can\'t', 'never'}
+
+# Common English words; a span that swaps a phrase word for one of these
+# says something else ("tired of lining up", "want to kiss myself")
+DEFAULT_WORDS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'knowledge', 'english_words.txt'
+)
+
+# One- and two-letter words are function words whose neighbours are other
+# function words - "better of dead" is a slip, not a different statement
+MIN_CONTENT_WORD = 3
+
+
+def load_word_list(path: str = DEFAULT_WORDS_PATH) -> FrozenSet[str]:
+    """One word per line; '#' lines are comments"""
+    with open(path, 'r') as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith('#'))
+
+
+class FuzzyMatch(NamedTuple):
+    phrase: str
+    risk_level: RiskLevel
+    text: str  # the misspelled span as it appeared (normalized)
+    distance: int
+
+
+def edit_budget(phrase: str) -> int:
+    """Allowed typos for a phrase, scaled by length to avoid short-word collisions"""
+    if len(phrase) < 6 or NEGATION_TOKENS.intersection(phrase.split()):
+        return 0
+    if len(phrase) < 12:
+        return 1
+    return 2
+
+
+def _plausible_typo(span: str, phrase: str, words: FrozenSet[str]) -> bool:
+    """A misspelling, not a different real word within the edit budget.
+
+    Typos rarely hit the first or last letter of a phrase. Any span word that
+    differs from the phrase's words must not be a dictionary word, which keeps
+    "kil myself" and "endmy life" while rejecting "fill myself" and
+    "want to dine"; short function words are exempt.
+    """
+    if span[0] != phrase[0] or span[-1] != phrase[-1]:
+        return False
+    phrase_words = phrase.split()
+    return not any(
+        len(word) >= MIN_CONTENT_WORD and word in words and word not in phrase_words
+        for word in span.split()
+    )
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by up to max_distance deletions"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            for index in range(len(item)):
+                next_frontier.add(item[:index] + item[index + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def _osa_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, giving up once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyCrisisIndex:
+    """SymSpell-style deletion dictionary over the crisis lexicon phrases"""
+
+    def __init__(self, lexicon: Optional[CrisisLexicon] = None, max_distance: int = 2,
+                 words: Optional[FrozenSet[str]] = None):
+        lexicon = lexicon or get_crisis_lexicon()
+        self.max_distance = max_distance
+        self.words = words if words is not None else load_word_list()
+        self.phrases = lexicon.phrases
+        self.levels = lexicon.levels
+        self._budgets = [min(edit_budget(phrase), max_distance) for phrase in self.phrases]
+        self._deletes: Dict[str, Set[int]] = {}
+        # (first char, last char, span length) -> deletions needed to reach a phrase;
+        # lets almost every span be rejected before generating any deletes
+        self._span_budgets: Dict[Tuple[str, str, int], int] = {}
+
+        for phrase_id, phrase in enumerate(self.phrases):
+            budget = self._budgets[phrase_id]
+            if not budget:
+                continue
+            for variant in _deletes(phrase, budget):
+                self._deletes.setdefault(variant, set()).add(phrase_id)
+            for length in range(len(phrase) - budget, len(phrase) + budget + 1):
+                key = (phrase[0], phrase[-1], length)
+                self._span_budgets[key] = max(self._span_budgets.get(key, 0), budget)
+
+        lengths = [key[2] for key in self._span_budgets]
+        self._min_length = min(lengths) if lengths else 0
+        self._max_length = max(lengths) if lengths else 0
+
+    def _candidate_spans(self, text: str):
+        """Spans that start and end on word boundaries within the phrase length range"""
+        starts = [0] + [index + 1 for index, ch in enumerate(text) if ch == ' ']
+        ends = [index for index, ch in enumerate(text) if not ch.isalpha()] + [len(text)]
+
+        end_cursor = 0
+        for start in starts:
+            while end_cursor < len(ends) and ends[end_cursor] - start < self._min_length:
+                end_cursor += 1
+            cursor = end_cursor
+            while cursor < len(ends) and ends[cursor] - start <= self._max_length:
+                if ends[cursor] > start:
+                    yield text[start:ends[cursor]]
+                cursor += 1
+
+    def search(self, text: str, normalized: bool = False) -> List[FuzzyMatch]:
+        """Find lexicon phrases within their edit budget of some span of text.
+
+        Exact occurrences are left to the automaton; only spans at distance
+        one or more are reported, at most once per phrase.
+        """
+        if not self._deletes:
+            return []
+        if not normalized:
+            text = CrisisLexicon.normalize(text)
+
+        best: Dict[int, FuzzyMatch] = {}
+        for span in self._candidate_spans(text):
+            span_budget = self._span_budgets.get((span[0], span[-1], len(span)))
+            if not span_budget:
+                continue
+
+            candidates: Set[int] = set()
+            for variant in _deletes(span, span_budget):
+                candidates |= self._deletes.get(variant, set())
+
+            for phrase_id in candidates:
+                phrase = self.phrases[phrase_id]
+                budget = self._budgets[phrase_id]
+                if not _plausible_typo(span, phrase, self.words):
+                    continue
+                distance = _osa_distance(span, phrase, budget)
+                if distance == 0 or distance > budget:
+                    continue
+                current = best.get(phrase_id)
+                if current is None or distance < current.distance:
+                    best[phrase_id] = FuzzyMatch(phrase, self.levels[phrase_id], span, distance)
+
+        return sorted(best.values(), key=lambda match: (match.distance, match.phrase))
+
+
+_shared_index: Optional[FuzzyCrisisIndex] = None
+
+
+def get_fuzzy_crisis_index() -> FuzzyCrisisIndex:
+    """Return the process-wide fuzzy index, building it on first use"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = FuzzyCrisisIndex()
+    return _shared_index
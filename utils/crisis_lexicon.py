@@ -0,0 +1,203 @@
+from typing import List, Dict, Iterable, NamedTuple, Optional, Tuple
+from models.data_models import RiskLevel
+
+# ==================== LEXICON ====================
+
+# Every phrase here triggers the crisis protocol. Regex-style variants from the
+# old CrisisDetector patterns ("kill self", "end life", ...) are spelled out so
+# the automaton can match them without a second pass.
+CRISIS_PHRASES = [
+    'suicide', 'suicidal', 'kill myself', 'kill self', 'end my life', 'end life',
+    'want to die', 'better off dead', 'harm myself', 'harm self', 'self harm',
+    'cut myself', 'cut self', 'cant take it', 'can\'t take it', 'cant go on',
+    'can\'t go on', 'end it all', 'no way out', 'feel like kill',
+    'feel like killing myself', 'want to kill myself', 'thinking of suicide',
+    'planning suicide', 'end everything', 'give up on life', 'not want to live',
+    'tired of living', 'life is pointless'
+]
+
+# The regex-derived variants only count as whole words - as bare substrings they
+# fire inside harmless text ("haircut selfie", "weekend life", "skill self-...")
+WORD_BOUNDARY_PHRASES = frozenset([
+    'kill self', 'end life', 'harm self', 'cut self', 'feel like kill'
+])
+
+HIGH_RISK_PHRASES = [
+    'hopeless', 'helpless', 'worthless', 'burden',
+    'alone forever', 'never get better', 'always sad',
+    'empty inside', 'nothing matters', 'can\'t cope',
+    'overwhelming pain', 'unbearable', 'no future'
+]
+
+# Typographic apostrophes are folded so "can’t" matches "can't"
+_CHAR_FOLD = {'’': '\'', '‘': '\''}
+
+ROOT = 0
+# Whole-word phrases are stored padded with this; anything but a letter, digit
+# or apostrophe is scanned as a space, and text is scanned as if space-framed
+BOUNDARY = ' '
+
+
+class LexiconMatch(NamedTuple):
+    phrase: str
+    risk_level: RiskLevel
+    end: int  # index just past the last matched character in the scanned text
+
+
+class CrisisLexicon:
+    """Aho-Corasick automaton over crisis phrases, labelled by severity class"""
+
+    def __init__(self, phrases: Optional[Dict[RiskLevel, Iterable[str]]] = None):
+        if phrases is None:
+            phrases = {
+                RiskLevel.CRISIS: CRISIS_PHRASES,
+                RiskLevel.HIGH: HIGH_RISK_PHRASES
+            }
+
+        self.phrases: List[str] = []
+        self.levels: List[RiskLevel] = []
+        self._phrase_ids: Dict[str, int] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [ROOT]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for risk_level, level_phrases in phrases.items():
+            for phrase in level_phrases:
+                self._add(self.normalize(phrase), risk_level)
+
+        self._build_fail_links()
+        # Scanning starts as if just past a boundary, so whole-word phrases match at the start
+        self.start_state = self._goto[ROOT].get(BOUNDARY, ROOT)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, fold apostrophes and collapse whitespace runs"""
+        folded = ''.join(_CHAR_FOLD.get(ch, ch) for ch in text.lower())
+        return ' '.join(folded.split())
+
+    def _add(self, phrase: str, risk_level: RiskLevel):
+        if not phrase or phrase in self._phrase_ids:
+            return
+        pattern = f"{BOUNDARY}{phrase}{BOUNDARY}" if phrase in WORD_BOUNDARY_PHRASES else phrase
+
+        state = ROOT
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(ROOT)
+                self._out.append(())
+            state = next_state
+
+        self._phrase_ids[phrase] = len(self.phrases)
+        self._out[state] = self._out[state] + (len(self.phrases),)
+        self.phrases.append(phrase)
+        self.levels.append(risk_level)
+
+    def _build_fail_links(self):
+        # Breadth-first so every fail target is finished before it is used
+        queue = list(self._goto[ROOT].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, ROOT)
+                self._fail[next_state] = target if target != next_state else ROOT
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def feed(self, text: str, state: Optional[int] = None, after_space: bool = True,
+             offset: int = 0) -> Tuple[int, bool, List[LexiconMatch]]:
+        """Scan raw text from a saved automaton state (None for a fresh scan).
+
+        Returns the new state, whether the last character was a boundary and
+        the matches completed inside ``text``. Match offsets are shifted by
+        ``offset`` so callers feeding chunks get positions in the whole stream.
+        A whole-word phrase completes on the boundary after it, so one ending
+        the text is only reported by ``flush``.
+        """
+        matches = []
+        goto, fail, out = self._goto, self._fail, self._out
+        if state is None:
+            state = self.start_state
+
+        for index, raw in enumerate(text):
+            ch = _CHAR_FOLD.get(raw, raw).lower()
+            if not (ch.isalnum() or ch == '\''):
+                if after_space:
+                    continue
+                ch = BOUNDARY
+                after_space = True
+            else:
+                after_space = False
+
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, ROOT)
+
+            for phrase_id in out[state]:
+                # A whole-word phrase ends before the boundary that completed it
+                end = offset + index if ch == BOUNDARY else offset + index + 1
+                matches.append(LexiconMatch(self.phrases[phrase_id], self.levels[phrase_id], end))
+
+        return state, after_space, matches
+
+    def flush(self, state: Optional[int], after_space: bool, offset: int) -> List[LexiconMatch]:
+        """Matches completed by the end of the text (whole-word phrases at the very end)"""
+        if after_space:
+            return []
+        return self.feed(BOUNDARY, state, after_space, offset)[2]
+
+    def scan(self, text: str) -> List[LexiconMatch]:
+        """Find every lexicon phrase in text in a single pass"""
+        state, after_space, matches = self.feed(text)
+        return matches + self.flush(state, after_space, len(text))
+
+    def classify(self, text: str) -> Dict[str, object]:
+        """Group scan hits by severity and derive the overall risk level"""
+        return self.summarize(self.scan(text))
+
+    @staticmethod
+    def summarize(matches: Iterable[LexiconMatch]) -> Dict[str, object]:
+        """Bucket matches (anything with phrase and risk_level) into an assessment"""
+        crisis_found: List[str] = []
+        high_risk_found: List[str] = []
+
+        for match in matches:
+            bucket = crisis_found if match.risk_level == RiskLevel.CRISIS else high_risk_found
+            if match.phrase not in bucket:
+                bucket.append(match.phrase)
+
+        if crisis_found:
+            risk_level = RiskLevel.CRISIS
+        elif high_risk_found:
+            risk_level = RiskLevel.HIGH
+        else:
+            risk_level = RiskLevel.LOW
+
+        return {
+            'risk_level': risk_level,
+            'crisis_indicators': crisis_found,
+            'high_risk_indicators': high_risk_found
+        }
+
+    def has_crisis(self, text: str) -> bool:
+        """True when any CRISIS-class phrase occurs in text"""
+        return any(match.risk_level == RiskLevel.CRISIS for match in self.scan(text))
+
+
+_shared_lexicon: Optional[CrisisLexicon] = None
+
+
+def get_crisis_lexicon() -> CrisisLexicon:
+    """Return the process-wide lexicon, building it on first use"""
+    global _shared_lexicon
+    if _shared_lexicon is None:
+        _shared_lexicon = CrisisLexicon()
+    return _shared_lexicon
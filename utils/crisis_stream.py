@@ -0,0 +1,83 @@
+import time
+from typing import Callable, Dict, List, Optional
+from models.data_models import RiskLevel
+from utils.crisis_lexicon import CrisisLexicon, LexiconMatch, get_crisis_lexicon
+from utils.session_store import SessionStore
+
+
+class CrisisStream:
+    """Automaton state for one partially received message"""
+
+    __slots__ = ('state', 'after_space', 'offset', 'matches')
+
+    def __init__(self):
+        self.state: Optional[int] = None  # lexicon's start state
+        self.after_space = True
+        self.offset = 0
+        self.matches: List[LexiconMatch] = []
+
+    @property
+    def risk_level(self) -> RiskLevel:
+        return CrisisLexicon.summarize(self.matches)['risk_level']
+
+
+class StreamingCrisisDetector:
+    """Incremental crisis detection over text that arrives in chunks.
+
+    Each session keeps its automaton state between chunks, so a phrase split
+    across a chunk boundary is still reported the moment its last character
+    arrives, and no character is ever scanned twice.
+
+    Streams a client abandons without ``finish()`` are dropped after
+    ``idle_ttl`` seconds without a chunk, or when ``max_streams`` is reached.
+    """
+
+    def __init__(self, lexicon: Optional[CrisisLexicon] = None,
+                 on_crisis: Optional[Callable[[str, LexiconMatch], None]] = None,
+                 max_streams: int = 10000, idle_ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.lexicon = lexicon or get_crisis_lexicon()
+        self.on_crisis = on_crisis
+        self.streams: SessionStore[CrisisStream] = SessionStore(
+            max_sessions=max_streams, idle_ttl=idle_ttl, clock=clock
+        )
+
+    def feed(self, session_id: str, chunk: str) -> List[LexiconMatch]:
+        """Scan the next chunk for a session and return phrases completed in it"""
+        stream = self.streams.get(session_id)
+        if stream is None:
+            stream = self.streams[session_id] = CrisisStream()
+
+        stream.state, stream.after_space, matches = self.lexicon.feed(
+            chunk, stream.state, stream.after_space, stream.offset
+        )
+        stream.offset += len(chunk)
+        self._record(session_id, stream, matches)
+        return matches
+
+    def _record(self, session_id: str, stream: CrisisStream, matches: List[LexiconMatch]):
+        stream.matches.extend(matches)
+        if self.on_crisis:
+            for match in matches:
+                if match.risk_level == RiskLevel.CRISIS:
+                    self.on_crisis(session_id, match)
+
+    def risk_level(self, session_id: str) -> RiskLevel:
+        stream = self.streams.get(session_id)
+        return stream.risk_level if stream else RiskLevel.LOW
+
+    def finish(self, session_id: str) -> Dict[str, object]:
+        """Close a session's message and return its full assessment"""
+        stream = self.streams.pop(session_id, None)
+        if stream is None:
+            return CrisisLexicon.summarize([])
+        # A whole-word phrase right at the end of the message completes here
+        self._record(session_id, stream, self.lexicon.flush(stream.state, stream.after_space, stream.offset))
+        return CrisisLexicon.summarize(stream.matches)
+
+    def reset(self, session_id: str):
+        self.streams.pop(session_id, None)
+
+    def sweep(self) -> int:
+        """Drop idle streams; returns how many were dropped"""
+        return self.streams.sweep()
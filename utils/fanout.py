@@ -0,0 +1,113 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+
+# Stage outcomes
+STAGE_OK = "ok"
+STAGE_ERROR = "error"
+STAGE_LATE = "late"
+
+# Late stages left running in the background; held here so they aren't GC'd
+_detached_tasks: Set[asyncio.Task] = set()
+
+
+class StageTiming(NamedTuple):
+    name: str
+    status: str
+    elapsed: float  # seconds; for late stages, the time until the deadline
+
+
+class FanOut:
+    """Run independent per-message stages concurrently under one deadline.
+
+    Stages still running at the deadline are dropped: cancelled by default,
+    or left to finish in the background with ``detach_late=True`` (for sends
+    that should still land even though the reply no longer waits on them).
+    """
+
+    def __init__(self, deadline: float, clock: Callable[[], float] = time.perf_counter):
+        self.deadline = deadline
+        self.clock = clock
+        self._stages: Dict[str, Awaitable] = {}
+        self._detach: Set[str] = set()
+        self._finished_at: Dict[str, float] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: List[StageTiming] = []
+        self.elapsed = 0.0
+
+    def add(self, name: str, awaitable: Awaitable, detach_late: bool = False):
+        self._stages[name] = awaitable
+        if detach_late:
+            self._detach.add(name)
+
+    def ok(self, name: str) -> bool:
+        return name in self.results
+
+    def get(self, name: str, default: Optional[Any] = None) -> Any:
+        return self.results.get(name, default)
+
+    async def run(self) -> Dict[str, Any]:
+        """Await every stage until the deadline; returns results of stages that finished"""
+        started = self.clock()
+        tasks = {}
+        for name, awaitable in self._stages.items():
+            task = asyncio.ensure_future(awaitable)
+            task.add_done_callback(lambda _, name=name: self._finished_at.setdefault(name, self.clock()))
+            tasks[task] = name
+
+        done = set()
+        if tasks:
+            done, _ = await asyncio.wait(tasks, timeout=self.deadline)
+        self.elapsed = self.clock() - started
+
+        cancelled = []
+        for task, name in tasks.items():
+            if task in done:
+                elapsed = self._finished_at.get(name, self.clock()) - started
+                if task.cancelled():
+                    self.timings.append(StageTiming(name, STAGE_ERROR, elapsed))
+                elif task.exception() is not None:
+                    self.errors[name] = task.exception()
+                    self.timings.append(StageTiming(name, STAGE_ERROR, elapsed))
+                else:
+                    self.results[name] = task.result()
+                    self.timings.append(StageTiming(name, STAGE_OK, elapsed))
+            else:
+                self.timings.append(StageTiming(name, STAGE_LATE, self.elapsed))
+                if name in self._detach:
+                    _detach(task, name)
+                else:
+                    task.cancel()
+                    cancelled.append(task)
+
+        if cancelled:
+            # Let cancellations unwind before the caller carries on
+            await asyncio.gather(*cancelled, return_exceptions=True)
+        return self.results
+
+    def report(self) -> str:
+        """One-line per-stage timing summary for logs"""
+        stages = ", ".join(
+            f"{timing.name}={timing.elapsed * 1000:.0f}ms" + ("" if timing.status == STAGE_OK else f" ({timing.status})")
+            for timing in self.timings
+        )
+        return f"{stages} | total={self.elapsed * 1000:.0f}ms"
+
+
+def _detach(task: asyncio.Task, name: str):
+    _detached_tasks.add(task)
+
+    def _finished(task: asyncio.Task):
+        _detached_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ Late stage '{name}' failed: {task.exception()}")
+
+    task.add_done_callback(_finished)
+
+
+def run_detached(awaitable: Awaitable, name: str) -> asyncio.Task:
+    """Fire-and-forget a follow-up so it doesn't hold up the reply"""
+    task = asyncio.ensure_future(awaitable)
+    _detach(task, name)
+    return task
@@ -0,0 +1,109 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from models.data_models import RISK_ORDER, RiskLevel
+
+# Rough English average; good enough to budget prompts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+class SummaryText(str):
+    """The generated summary inside a history context - never sent as the user's own words"""
+
+class HistorySummary:
+    """Rolling digest of a session's earlier messages, folded in one message at a time.
+
+    Keeps theme counts and the peak risk rather than text, so it stays a
+    few dozen tokens however long the conversation runs.
+    """
+
+    __slots__ = ('message_count', 'theme_counts', 'peak_risk', '_text')
+
+    MAX_THEMES = 6
+
+    def __init__(self):
+        self.message_count = 0
+        self.theme_counts: Dict[str, int] = {}
+        self.peak_risk = RiskLevel.LOW
+        self._text: Optional[str] = None
+
+    def fold(self, patterns: Iterable[str], risk_level: RiskLevel):
+        self.message_count += 1
+        for pattern in patterns:
+            self.theme_counts[pattern] = self.theme_counts.get(pattern, 0) + 1
+        risk_level = RiskLevel(risk_level)
+        if RISK_ORDER.index(risk_level) > RISK_ORDER.index(self.peak_risk):
+            self.peak_risk = risk_level
+        self._text = None
+
+    def text(self) -> Optional[str]:
+        """Prompt-ready summary, cached until the next fold; None before any message"""
+        if not self.message_count:
+            return None
+        if self._text is None:
+            # Stable sort: ties keep first-seen order
+            themes = sorted(self.theme_counts, key=lambda theme: -self.theme_counts[theme])[:self.MAX_THEMES]
+            self._text = (
+                f"Session summary: {self.message_count} earlier messages; "
+                f"recurring themes {', '.join(themes) if themes else 'none detected'}; "
+                f"highest risk so far {self.peak_risk.value}."
+            )
+        return self._text
+
+    def to_record(self) -> Dict:
+        return {
+            'message_count': self.message_count,
+            'theme_counts': dict(self.theme_counts),
+            'peak_risk': self.peak_risk.value
+        }
+
+    @classmethod
+    def from_record(cls, data: Dict) -> 'HistorySummary':
+        summary = cls()
+        summary.message_count = data['message_count']
+        summary.theme_counts = dict(data['theme_counts'])
+        summary.peak_risk = RiskLevel(data['peak_risk'])
+        return summary
+
+def compact_history(prior_messages: Sequence[str], summary: Optional[HistorySummary],
+                    window: int, token_budget: int) -> Tuple[List[str], int, int]:
+    """History to send -> (context, raw window tokens, tokens actually sent).
+
+    Under budget the raw window goes as is; over it, the summary (as the
+    first entry, a SummaryText) replaces all but the newest messages that
+    still fit alongside it.
+    """
+    recent = list(prior_messages[-window:]) if window else []
+    raw_tokens = sum(estimate_tokens(message) for message in recent)
+    summary_text = summary.text() if summary is not None else None
+    if raw_tokens <= token_budget or summary_text is None:
+        return recent, raw_tokens, raw_tokens
+
+    kept: List[str] = []
+    sent_tokens = estimate_tokens(summary_text)
+    for message in reversed(recent):
+        cost = estimate_tokens(message)
+        if sent_tokens + cost > token_budget:
+            break
+        kept.insert(0, message)
+        sent_tokens += cost
+    return [SummaryText(summary_text)] + kept, raw_tokens, sent_tokens
+
+class TokenLedger:
+    """Prompt history tokens: what the raw window would have cost vs what was sent"""
+
+    def __init__(self):
+        self.stats: Dict[str, int] = {'calls': 0, 'summarized': 0, 'raw_tokens': 0, 'sent_tokens': 0}
+
+    def record(self, raw_tokens: int, sent_tokens: int):
+        self.stats['calls'] += 1
+        self.stats['summarized'] += sent_tokens < raw_tokens
+        self.stats['raw_tokens'] += raw_tokens
+        self.stats['sent_tokens'] += sent_tokens
+
+    def saved_fraction(self) -> float:
+        raw = self.stats['raw_tokens']
+        return 1 - self.stats['sent_tokens'] / raw if raw else 0.0
+
+    def report(self) -> Dict[str, object]:
+        return {**self.stats, 'saved': f"{self.saved_fraction():.0%}"}
@@ -0,0 +1,25 @@
+from typing import Optional
+from models.data_models import RiskLevel, PatternAnalysisResponse
+from knowledge.pattern_taxonomy import SOMA_SECTION, get_pattern_taxonomy, tokenize
+from utils.crisis_detector import lexicon_risk
+
+# Keyword matching is a weaker signal than a model reading
+LOCAL_CONFIDENCE = 0.5
+
+def analyze_locally(user_message: str, risk_level: Optional[RiskLevel] = None) -> PatternAnalysisResponse:
+    """Taxonomy patterns plus lexicon risk, with no network call - marked degraded"""
+    risk_level = lexicon_risk(user_message, risk_level)
+    tokens = tokenize(user_message)
+    # SOMA's cognitive patterns, then SoroMind's content patterns
+    patterns = list(dict.fromkeys(
+        get_pattern_taxonomy(SOMA_SECTION).match(tokens).cognitive_patterns
+        + get_pattern_taxonomy().match(tokens).patterns
+    ))
+    
+    return PatternAnalysisResponse(
+        patterns=patterns,
+        confidence=LOCAL_CONFIDENCE,
+        risk_assessment=risk_level,
+        suggested_interventions=['professional help'] if risk_level in (RiskLevel.HIGH, RiskLevel.CRISIS) else [],
+        degraded=True
+    )
@@ -0,0 +1,52 @@
+from typing import List, Dict, Any, FrozenSet
+from models.data_models import RiskLevel
+from utils.crisis_lexicon import CrisisLexicon, LexiconMatch, get_crisis_lexicon
+from utils.crisis_detector import assess_message
+from knowledge.pattern_taxonomy import TaxonomyMatch, get_pattern_taxonomy, tokenize
+
+class MessageAnalysis:
+    """Normalized view of one inbound message, computed once and read by every stage"""
+
+    def __init__(self, message: str):
+        self.text = message
+        self.lowered = CrisisLexicon.normalize(message)
+        self.token_list: List[str] = tokenize(self.lowered)
+        self.tokens: FrozenSet[str] = frozenset(self.token_list)
+        self.word_count = len(self.lowered.split())
+
+        self.lexicon_matches: List[LexiconMatch] = get_crisis_lexicon().scan(self.lowered)
+        self.assessment: Dict[str, Any] = assess_message(self.lowered, self.lexicon_matches, normalized=True)
+        self.risk_level: RiskLevel = self.assessment['risk_level']
+        self.assessment['immediate_action_required'] = self.risk_level in [RiskLevel.CRISIS, RiskLevel.HIGH]
+
+        self.taxonomy_match: TaxonomyMatch = get_pattern_taxonomy().match(self.token_list)
+        self.patterns: List[str] = self._extract_patterns()
+
+    @property
+    def is_crisis(self) -> bool:
+        return self.risk_level == RiskLevel.CRISIS
+
+    @property
+    def immediate_action_required(self) -> bool:
+        return self.assessment['immediate_action_required']
+
+    def mentions(self, *phrases: str) -> bool:
+        """True if any phrase occurs in the normalized text"""
+        return any(phrase in self.lowered for phrase in phrases)
+
+    def _extract_patterns(self) -> List[str]:
+        """Extract patterns from user message for Orchestrator coordination"""
+        # Crisis indicators double as patterns
+        patterns = self.assessment['crisis_indicators'] + self.assessment['high_risk_indicators']
+
+        # Content-based patterns from the shared taxonomy token index
+        patterns.extend(self.taxonomy_match.patterns)
+
+        # Remove duplicates, keeping first-seen order
+        patterns = list(dict.fromkeys(patterns))
+
+        # If no patterns detected, add general emotional distress
+        if not patterns and self.word_count > 3:
+            patterns.append('emotional_distress')
+
+        return patterns
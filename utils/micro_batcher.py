@@ -0,0 +1,71 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class MicroBatcher(Generic[T, R]):
+    """Gather concurrent requests for up to ``max_wait`` seconds and process them together.
+
+    A batch goes out as soon as ``max_batch_size`` items are waiting or the
+    oldest one has waited ``max_wait``. ``process`` receives the items in
+    submission order and must return one result per item; its exception is
+    raised to every caller in the batch.
+    """
+
+    def __init__(self, process: Callable[[List[T]], Awaitable[List[R]]],
+                 max_batch_size: int = 8, max_wait: float = 0.015):
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {'batches': 0, 'items': 0}
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            # Callers that gave up while waiting don't need a slot
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if batch:
+                task = asyncio.ensure_future(self._run(batch))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]):
+        self.stats['batches'] += 1
+        self.stats['items'] += len(batch)
+        try:
+            results = await self.process([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    # Retrieved here so an abandoned caller doesn't log a warning
+                    future.exception()
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def mean_batch_size(self) -> float:
+        return self.stats['items'] / self.stats['batches'] if self.stats['batches'] else 0.0
@@ -0,0 +1,152 @@
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uagents import Context, Model
+from uagents_core.types import DeliveryStatus
+
+
+class DestinationStats:
+    __slots__ = ('queue', 'workers', 'in_flight', 'sent', 'failed', 'retries', 'dropped')
+
+    def __init__(self, max_queue: int):
+        self.queue: "asyncio.Queue[Tuple[Context, Model, asyncio.Future]]" = asyncio.Queue(max_queue)
+        self.workers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.dropped = 0
+
+
+class OutboundDispatcher:
+    """Per-destination outbound queues with retries kept off the caller's path.
+
+    Every destination gets its own queue and workers, so a slow or
+    unreachable peer only backs up its own traffic. Failed sends (an
+    exception or a FAILED delivery status) are retried with jittered
+    exponential backoff, and a shared cap bounds messages in flight across
+    all destinations. ``submit()`` returns at once with a future that
+    resolves to True once delivered, or False after the last attempt.
+    """
+
+    def __init__(self, max_in_flight: int = 32, workers_per_destination: int = 2,
+                 max_attempts: int = 4, base_delay: float = 0.25, max_delay: float = 8.0,
+                 max_queue: int = 1000, jitter: Callable[[], float] = random.random,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        self.max_in_flight = max_in_flight
+        self.workers_per_destination = workers_per_destination
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.jitter = jitter
+        self.sleep = sleep
+        self._destinations: Dict[str, DestinationStats] = {}
+        self._in_flight: Optional[asyncio.Semaphore] = None
+
+    def _destination(self, destination: str) -> DestinationStats:
+        stats = self._destinations.get(destination)
+        if stats is None:
+            stats = self._destinations[destination] = DestinationStats(self.max_queue)
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        # Workers start lazily, inside the running agent loop
+        stats.workers = [worker for worker in stats.workers if not worker.done()]
+        while len(stats.workers) < self.workers_per_destination:
+            stats.workers.append(asyncio.ensure_future(self._work(destination, stats)))
+        return stats
+
+    def submit(self, ctx: Context, destination: str, message: Model) -> asyncio.Future:
+        """Queue a message; never blocks the caller"""
+        stats = self._destination(destination)
+        delivery = asyncio.get_running_loop().create_future()
+        try:
+            stats.queue.put_nowait((ctx, message, delivery))
+        except asyncio.QueueFull:
+            stats.dropped += 1
+            print(f"⚠️ Outbound queue for {destination[:16]}... is full - dropping {type(message).__name__}")
+            delivery.set_result(False)
+        return delivery
+
+    async def send(self, ctx: Context, destination: str, message: Model) -> bool:
+        """Queue a message and wait for its final delivery outcome"""
+        return await asyncio.shield(self.submit(ctx, destination, message))
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number ``attempt`` (1-based)"""
+        return self.jitter() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    async def _attempt(self, ctx: Context, destination: str, message: Model, stats: DestinationStats) -> bool:
+        async with self._in_flight:
+            stats.in_flight += 1
+            try:
+                status = await ctx.send(destination, message)
+            except Exception as e:
+                print(f"⚠️ Send to {destination[:16]}... failed: {e}")
+                return False
+            finally:
+                stats.in_flight -= 1
+        if getattr(status, 'status', None) == DeliveryStatus.FAILED:
+            print(f"⚠️ Send to {destination[:16]}... failed: {status.detail}")
+            return False
+        return True
+
+    async def _work(self, destination: str, stats: DestinationStats):
+        while True:
+            ctx, message, delivery = await stats.queue.get()
+            try:
+                delivered = False
+                for attempt in range(1, self.max_attempts + 1):
+                    if await self._attempt(ctx, destination, message, stats):
+                        delivered = True
+                        break
+                    if attempt < self.max_attempts:
+                        stats.retries += 1
+                        await self.sleep(self.backoff(attempt))
+
+                if delivered:
+                    stats.sent += 1
+                else:
+                    stats.failed += 1
+                    print(f"❌ Giving up on {type(message).__name__} to {destination[:16]}... "
+                          f"after {self.max_attempts} attempts")
+                if not delivery.done():
+                    delivery.set_result(delivered)
+            finally:
+                stats.queue.task_done()
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """Queue depth, in-flight and outcome counters per destination"""
+        return {
+            destination: {
+                'queue_depth': stats.queue.qsize(),
+                'in_flight': stats.in_flight,
+                'sent': stats.sent,
+                'failed': stats.failed,
+                'retries': stats.retries,
+                'dropped': stats.dropped
+            }
+            for destination, stats in self._destinations.items()
+        }
+
+    def queue_depth(self) -> int:
+        return sum(stats.queue.qsize() + stats.in_flight for stats in self._destinations.values())
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait for queued messages to finish (e.g. before shutdown)"""
+        joins = [stats.queue.join() for stats in self._destinations.values()]
+        if joins:
+            try:
+                await asyncio.wait_for(asyncio.gather(*joins), timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️ Outbound drain timed out with {self.queue_depth()} messages pending")
+
+
+# One dispatcher per agent process
+_dispatcher: Optional[OutboundDispatcher] = None
+
+def get_outbound_dispatcher() -> OutboundDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = OutboundDispatcher()
+    return _dispatcher
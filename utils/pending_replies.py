@@ -0,0 +1,57 @@
+import asyncio
+from uuid import uuid4
+from typing import Dict, Generic, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class PendingReplies(Generic[T]):
+    """Correlation table for agent request/reply pairs.
+
+    ``register()`` issues a request id to put on the outbound message;
+    ``wait()`` suspends until the reply carrying that id is passed to
+    ``resolve()``, or returns None once the timeout expires. Entries are
+    always removed by ``wait()``, so abandoned requests can't pile up.
+    """
+
+    def __init__(self, default_timeout: float = 3.0):
+        self.default_timeout = default_timeout
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {'resolved': 0, 'timeouts': 0, 'unmatched': 0}
+
+    def register(self) -> str:
+        request_id = str(uuid4())
+        self._pending[request_id] = asyncio.get_running_loop().create_future()
+        return request_id
+
+    def discard(self, request_id: str):
+        future = self._pending.pop(request_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    async def wait(self, request_id: str, timeout: Optional[float] = None) -> Optional[T]:
+        future = self._pending.get(request_id)
+        if future is None:
+            return None
+        try:
+            return await asyncio.wait_for(future, self.default_timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def resolve(self, request_id: Optional[str], reply: T) -> bool:
+        """Hand a reply to its waiter; False for uncorrelated, unknown, late or duplicate replies"""
+        if request_id is None:
+            return False
+        future = self._pending.get(request_id)
+        if future is None or future.done():
+            self.stats['unmatched'] += 1
+            return False
+        future.set_result(reply)
+        self.stats['resolved'] += 1
+        return True
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,112 @@
+import time
+import asyncio
+import itertools
+from array import array
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+# Lower runs first
+PRIORITY_CRISIS = 0
+PRIORITY_HIGH = 1
+PRIORITY_MEDIUM = 2
+PRIORITY_LOW = 3
+
+
+class LatencyTracker:
+    """Rolling latency samples per class, for percentile reporting"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, array] = {}
+        self._next: Dict[str, int] = {}
+
+    def record(self, key: str, seconds: float):
+        samples = self._samples.setdefault(key, array('d'))
+        if len(samples) < self.window:
+            samples.append(seconds)
+        else:
+            # Overwrite the oldest sample in place
+            slot = self._next.get(key, 0)
+            samples[slot] = seconds
+            self._next[key] = (slot + 1) % self.window
+
+    def percentile(self, key: str, fraction: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def count(self, key: str) -> int:
+        return len(self._samples.get(key, ()))
+
+    def report(self, fraction: float = 0.99) -> str:
+        label = f"p{fraction * 100:g}"
+        return ", ".join(
+            f"{key}: {label}={self.percentile(key, fraction) * 1000:.0f}ms (n={self.count(key)})"
+            for key in self._samples
+        )
+
+
+class PriorityWorkQueue:
+    """Background worker pool that runs the most urgent job first.
+
+    Jobs with equal priority run in submission order. Workers start
+    lazily inside the running event loop. Reordering only helps jobs that
+    have not started, so jobs at ``bypass_priority`` or more urgent skip the
+    pool and start at once, even while every worker is busy.
+    """
+
+    def __init__(self, workers: int = 8, bypass_priority: Optional[int] = PRIORITY_HIGH):
+        self.workers = workers
+        self.bypass_priority = bypass_priority
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._bypassed: Set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+        self.waits = LatencyTracker()
+
+    def submit(self, priority: int, job: Callable[[], Awaitable], label: str = "job"):
+        if self.bypass_priority is not None and priority <= self.bypass_priority:
+            self.waits.record(label, 0.0)
+            task = asyncio.ensure_future(self._run(label, job))
+            self._bypassed.add(task)
+            task.add_done_callback(self._bypassed.discard)
+            return
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.ensure_future(self._work()))
+        self._queue.put_nowait((priority, next(self._sequence), time.perf_counter(), label, job))
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _work(self):
+        while True:
+            priority, _, enqueued_at, label, job = await self._queue.get()
+            self.waits.record(label, time.perf_counter() - enqueued_at)
+            try:
+                await self._run(label, job)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    async def _run(label: str, job: Callable[[], Awaitable]):
+        try:
+            await job()
+        except Exception as e:
+            print(f"❌ Background {label} job failed: {e}")
+
+    async def join(self, timeout: Optional[float] = None):
+        """Wait for queued and bypassing jobs to finish (e.g. before shutdown)"""
+        async def drained():
+            if self._queue is not None:
+                await self._queue.join()
+            while self._bypassed:
+                await asyncio.wait(set(self._bypassed))
+
+        try:
+            await asyncio.wait_for(drained(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Work queue drain timed out with {self.depth()} jobs pending")
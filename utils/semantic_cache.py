@@ -0,0 +1,106 @@
+import time
+import numpy as np
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Sequence, TypeVar
+from utils.crisis_lexicon import CrisisLexicon
+from knowledge.pattern_taxonomy import tokenize
+
+V = TypeVar('V')
+
+NGRAM_SIZES = (3, 4)
+VECTOR_DIM = 1024
+
+def ngram_vectors(texts: Sequence[str], dim: int = VECTOR_DIM) -> np.ndarray:
+    """Unit-length hashed character n-gram counts, one row per text.
+
+    Uses the built-in string hash, so vectors are only comparable within
+    one process - fine for an in-memory cache.
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        # Word tokens only, so punctuation and spacing don't count against a match
+        padded = f" {' '.join(tokenize(CrisisLexicon.normalize(text)))} "
+        buckets = [
+            hash(padded[start:start + size]) % dim
+            for size in NGRAM_SIZES
+            for start in range(len(padded) - size + 1)
+        ]
+        if buckets:
+            matrix[row] = np.bincount(buckets, minlength=dim)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+class SemanticCache(Generic[V]):
+    """Reuse values across near-duplicate texts (cosine similarity >= ``threshold``).
+
+    Entries live in a fixed ``max_entries`` x ``dim`` matrix, so a batch of
+    lookups is one matrix product. Only entries with the same ``context``
+    (e.g. conversation history) can match. When full, the least recently
+    used row is overwritten; rows also expire ``ttl`` seconds after insertion.
+    """
+
+    def __init__(self, max_entries: int = 512, threshold: float = 0.9, ttl: float = 600.0,
+                 dim: int = VECTOR_DIM, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.dim = dim
+        self.clock = clock
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._contexts = np.zeros(max_entries, dtype=np.int64)
+        # Empty rows count as expired and never match
+        self._expires = np.full(max_entries, -np.inf)
+        self._last_used = np.full(max_entries, -np.inf)
+        self._values: List[Optional[V]] = [None] * max_entries
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    @staticmethod
+    def context_id(context: Hashable) -> int:
+        return hash(context)
+
+    def lookup_many(self, texts: Sequence[str], contexts: Sequence[Hashable]) -> List[Optional[V]]:
+        """Nearest cached value per text, or None below the similarity threshold"""
+        if not texts:
+            return []
+        now = self.clock()
+        similarities = ngram_vectors(texts, self.dim) @ self._vectors.T
+        context_ids = np.array([self.context_id(context) for context in contexts], dtype=np.int64)
+        usable = (self._expires > now) & (context_ids[:, None] == self._contexts[None, :])
+        similarities[~usable] = -1.0
+
+        best = similarities.argmax(axis=1)
+        results: List[Optional[V]] = []
+        for row, slot in enumerate(best):
+            if similarities[row, slot] >= self.threshold:
+                self._last_used[slot] = now
+                self.stats['hits'] += 1
+                results.append(self._values[slot])
+            else:
+                self.stats['misses'] += 1
+                results.append(None)
+        return results
+
+    def get(self, text: str, context: Hashable) -> Optional[V]:
+        return self.lookup_many([text], [context])[0]
+
+    def put(self, text: str, context: Hashable, value: V):
+        now = self.clock()
+        expired = np.flatnonzero(self._expires <= now)
+        if len(expired):
+            slot = int(expired[0])
+        else:
+            slot = int(self._last_used.argmin())
+            self.stats['evicted'] += 1
+        self._vectors[slot] = ngram_vectors([text], self.dim)[0]
+        self._contexts[slot] = self.context_id(context)
+        self._expires[slot] = now + self.ttl
+        self._last_used[slot] = now
+        self._values[slot] = value
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires > self.clock()))
+
+    def clear(self):
+        self._expires[:] = -np.inf
+        self._last_used[:] = -np.inf
+        self._values = [None] * self.max_entries
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+
+class SessionRecord(NamedTuple):
+    session_id: str
+    data: Dict[str, Any]
+    sender: Optional[str]
+    conversation_id: Optional[str]
+    updated_at: float  # wall-clock epoch seconds
+
+
+class SessionBackend:
+    """Persistence interface behind SessionStore; the store stays the hot-path cache"""
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    def load_for_sender(self, sender: str, conversation_id: Optional[str] = None) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    def write_batch(self, records: Iterable[SessionRecord], deleted: Iterable[str]):
+        raise NotImplementedError
+
+    def delete_older_than(self, cutoff: float) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions persisted as JSON rows in a local SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Batches are written from a worker thread; the lock serializes access
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " sender TEXT,"
+                " conversation_id TEXT,"
+                " updated_at REAL NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_sender"
+                " ON sessions (sender, conversation_id, updated_at)"
+            )
+            # Serves the idle-TTL prune in delete_older_than
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _to_record(row) -> SessionRecord:
+        session_id, sender, conversation_id, updated_at, data = row
+        return SessionRecord(session_id, json.loads(data), sender, conversation_id, updated_at)
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id, sender, conversation_id, updated_at, data"
+                " FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return self._to_record(row) if row else None
+
+    def load_for_sender(self, sender: str, conversation_id: Optional[str] = None) -> Optional[SessionRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id, sender, conversation_id, updated_at, data"
+                " FROM sessions WHERE sender = ? AND conversation_id IS ?"
+                " ORDER BY updated_at DESC LIMIT 1",
+                (sender, conversation_id)
+            ).fetchone()
+        return self._to_record(row) if row else None
+
+    def write_batch(self, records: Iterable[SessionRecord], deleted: Iterable[str]):
+        """Upsert and delete in a single transaction"""
+        rows = [
+            (record.session_id, record.sender, record.conversation_id,
+             record.updated_at, json.dumps(record.data))
+            for record in records
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sessions"
+                    " (session_id, sender, conversation_id, updated_at, data)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.executemany(
+                    "DELETE FROM sessions WHERE session_id = ?",
+                    [(session_id,) for session_id in deleted]
+                )
+
+    def delete_older_than(self, cutoff: float) -> int:
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
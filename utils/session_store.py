@@ -0,0 +1,308 @@
+import time
+import asyncio
+from uuid import uuid4
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
+from utils.session_backend import SessionBackend, SessionRecord
+
+S = TypeVar('S')
+
+# Eviction reasons passed to callbacks
+EVICTED_EXPIRED = "expired"
+EVICTED_CAPACITY = "capacity"
+
+EvictionCallback = Callable[[str, Any, str], None]
+
+# (sender address, optional conversation id)
+SenderKey = Tuple[str, Optional[str]]
+
+
+class SessionStore(Generic[S]):
+    """Dict-like session map bounded by idle TTL and LRU capacity.
+
+    Reads and writes refresh an entry's idle timer. Entries dropped by
+    ``sweep()`` or by capacity pressure are reported to eviction callbacks;
+    explicit ``del``/``pop`` (a client-sent session end) is not.
+
+    A sender-affinity index maps each sender (and optional conversation id)
+    to its active session, so repeat senders keep their history. Index
+    entries disappear with their session, whichever way it leaves.
+
+    With a ``backend`` the store becomes a write-behind cache: touched
+    sessions are marked dirty and written in batches by ``flush()``, and a
+    miss falls back to the backend so sessions survive restarts. Sender
+    lookups never query the backend on the event loop; await
+    ``restore_for_sender()`` first to reload a sender's persisted session.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 1800.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 backend: Optional[SessionBackend] = None,
+                 serializer: Optional[Callable[[S], Dict[str, Any]]] = None,
+                 deserializer: Optional[Callable[[str, Dict[str, Any]], S]] = None):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[S, float]]" = OrderedDict()
+        self._callbacks: List[EvictionCallback] = []
+        self._sender_sessions: Dict[SenderKey, str] = {}
+        self._session_senders: Dict[str, SenderKey] = {}
+        self.evictions: Dict[str, int] = {EVICTED_EXPIRED: 0, EVICTED_CAPACITY: 0}
+
+        if backend is not None and (serializer is None or deserializer is None):
+            raise ValueError("A session backend needs a serializer and deserializer")
+        self.backend = backend
+        self.serializer = serializer
+        self.deserializer = deserializer
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        # Sessions evicted for capacity before their dirty state was flushed
+        self._spilled: Dict[str, SessionRecord] = {}
+
+    def add_eviction_callback(self, callback: EvictionCallback):
+        self._callbacks.append(callback)
+
+    def _unbind(self, session_id: str):
+        sender_key = self._session_senders.pop(session_id, None)
+        if sender_key is not None and self._sender_sessions.get(sender_key) == session_id:
+            del self._sender_sessions[sender_key]
+
+    def _evict(self, session_id: str, reason: str):
+        session, _ = self._entries.pop(session_id)
+        if self.backend is not None:
+            if reason == EVICTED_CAPACITY:
+                # Spill to the backend so a later message restores it
+                if session_id in self._dirty:
+                    self._spilled[session_id] = self._record(session_id, session)
+            else:
+                self._deleted.add(session_id)
+            self._dirty.discard(session_id)
+        self._unbind(session_id)
+        self.evictions[reason] += 1
+        for callback in self._callbacks:
+            try:
+                callback(session_id, session, reason)
+            except Exception as e:
+                print(f"⚠️ Session eviction callback failed: {e}")
+
+    def _expired(self, last_access: float, now: float) -> bool:
+        return now - last_access > self.idle_ttl
+
+    def _live_entry(self, session_id: str) -> Optional[Tuple[S, float]]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return self._restore(session_id)
+        if self._expired(entry[1], self.clock()):
+            self._evict(session_id, EVICTED_EXPIRED)
+            return None
+        return entry
+
+    def __contains__(self, session_id: str) -> bool:
+        return self._live_entry(session_id) is not None
+
+    def get(self, session_id: str, default: Optional[S] = None) -> Optional[S]:
+        """Return a live session and mark it most recently used"""
+        entry = self._live_entry(session_id)
+        if entry is None:
+            return default
+
+        self._entries[session_id] = (entry[0], self.clock())
+        self._entries.move_to_end(session_id)
+        self.mark_dirty(session_id)
+        return entry[0]
+
+    def __getitem__(self, session_id: str) -> S:
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id: str, session: S):
+        self._entries[session_id] = (session, self.clock())
+        self._entries.move_to_end(session_id)
+        self._deleted.discard(session_id)
+        self.mark_dirty(session_id)
+        while len(self._entries) > self.max_sessions:
+            oldest_id = next(iter(self._entries))
+            self._evict(oldest_id, EVICTED_CAPACITY)
+
+    def __delitem__(self, session_id: str):
+        del self._entries[session_id]
+        self._forget(session_id)
+
+    def pop(self, session_id: str, default: Optional[S] = None) -> Optional[S]:
+        entry = self._entries.pop(session_id, None)
+        self._forget(session_id)
+        return entry[0] if entry is not None else default
+
+    def _forget(self, session_id: str):
+        self._unbind(session_id)
+        if self.backend is not None:
+            self._dirty.discard(session_id)
+            self._spilled.pop(session_id, None)
+            self._deleted.add(session_id)
+
+    # ==================== SENDER AFFINITY ====================
+
+    def bind_sender(self, sender: str, session_id: str, conversation_id: Optional[str] = None):
+        """Route future messages from sender to session_id"""
+        sender_key = (sender, conversation_id)
+        previous_id = self._sender_sessions.get(sender_key)
+        if previous_id is not None and previous_id != session_id:
+            self._session_senders.pop(previous_id, None)
+        self._unbind(session_id)
+        self._sender_sessions[sender_key] = session_id
+        self._session_senders[session_id] = sender_key
+        self.mark_dirty(session_id)
+
+    def session_id_for_sender(self, sender: str, conversation_id: Optional[str] = None) -> Optional[str]:
+        """Active session id for a sender, if its session is still live"""
+        session_id = self._sender_sessions.get((sender, conversation_id))
+        if session_id is None:
+            session_id = self._restore_for_sender(sender, conversation_id)
+        if session_id is None or session_id not in self:
+            return None
+        return session_id
+
+    def get_or_create_for_sender(self, sender: str, factory: Callable[[str], S],
+                                 conversation_id: Optional[str] = None) -> Tuple[str, S]:
+        """Return the sender's live session, creating and binding one if needed.
+
+        Never awaits, so concurrent handlers for the same sender on one event
+        loop always resolve to the same session.
+        """
+        session_id = self.session_id_for_sender(sender, conversation_id)
+        if session_id is not None:
+            return session_id, self[session_id]
+
+        session_id = str(uuid4())
+        session = factory(session_id)
+        self[session_id] = session
+        self.bind_sender(sender, session_id, conversation_id)
+        return session_id, session
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def sweep(self) -> int:
+        """Evict every idle session; oldest entries sit at the front"""
+        now = self.clock()
+        evicted = 0
+        while self._entries:
+            session_id, (_, last_access) = next(iter(self._entries.items()))
+            if not self._expired(last_access, now):
+                break
+            self._evict(session_id, EVICTED_EXPIRED)
+            evicted += 1
+        return evicted
+
+    # ==================== WRITE-BEHIND PERSISTENCE ====================
+
+    def mark_dirty(self, session_id: str):
+        """Queue a session for the next batched write (after mutating it)"""
+        if self.backend is not None and session_id in self._entries:
+            self._dirty.add(session_id)
+
+    def _record(self, session_id: str, session: S) -> SessionRecord:
+        sender, conversation_id = self._session_senders.get(session_id, (None, None))
+        return SessionRecord(session_id, self.serializer(session), sender, conversation_id, time.time())
+
+    def _adopt(self, record: SessionRecord) -> Optional[Tuple[S, float]]:
+        if record.session_id in self._deleted or time.time() - record.updated_at > self.idle_ttl:
+            return None
+
+        session = self.deserializer(record.session_id, record.data)
+        self._spilled.pop(record.session_id, None)
+        self[record.session_id] = session
+        self._dirty.discard(record.session_id)
+        if record.sender is not None:
+            sender_key = (record.sender, record.conversation_id)
+            if sender_key not in self._sender_sessions:
+                self._sender_sessions[sender_key] = record.session_id
+                self._session_senders[record.session_id] = sender_key
+        print(f"♻️ Session {record.session_id[:8]}... restored from backend")
+        return self._entries.get(record.session_id)
+
+    def _restore(self, session_id: str) -> Optional[Tuple[S, float]]:
+        """Lazily reload a session missing from memory (e.g. after a restart)"""
+        if self.backend is None or session_id in self._deleted:
+            return None
+        record = self._spilled.get(session_id) or self.backend.load(session_id)
+        return self._adopt(record) if record else None
+
+    def _spilled_for_sender(self, sender_key: SenderKey) -> Optional[SessionRecord]:
+        for record in self._spilled.values():
+            if (record.sender, record.conversation_id) == sender_key:
+                return record
+        return None
+
+    def _restore_for_sender(self, sender: str, conversation_id: Optional[str]) -> Optional[str]:
+        """Reload a sender's spilled session; persisted rows need restore_for_sender()"""
+        record = self._spilled_for_sender((sender, conversation_id))
+        if record is None or self._adopt(record) is None:
+            return None
+        return record.session_id
+
+    async def restore_for_sender(self, sender: str, conversation_id: Optional[str] = None) -> Optional[str]:
+        """Reload a sender's persisted session, querying the backend from a worker thread"""
+        sender_key = (sender, conversation_id)
+        if self.backend is None or sender_key in self._sender_sessions:
+            return None
+        record = self._spilled_for_sender(sender_key)
+        if record is None:
+            record = await asyncio.to_thread(self.backend.load_for_sender, sender, conversation_id)
+        # Another handler may have bound or restored the sender while we waited
+        if (record is None or sender_key in self._sender_sessions
+                or record.session_id in self._entries or self._adopt(record) is None):
+            return None
+        return record.session_id
+
+    def _take_batch(self) -> Tuple[List[SessionRecord], List[str]]:
+        records = list(self._spilled.values())
+        records.extend(self._record(session_id, self._entries[session_id][0]) for session_id in self._dirty)
+        deleted = list(self._deleted)
+        self._spilled.clear()
+        self._dirty.clear()
+        self._deleted.clear()
+        return records, deleted
+
+    def _requeue(self, records: List[SessionRecord], deleted: List[str]):
+        """Put a failed batch back so the next flush retries it"""
+        for record in records:
+            if record.session_id not in self._deleted:
+                self._spilled.setdefault(record.session_id, record)
+        self._deleted.update(deleted)
+
+    def _write(self, records: List[SessionRecord], deleted: List[str]):
+        """Write a batch and prune rows past the idle TTL (blocking)"""
+        self.backend.write_batch(records, deleted)
+        self.backend.delete_older_than(time.time() - self.idle_ttl)
+
+    def flush(self) -> int:
+        """Write all pending changes in one backend transaction"""
+        if self.backend is None:
+            return 0
+        records, deleted = self._take_batch()
+        if records or deleted:
+            try:
+                self._write(records, deleted)
+            except Exception:
+                self._requeue(records, deleted)
+                raise
+        return len(records) + len(deleted)
+
+    async def flush_async(self) -> int:
+        """Snapshot on the event loop, then write from a worker thread"""
+        if self.backend is None:
+            return 0
+        records, deleted = self._take_batch()
+        if records or deleted:
+            try:
+                await asyncio.to_thread(self._write, records, deleted)
+            except Exception:
+                self._requeue(records, deleted)
+                raise
+        return len(records) + len(deleted)
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesce concurrent calls for the same key into one upstream call.
+
+    The first caller starts the work as its own task; callers arriving
+    while it runs await the same task. A caller that gives up (e.g. its
+    deadline passes) doesn't cancel the work for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[K, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {'calls': 0, 'shared': 0}
+
+    async def do(self, key: K, work: Callable[[], Awaitable[V]]) -> V:
+        task = self._calls.get(key)
+        if task is None:
+            self.stats['calls'] += 1
+            task = self._calls[key] = asyncio.ensure_future(work())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.stats['shared'] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: K, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the error retrieved in case every caller already gave up
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)